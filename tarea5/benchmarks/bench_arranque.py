@@ -0,0 +1,106 @@
+"""
+Sonda de arranque de la aplicación: lanza main.py varias veces en procesos nuevos (Qt en modo offscreen),
+entra automáticamente con las credenciales de depuración tras una espera que simula al usuario escribiendo
+y resume, a partir de las marcas de utilidades.sonda_arranque, el tiempo hasta el primer pintado
+y hasta la interactividad del login y de la ventana principal.
+
+Se ejecuta desde la carpeta tarea5 contra la base de datos configurada, o contra un fichero SQLite:
+
+    python -m benchmarks.bench_arranque --repeticiones 10 --espera-login 1
+    python -m benchmarks.bench_arranque --sqlite /tmp/hotel_arranque.db --espera-login 0
+"""
+import time
+
+INICIO = time.perf_counter()  # Referencia del proceso hijo, antes de importar nada más
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+from benchmarks.comun import guardar_json, resumir
+
+LIMITE_HIJO = 60  # Segundos máximos de cada arranque
+
+
+def hijo(espera_login):
+    """
+    Arranca la aplicación en este proceso, pulsa "Acceder" cuando el login lleva espera_login segundos
+    interactivo, cierra la ventana principal en cuanto muestra las reservas e imprime las marcas en JSON.
+    """
+    import main as aplicacion
+    from PySide6.QtCore import QTimer
+    from PySide6.QtWidgets import QApplication, QPushButton
+    from utilidades.message_box import MessageBox
+    from utilidades.sonda_arranque import sonda
+
+    aplicacion.INICIO = INICIO
+    MessageBox.show = lambda self: 1  # Sin diálogos modales: se aceptan solos
+    login_original = aplicacion.login
+    pulsado = []
+
+    def paso():
+        app = QApplication.instance()
+        marcas = sonda.marcas
+        if not pulsado and "login_interactivo" in marcas and time.perf_counter() - INICIO >= marcas["login_interactivo"] + espera_login:
+            for ventana in app.topLevelWidgets():
+                boton = ventana.findChild(QPushButton, "vCBtnAcceder")
+                if boton is not None and ventana.isVisible():
+                    pulsado.append(True)
+                    boton.click()
+        if "principal_reservas" in marcas or time.perf_counter() - INICIO > LIMITE_HIJO:
+            app.closeAllWindows()
+
+    def login(app, precalentamiento):
+        temporizador = QTimer(app)
+        temporizador.timeout.connect(paso)
+        temporizador.start(5)
+        return login_original(app, precalentamiento)
+
+    aplicacion.login = login
+    aplicacion.main()
+    print(json.dumps(sonda.informe()))
+
+
+def main(argv=None):
+    """
+    Punto de entrada de línea de comandos.
+    """
+    parser = argparse.ArgumentParser(description="Mide el tiempo de arranque de la aplicación (primer pintado e interactividad).")
+    parser.add_argument("--repeticiones", type=int, default=5, help="Arranques a medir.")
+    parser.add_argument("--espera-login", type=float, default=1.0, help="Segundos que tarda el usuario en pulsar Acceder.")
+    parser.add_argument("--sqlite", help="Fichero SQLite a usar en lugar de la base de datos configurada.")
+    parser.add_argument("--json", help="Fichero donde guardar los resultados.")
+    parser.add_argument("--hijo", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+    if args.hijo:
+        hijo(args.espera_login)
+        return
+
+    entorno = {**os.environ, "QT_QPA_PLATFORM": "offscreen"}
+    if args.sqlite:
+        entorno.update(HOTEL_DB_BACKEND="sqlite", HOTEL_DB_SQLITE_RUTA=args.sqlite)
+    orden = [sys.executable, "-m", "benchmarks.bench_arranque", "--hijo", "--espera-login", str(args.espera_login)]
+    marcas, procesos = {}, []
+    for _ in range(args.repeticiones):
+        inicio = time.perf_counter()
+        salida = subprocess.run(orden, env=entorno, capture_output=True, text=True, timeout=LIMITE_HIJO * 2)
+        procesos.append((time.perf_counter() - inicio) * 1000)
+        lineas = salida.stdout.strip().splitlines()
+        if salida.returncode != 0 or not lineas:
+            parser.exit(1, f"El arranque falló:\n{salida.stderr}")
+        for nombre, segundos in json.loads(lineas[-1]).items():
+            marcas.setdefault(nombre, []).append(segundos * 1000)
+
+    resultados = {nombre: resumir(tiempos) for nombre, tiempos in marcas.items()}
+    resultados["proceso_completo"] = resumir(procesos)
+    print(f"{args.repeticiones} arranques, pulsando Acceder {args.espera_login} s después de que el login responda")
+    for nombre, datos in resultados.items():
+        print(f"  {nombre:<22} mediana {datos['mediana_ms']:>9} ms  p95 {datos['p95_ms']:>9} ms")
+    if args.json:
+        guardar_json(args.json, {"repeticiones": args.repeticiones, "espera_login_s": args.espera_login, "resultados": resultados})
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,340 @@
+"""
+Benchmark de la capa de datos y de la rejilla de reservas.
+
+Crea (o reutiliza) una base de datos de pruebas separada, la siembra con salones y reservas sintéticas
+con una distribución de fechas realista y mide, para cada tamaño, las operaciones de ReservasDAO y la carga
+del modelo de la rejilla con Qt en modo offscreen. Funciona contra el MySQL local (docker compose up)
+o, sin servidor, contra un fichero SQLite temporal. Se ejecuta desde la carpeta tarea5:
+
+    python -m benchmarks.bench_datos --tamanios 1000 100000 1000000 --json resultados.json
+    python -m benchmarks.bench_datos --backend sqlite --tamanios 1000 100000
+"""
+import argparse
+import datetime
+import heapq
+import os
+import random
+import tempfile
+import time
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")  # La rejilla se mide sin abrir ventanas
+
+import mysql.connector
+from PySide6.QtWidgets import QApplication, QTableView
+
+from benchmarks.comun import guardar_json, medir, resumir
+from controladores.main_controller import RESERVAS_POR_PAGINA
+from modelos.cache import CacheInformes, invalidar_catalogos
+from modelos.backends import BACKEND, BACKENDS, DB_CONFIG, SQLITE_RUTA, crear_backend
+from modelos.conexion import configurar_pool, cerrar_pool
+from modelos.datos import ReservasDAO, TiposReservasDAO
+from modelos.disponibilidad import disponibilidad
+from modelos.informes import informe_mensual
+from modelos.migraciones import migrar
+from modelos.models import ReservaModel
+from modelos.tabla_reservas import ReservasTableModel
+
+TAMANIOS = [1_000, 100_000, 1_000_000]  # Reservas totales de cada ronda
+LOTE_INSERCION = 5000  # Filas por INSERT al sembrar
+TIPOS_RESERVA = ["Banquete", "Jornada", "Congreso"]
+TIPOS_COCINA = ["Bufé", "Carta", "Pedir cita con el chef", "No precisa"]
+NOMBRES = ["Ana", "Luis", "Marta", "Jorge", "Lucía", "Pablo", "Sara", "Iván", "Elena", "Hugo"]
+APELLIDOS = ["García", "López", "Martín", "Sánchez", "Pérez", "Gómez", "Ruiz", "Díaz", "Moreno", "Álvarez"]
+
+
+def preparar_base_datos(motor, destino):
+    """
+    Crea la base de datos de pruebas si no existe, apunta el pool del proceso a ella y aplica las migraciones.
+
+    Args:
+        motor (str): "mysql" o "sqlite".
+        destino (str): Nombre de la base de datos MySQL o ruta del fichero SQLite (nunca los de la aplicación).
+
+    Returns:
+        PoolConexiones: El pool conectado a la base de datos de pruebas.
+    """
+    if motor == "mysql":
+        servidor = {clave: valor for clave, valor in DB_CONFIG.items() if clave != "database"}
+        conn = mysql.connector.connect(**servidor)
+        try:
+            cursor = conn.cursor()
+            cursor.execute(f"CREATE DATABASE IF NOT EXISTS `{destino}`")
+            cursor.close()
+        finally:
+            conn.close()
+        backend = crear_backend(motor, config={**DB_CONFIG, "database": destino})
+    else:
+        backend = crear_backend(motor, ruta=destino)
+    pool = configurar_pool(backend=backend)
+    migrar(pool)
+    return pool
+
+
+def _destino_por_defecto(motor):
+    """
+    Base de datos de pruebas por defecto de cada motor.
+    """
+    return "TAREA3DI_BENCH" if motor == "mysql" else os.path.join(tempfile.gettempdir(), "hotel_bench.db")
+
+
+def _es_de_la_aplicacion(motor, destino):
+    """
+    Indica si el destino es la base de datos de la aplicación, que el benchmark nunca debe vaciar.
+    """
+    if motor == "mysql":
+        return destino == DB_CONFIG["database"]
+    return os.path.abspath(destino) == os.path.abspath(SQLITE_RUTA)
+
+
+def _asegurar_catalogo(cursor, backend, tabla, nombres):
+    """
+    Inserta las filas que falten en una tabla de catálogo hasta tener tantas como nombres.
+    """
+    cursor.execute(f"SELECT COUNT(*) FROM {tabla}")
+    existentes = cursor.fetchone()[0]
+    if existentes < len(nombres):
+        query = backend.traducir(f"INSERT INTO {tabla} (nombre) VALUES (%s)")
+        cursor.executemany(query, [(n,) for n in nombres[existentes:]])
+
+
+def _peso_dia(fecha):
+    """
+    Peso relativo de un día en la distribución de reservas: más fines de semana, verano y diciembre.
+    """
+    peso = 3.0 if fecha.weekday() >= 4 else 1.0
+    if fecha.month in (6, 7, 8, 9):
+        peso *= 1.5
+    elif fecha.month == 12:
+        peso *= 1.3
+    return peso
+
+
+def generar_reservas(total, salones, tipos_cocina, rng, hoy=None):
+    """
+    Genera reservas sintéticas repartidas entre los salones, con una fecha distinta por salón y día
+    (como exige el índice único) elegida según _peso_dia, la mitad en el pasado y la mitad en el futuro.
+    Las jornadas de los congresos se recortan para que no lleguen a la reserva siguiente del salón.
+
+    Args:
+        total (int): Número de reservas a generar.
+        salones (list): IDs de los salones.
+        tipos_cocina (list): IDs de los tipos de cocina.
+        rng (random.Random): Generador aleatorio (con semilla, para repetir la misma carga).
+        hoy (date): Fecha central del reparto (por defecto, hoy).
+
+    Returns:
+        list: Tuplas (tipo_reserva_id, salon_id, tipo_cocina_id, persona, telefono, fecha, ocupacion, jornadas, habitaciones).
+    """
+    hoy = hoy or datetime.date.today()
+    reservas = []
+    for i, salon_id in enumerate(salones):
+        cupo = total // len(salones) + (1 if i < total % len(salones) else 0)
+        dias = max(int(cupo * 1.5), 365)  # Deja huecos libres: no todos los días están ocupados
+        inicio = hoy - datetime.timedelta(days=dias // 2)
+        # Muestreo ponderado sin reemplazo (Efraimidis-Spirakis): se quedan los cupo días con mayor clave
+        claves = ((rng.random() ** (1 / _peso_dia(inicio + datetime.timedelta(days=d))), d) for d in range(dias))
+        elegidos = sorted(d for _, d in heapq.nlargest(cupo, claves))
+        for d, d_siguiente in zip(elegidos, elegidos[1:] + [dias + 3]):
+            tipo = rng.choices((1, 2, 3), weights=(6, 3, 1))[0]
+            congreso = tipo == 3
+            reservas.append((
+                tipo, salon_id, rng.choice(tipos_cocina),
+                f"{rng.choice(NOMBRES)} {rng.choice(APELLIDOS)}", f"6{rng.randrange(10 ** 8):08d}",
+                inicio + datetime.timedelta(days=d), rng.randint(2, 300),
+                min(rng.randint(1, 3), d_siguiente - d) if congreso else 0, rng.randint(0, 1) if congreso else 0,
+            ))
+    return reservas
+
+
+def sembrar(pool, total, num_salones, rng):
+    """
+    Vacía las reservas de la base de datos de pruebas y la llena con reservas sintéticas.
+
+    Args:
+        pool (PoolConexiones): Pool de la base de datos de pruebas.
+        total (int): Número de reservas.
+        num_salones (int): Número de salones entre los que repartirlas.
+        rng (random.Random): Generador aleatorio.
+
+    Returns:
+        dict: Segundos de generación e inserción y salones usados.
+    """
+    backend = pool.backend
+    with pool.conexion() as conn:
+        cursor = backend.cursor(conn)
+        try:
+            _asegurar_catalogo(cursor, backend, "tipos_reservas", TIPOS_RESERVA)
+            _asegurar_catalogo(cursor, backend, "tipos_cocina", TIPOS_COCINA)
+            _asegurar_catalogo(cursor, backend, "salones", [f"Salón {n + 1}" for n in range(num_salones)])
+            cursor.execute(backend.traducir("SELECT salon_id FROM salones ORDER BY salon_id LIMIT %s"), (num_salones,))
+            salones = [row[0] for row in cursor.fetchall()]
+            cursor.execute("SELECT tipo_cocina_id FROM tipos_cocina")
+            tipos_cocina = [row[0] for row in cursor.fetchall()]
+            cursor.execute("DELETE FROM reservas")
+
+            inicio = time.perf_counter()
+            reservas = generar_reservas(total, salones, tipos_cocina, rng)
+            generacion = time.perf_counter() - inicio
+
+            inicio = time.perf_counter()
+            query = backend.traducir("""
+            INSERT INTO reservas (tipo_reserva_id, salon_id, tipo_cocina_id, persona, telefono, fecha, ocupacion, jornadas, habitaciones)
+            VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)
+            """)
+            for desde in range(0, len(reservas), LOTE_INSERCION):
+                backend.iniciar_transaccion(conn)  # Un commit por lote en lugar de uno por fila
+                cursor.executemany(query, reservas[desde:desde + LOTE_INSERCION])
+                conn.commit()
+            backend.analizar(cursor, "reservas")
+            insercion = time.perf_counter() - inicio
+        finally:
+            cursor.close()
+    invalidar_catalogos()  # Los catálogos en caché pueden ser de la ronda anterior
+    return {"salones": salones, "generacion_s": round(generacion, 3), "insercion_s": round(insercion, 3)}
+
+
+def _informe_con_bucles(dao, desde, hasta):
+    """
+    Totales por mes y salón calculados como se haría sin el módulo de informes: todas las reservas y un bucle en Python.
+    """
+    totales = {}
+    for reserva in dao.get_all():
+        if desde <= reserva.fecha < hasta:
+            grupo = totales.setdefault((reserva.fecha.year, reserva.fecha.month, reserva.salon_id), [0, 0])
+            grupo[0] += 1
+            grupo[1] += reserva.ocupacion
+    return totales
+
+
+def medir_operaciones(pool, salon_id, repeticiones, repeticiones_pesadas, rng, app):
+    """
+    Mide las operaciones de ReservasDAO y la carga de la rejilla sobre los datos sembrados.
+
+    Args:
+        pool (PoolConexiones): Pool de la base de datos de pruebas.
+        salon_id (int): Salón sobre el que se hacen las consultas.
+        repeticiones (int): Repeticiones de las operaciones ligeras.
+        repeticiones_pesadas (int): Repeticiones de las que leen el salón completo.
+        rng (random.Random): Generador aleatorio.
+        app (QApplication): Aplicación Qt para procesar los eventos de la vista.
+
+    Returns:
+        dict: Resumen de tiempos por operación.
+    """
+    dao = ReservasDAO(pool)
+    mapa_tipos = {tipo.tipo_reserva_id: tipo.nombre for tipo in TiposReservasDAO(pool).get_all()}
+    resultados = {}
+
+    historial = dao.get_by_salon_id(salon_id) or []
+    resultados["get_by_salon_id"] = resumir(medir(lambda: dao.get_by_salon_id(salon_id), repeticiones_pesadas))
+    resultados["get_by_salon_id"]["filas"] = len(historial)
+
+    resultados["carga_disponibilidad"] = resumir(medir(
+        lambda: disponibilidad.cargar_salon(salon_id, dao.get_ocupaciones(salon_id)), repeticiones_pesadas
+    ))
+    fechas = [reserva.fecha for reserva in historial] or [datetime.date.today()]
+    resultados["checkFechaOcupada"] = resumir(medir(
+        lambda: dao.checkFechaOcupada(rng.choice(fechas) + datetime.timedelta(days=rng.randint(-1, 1)), salon_id, 0, rng.choice((0, 2))),
+        repeticiones,
+    ))
+
+    # Altas en días posteriores a todos los sembrados, para no chocar con el índice único
+    siguiente = [max(fechas) + datetime.timedelta(days=1)]
+    creadas = []
+
+    def crear(releer=False):
+        reserva = ReservaModel(None, 1, salon_id, 1, "Benchmark", "600000000", siguiente[0], 10, 0, 0)
+        siguiente[0] += datetime.timedelta(days=1)
+        creadas.append(dao.create(reserva, releer=releer))
+
+    def actualizar(releer=False):
+        posicion = rng.randrange(len(creadas))
+        reserva = creadas[posicion]
+        reserva.ocupacion = rng.randint(2, 300)
+        creadas[posicion] = dao.update(reserva, releer=releer)  # Con la nueva versión, para la siguiente modificación
+
+    # Con releer=True se mide el comportamiento anterior: una consulta más por escritura para releer la fila
+    resultados["create"] = resumir(medir(crear, repeticiones))
+    resultados["create_releer"] = resumir(medir(lambda: crear(True), repeticiones))
+    resultados["update"] = resumir(medir(actualizar, repeticiones))
+    resultados["update_releer"] = resumir(medir(lambda: actualizar(True), repeticiones))
+
+    # Rejilla: lo que hace MainController.config_table (primera página) y la carga del historial completo
+    vista = QTableView()
+    modelo = ReservasTableModel()
+    vista.setModel(modelo)
+    vista.resize(800, 600)
+    vista.show()
+    hoy = datetime.date.today()
+
+    def config_table():
+        reservas = dao.get_rango(salon_id, desde=hoy, limite=RESERVAS_POR_PAGINA + 1)
+        modelo.cargar(reservas[:RESERVAS_POR_PAGINA], mapa_tipos, len(reservas) > RESERVAS_POR_PAGINA, True)
+        app.processEvents()
+
+    def rejilla_completa():
+        modelo.cargar(historial, mapa_tipos)
+        app.processEvents()
+
+    resultados["config_table"] = resumir(medir(config_table, repeticiones))
+    resultados["rejilla_completa"] = resumir(medir(rejilla_completa, repeticiones_pesadas))
+    resultados["rejilla_completa"]["filas"] = len(historial)
+    vista.close()
+
+    # Informe de los doce meses de todos los salones: con bucles sobre get_all, con la consulta agregada
+    # (una caché nueva en cada repetición) y servido desde la caché de informes
+    desde = hoy.replace(day=1)
+    hasta = desde.replace(year=desde.year + 1)
+    dao_tipos = TiposReservasDAO(pool)
+    cache = CacheInformes()
+    resultados["informe_bucles"] = resumir(medir(lambda: _informe_con_bucles(dao, desde, hasta), repeticiones_pesadas))
+    resultados["informe_sql"] = resumir(medir(
+        lambda: informe_mensual(desde, hasta, dao, dao_tipos, CacheInformes()), repeticiones_pesadas
+    ))
+    informe_mensual(desde, hasta, dao, dao_tipos, cache)
+    resultados["informe_cache"] = resumir(medir(lambda: informe_mensual(desde, hasta, dao, dao_tipos, cache), repeticiones))
+    return resultados
+
+
+def main(argv=None):
+    """
+    Punto de entrada de línea de comandos.
+    """
+    parser = argparse.ArgumentParser(description="Benchmark de ReservasDAO y de la rejilla de reservas con datos sintéticos.")
+    parser.add_argument("--tamanios", type=int, nargs="+", default=TAMANIOS, help="Reservas totales de cada ronda.")
+    parser.add_argument("--salones", type=int, default=20, help="Salones entre los que se reparten las reservas.")
+    parser.add_argument("--repeticiones", type=int, default=50, help="Repeticiones de las operaciones ligeras.")
+    parser.add_argument("--repeticiones-pesadas", type=int, default=5, help="Repeticiones de las lecturas del salón completo.")
+    parser.add_argument("--backend", choices=sorted(BACKENDS), default=BACKEND, help="Motor de la base de datos de pruebas.")
+    parser.add_argument("--base-datos", help="Base de datos MySQL o fichero SQLite de pruebas; se vacía en cada ronda.")
+    parser.add_argument("--semilla", type=int, default=1234)
+    parser.add_argument("--json", help="Fichero donde guardar los resultados.")
+    args = parser.parse_args(argv)
+
+    args.base_datos = args.base_datos or _destino_por_defecto(args.backend)
+    if _es_de_la_aplicacion(args.backend, args.base_datos):
+        parser.error("La base de datos de pruebas no puede ser la de la aplicación: se vacía en cada ronda.")
+
+    app = QApplication.instance() or QApplication([])
+    rng = random.Random(args.semilla)
+    pool = preparar_base_datos(args.backend, args.base_datos)
+    rondas = []
+    try:
+        for total in args.tamanios:
+            siembra = sembrar(pool, total, args.salones, rng)
+            salon_id = siembra.pop("salones")[0]
+            operaciones = medir_operaciones(pool, salon_id, args.repeticiones, args.repeticiones_pesadas, rng, app)
+            rondas.append({"reservas": total, "salones": args.salones, "siembra": siembra, "operaciones": operaciones})
+
+            print(f"\n{total} reservas en {args.salones} salones, {pool.backend.describir()} (inserción {siembra['insercion_s']} s)")
+            for nombre, datos in operaciones.items():
+                print(f"  {nombre:<22} media {datos['media_ms']:>10} ms  p95 {datos['p95_ms']:>10} ms")
+    finally:
+        cerrar_pool()
+
+    if args.json:
+        guardar_json(args.json, {"parametros": {**vars(args), "json": None}, "rondas": rondas})
+
+
+if __name__ == "__main__":
+    main()
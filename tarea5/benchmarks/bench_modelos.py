@@ -0,0 +1,109 @@
+"""
+Benchmark de memoria de los modelos: compara ReservaModel con __slots__ con la clase anterior
+(atributos en un __dict__ por instancia) y con las tuplas que guarda la rejilla.
+
+No necesita base de datos: genera las filas en memoria. Se ejecuta desde la carpeta tarea5:
+
+    python -m benchmarks.bench_modelos --filas 1000000
+"""
+import argparse
+import datetime
+import gc
+import time
+import tracemalloc
+
+from benchmarks.comun import guardar_json
+from modelos.models import ReservaModel
+
+
+class ReservaModelAnterior:
+    """
+    Copia de ReservaModel tal como era antes de usar __slots__, para comparar.
+    """
+    def __init__(self, reserva_id, tipo_reserva_id, salon_id, tipo_cocina_id, persona, telefono, fecha, ocupacion, jornadas, habitaciones=0):
+        self.reserva_id = reserva_id
+        self.tipo_reserva_id = tipo_reserva_id
+        self.salon_id = salon_id
+        self.tipo_cocina_id = tipo_cocina_id
+        self.persona = persona
+        self.telefono = telefono
+        self.fecha = fecha
+        self.ocupacion = ocupacion
+        self.jornadas = jornadas
+        self.habitaciones = habitaciones
+
+
+def generar_filas(total):
+    """
+    Genera filas sintéticas con las columnas de ReservasDAO.COLUMNAS.
+    Los textos y fechas se comparten entre filas para medir solo el coste de los objetos del modelo.
+
+    Args:
+        total (int): Número de filas.
+
+    Returns:
+        list: Lista de tuplas.
+    """
+    inicio = datetime.date(2020, 1, 1)
+    fechas = [inicio + datetime.timedelta(days=i) for i in range(3650)]
+    personas = [f"Cliente {i}" for i in range(1000)]
+    telefonos = [f"6{i:08d}" for i in range(1000)]
+    return [
+        (i, i % 3 + 1, i % 4 + 1, i % 5 + 1, personas[i % 1000], telefonos[i % 1000], fechas[i % 3650], 50, 0, 0)
+        for i in range(1, total + 1)
+    ]
+
+
+def medir(nombre, construir, filas):
+    """
+    Construye un objeto por fila y mide la memoria que ocupan y el tiempo que cuesta crearlos.
+
+    Args:
+        nombre (str): Nombre del caso.
+        construir (callable): Función que recibe una fila y devuelve el objeto.
+        filas (list): Filas de entrada.
+
+    Returns:
+        dict: Memoria total en MiB, bytes por fila y segundos de construcción.
+    """
+    gc.collect()
+    tracemalloc.start()
+    inicio = time.perf_counter()
+    objetos = [construir(fila) for fila in filas]
+    segundos = time.perf_counter() - inicio
+    memoria, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del objetos
+    return {
+        "caso": nombre,
+        "mib": round(memoria / 2 ** 20, 1),
+        "bytes_por_fila": round(memoria / len(filas), 1),
+        "segundos": round(segundos, 3),
+    }
+
+
+def main(argv=None):
+    """
+    Punto de entrada de línea de comandos.
+    """
+    parser = argparse.ArgumentParser(description="Compara la memoria de los modelos de reserva.")
+    parser.add_argument("--filas", type=int, default=1_000_000)
+    parser.add_argument("--json", help="Fichero donde guardar los resultados.")
+    args = parser.parse_args(argv)
+
+    filas = generar_filas(args.filas)
+    casos = [
+        ("anterior (__dict__)", lambda fila: ReservaModelAnterior(*fila)),
+        ("ReservaModel (__slots__)", ReservaModel.desde_fila),
+        ("tupla de la rejilla", lambda fila: (fila[0], fila[6], fila[4], fila[5], fila[1])),
+    ]
+    resultados = [medir(nombre, construir, filas) for nombre, construir in casos]
+
+    for datos in resultados:
+        print(f"{datos['caso']:<26} {datos['mib']:>9} MiB  {datos['bytes_por_fila']:>7} B/fila  {datos['segundos']:>7} s")
+    if args.json:
+        guardar_json(args.json, {"filas": args.filas, "resultados": resultados})
+
+
+if __name__ == "__main__":
+    main()
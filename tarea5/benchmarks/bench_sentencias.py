@@ -0,0 +1,84 @@
+"""
+Micro-benchmark de la forma de consultar: SELECT * con cursor diccionario (comportamiento anterior)
+frente a columnas explícitas con sentencias preparadas y tuplas (ReservasDAO actual).
+
+Se ejecuta desde la carpeta tarea5 contra la base de datos configurada:
+
+    python -m benchmarks.bench_sentencias --repeticiones 500 --salon 1
+"""
+import argparse
+import datetime
+
+from benchmarks.comun import guardar_json, medir, resumir
+from modelos.conexion import get_pool
+from modelos.datos import ReservasDAO
+from modelos.models import ReservaModel
+
+
+def _anterior_por_salon(conn, salon_id):
+    """
+    Reproduce el ReservasDAO.get_by_salon_id original: SELECT * y un diccionario por fila.
+    """
+    cursor = conn.cursor(dictionary=True, buffered=True)
+    cursor.execute("SELECT * FROM reservas WHERE salon_id = %s ORDER BY fecha", (salon_id,))
+    reservas = [
+        ReservaModel(
+            row['reserva_id'], row['tipo_reserva_id'], row['salon_id'], row['tipo_cocina_id'],
+            row['persona'], row['telefono'], row['fecha'], row['ocupacion'], row['jornadas'], row['habitaciones']
+        ) for row in cursor.fetchall()
+    ]
+    cursor.close()
+    return reservas
+
+
+def _anterior_fecha_ocupada(conn, fecha, salon_id):
+    """
+    Reproduce el ReservasDAO.checkFechaOcupada original contra la base de datos.
+    """
+    cursor = conn.cursor(dictionary=True, buffered=True)
+    cursor.execute("SELECT * FROM reservas where fecha = %s and salon_id = %s and reserva_id != %s", (fecha, salon_id, 0))
+    ocupada = cursor.fetchone() is not None
+    cursor.close()
+    return ocupada
+
+
+def main(argv=None):
+    """
+    Punto de entrada de línea de comandos.
+    """
+    parser = argparse.ArgumentParser(description="Compara SELECT * con cursor diccionario frente a sentencias preparadas.")
+    parser.add_argument("--repeticiones", type=int, default=200)
+    parser.add_argument("--salon", type=int, default=1, help="Salón cuyas reservas se leen.")
+    parser.add_argument("--json", help="Fichero donde guardar los resultados.")
+    args = parser.parse_args(argv)
+
+    pool = get_pool()
+    if not pool.backend.preparadas:
+        parser.error(f"Este benchmark compara sentencias preparadas de MySQL y el motor configurado es {pool.backend.nombre}.")
+    dao = ReservasDAO(pool)
+    fecha = datetime.date.today()
+    consulta_ocupada = "SELECT reserva_id FROM reservas WHERE fecha = %s AND salon_id = %s AND reserva_id != %s LIMIT 1"
+
+    with pool.conexion() as conn:
+        casos = {
+            "por_salon_anterior": lambda: _anterior_por_salon(conn, args.salon),
+            "fecha_ocupada_anterior": lambda: _anterior_fecha_ocupada(conn, fecha, args.salon),
+        }
+        resultados = {nombre: resumir(medir(funcion, args.repeticiones)) for nombre, funcion in casos.items()}
+
+    casos = {
+        "por_salon_preparada": lambda: dao.get_by_salon_id(args.salon),
+        "fecha_ocupada_preparada": lambda: dao.consultar(consulta_ocupada, (fecha, args.salon, 0), fetch_one=True),
+    }
+    for nombre, funcion in casos.items():
+        funcion()  # Calentamiento: prepara la sentencia en la conexión
+        resultados[nombre] = resumir(medir(funcion, args.repeticiones))
+
+    for nombre, datos in resultados.items():
+        print(f"{nombre:<26} media {datos['media_ms']:>8} ms  mediana {datos['mediana_ms']:>8} ms  p95 {datos['p95_ms']:>8} ms")
+    if args.json:
+        guardar_json(args.json, {"repeticiones": args.repeticiones, "resultados": resultados})
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""
+Utilidades compartidas por los benchmarks: medición de tiempos, resumen estadístico y salida en JSON.
+"""
+import json
+import platform
+import statistics
+import subprocess
+import time
+
+
+def medir(funcion, repeticiones):
+    """
+    Ejecuta la función las veces indicadas y devuelve los tiempos en milisegundos.
+
+    Args:
+        funcion (callable): Función sin argumentos a medir.
+        repeticiones (int): Número de ejecuciones.
+
+    Returns:
+        list: Tiempo de cada ejecución, en milisegundos.
+    """
+    tiempos = []
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        funcion()
+        tiempos.append((time.perf_counter() - inicio) * 1000)
+    return tiempos
+
+
+def resumir(tiempos):
+    """
+    Resume una serie de tiempos en media, mediana, percentil 95 y máximo.
+
+    Args:
+        tiempos (list): Tiempos en milisegundos.
+
+    Returns:
+        dict: Estadísticos redondeados a microsegundos.
+    """
+    ordenados = sorted(tiempos)
+    return {
+        "n": len(ordenados),
+        "media_ms": round(statistics.fmean(ordenados), 3),
+        "mediana_ms": round(statistics.median(ordenados), 3),
+        "p95_ms": round(ordenados[max(int(len(ordenados) * 0.95) - 1, 0)], 3),
+        "max_ms": round(ordenados[-1], 3),
+    }
+
+
+def entorno():
+    """
+    Describe la máquina y la versión del código, para poder comparar resultados entre versiones.
+
+    Returns:
+        dict: Versión de Python, plataforma y commit de git (si se puede obtener).
+    """
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, timeout=5
+        ).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        commit = None
+    return {
+        "python": platform.python_version(),
+        "plataforma": platform.platform(),
+        "commit": commit,
+        "fecha": time.strftime("%Y-%m-%dT%H:%M:%S"),
+    }
+
+
+def guardar_json(ruta, datos):
+    """
+    Guarda los resultados en un fichero JSON junto con la descripción del entorno.
+
+    Args:
+        ruta (str): Fichero de salida.
+        datos (dict): Resultados del benchmark.
+    """
+    with open(ruta, "w", encoding="utf-8") as fichero:
+        json.dump({"entorno": entorno(), **datos}, fichero, indent=2, ensure_ascii=False, default=str)
@@ -1,13 +1,28 @@
-from PySide6.QtWidgets import QAbstractItemView, QDialog, QHeaderView, QMainWindow
+import datetime
+
+from PySide6.QtWidgets import QAbstractItemView, QCompleter, QDialog, QFileDialog, QHeaderView, QLabel, QLineEdit, QMainWindow, QPushButton
+from PySide6.QtCore import QModelIndex, Qt, QTimer, Signal
 from PySide6.QtGui import QStandardItem, QStandardItemModel
-from PySide6.QtCore import QModelIndex
 
 from vistas.reservas_ui import Ui_MostrarReservas
-from modelos.datos import ReservasDAO, SalonesDAO, TiposCocinaDAO, TiposReservasDAO, BaseDAO
-from controladores.reserva_controller import ReversaController
+from modelos.busqueda import analizar, es_busqueda_valida, indice_huespedes
+from modelos.cache import reservas_salon
+from modelos.datos import ReservasDAO, SalonesDAO, TiposCocinaDAO, TiposReservasDAO
+from modelos.metricas import metricas
+from modelos.precalentamiento import RESERVAS_POR_PAGINA, primera_pagina
+from modelos.tabla_reservas import ReservasTableModel
 from utilidades.message_box import MessageBox
+from utilidades.ejecutor import EjecutorDatos
+from utilidades.sonda_arranque import sonda
+from utilidades.vigilante_cambios import VigilanteCambios
+
+SALONES_VECINOS = 1  # Salones a cada lado del seleccionado cuya primera página se precarga en segundo plano
+ESPERA_BUSQUEDA_MS = 150  # Pausa al escribir tras la que se lanza la búsqueda de huéspedes
+
 
 class MainCotroller(QMainWindow):
+    exportacion_avanzada = Signal(int)  # Reservas escritas por la exportación en curso; se emite desde su hilo
+
     def __init__(self):
         """
         Constructor de la clase MainCotroller, que se encarga de gestionar la ventana principal 
@@ -17,6 +32,18 @@ class MainCotroller(QMainWindow):
         self.ui = Ui_MostrarReservas()  # Inicializa la interfaz de usuario
         self.ui.setupUi(self)  # Configura la interfaz en la ventana principal
         self.salon_maping = {}  # Mapa para almacenar las relaciones entre salon_id y su nombre
+        self.salon_selecionado = None  # Salón seleccionado (se asigna al cargar los salones)
+        self.reserva_seleccionada = 0  # Reserva seleccionada en la tabla
+        self.controlador = None  # Formulario de reservas, que se crea al abrirlo por primera vez y se reutiliza
+        self.ocupacion = None  # Ventana del mapa de ocupación, que se crea al abrirla por primera vez
+        self.ejecutor = EjecutorDatos(self)  # Ejecuta las consultas fuera del hilo de la interfaz
+        self.ejecutor.ocupado_cambiado.connect(self.mostrar_cargando)
+        self.precarga = EjecutorDatos(self)  # Precargas de salones vecinos: no muestran "Cargando..."
+        self.busqueda = EjecutorDatos(self)  # Búsquedas de huéspedes: tampoco bloquean la tabla
+        self.exportacion = EjecutorDatos(self)  # Exportaciones: largas, no bloquean la tabla ni retrasan sus páginas
+        self.vigilante = VigilanteCambios(self)  # Cambios hechos desde otros puestos
+        self.vigilante.cambios_recibidos.connect(self.aplicar_cambios)
+        self.vigilante.iniciar()  # Antes de la primera carga, para no perder cambios hechos mientras tanto
 
         self.init_daos()  # Inicializa los DAOs (Data Access Objects) necesarios
         self.init_ui()  # Configura la UI
@@ -29,37 +56,47 @@ class MainCotroller(QMainWindow):
             self.dao_salon = SalonesDAO()  # DAO para salones
             self.dao_tipo_cocina = TiposCocinaDAO()  # DAO para tipos de cocina
             self.dao_tipo_reserva = TiposReservasDAO()  # DAO para tipos de reservas
+            self.dao_reserva = ReservasDAO()  # DAO para las reservas
         except Exception as e:
             MessageBox("Error al inicializar los DAOS", "error", str(e)).show()  # Muestra un mensaje de error si ocurre una excepción
 
     def init_ui(self):
         """
-        Configura la interfaz de usuario, incluyendo la obtención de salones, 
-        configuración de eventos y de la tabla de reservas.
+        Configura la interfaz de usuario: conecta los eventos y pide en segundo plano
+        la lista de salones, que a su vez carga la tabla de reservas.
         """
-        try:
-            self.get_salones()  # Obtiene la lista de salones
-            self.config_events()  # Configura los eventos de la UI
-            self.config_table()  # Configura la tabla de reservas
-        except Exception as e:
-            MessageBox("Error al configurar la UI", "error", str(e)).show()  # Muestra un mensaje de error si algo sale mal
+        self.config_grid()  # Configura la tabla de reservas
+        self.config_busqueda()  # Configura el cuadro de búsqueda de huéspedes
+        self.config_events()  # Configura los eventos de la UI
+        self.ejecutor.ejecutar(
+            self.dao_salon.get_all, clave="salones",
+            al_terminar=self.get_salones,
+            al_fallar=lambda e: MessageBox("Error al configurar la UI", "error", str(e)).show(),
+        )  # Obtiene la lista de salones sin bloquear la ventana
 
-    def get_salones(self):
-        """
-        Obtiene la lista de salones desde la base de datos y los mapea para su uso en la UI.
+    def get_salones(self, salones):
         """
-        salones = self.dao_salon.get_all()  # Obtiene todos los salones de la base de datos
+        Mapea los salones obtenidos de la base de datos para su uso en la UI y carga las reservas del primero.
 
+        Args:
+            salones (list): Lista de objetos SalonModel.
+        """
         if not salones:
-            raise ValueError("La consulta no devolvió salones.")  # Si no se encuentran salones, lanza una excepción
+            MessageBox("Error al configurar la UI", "error", "La consulta no devolvió salones.").show()
+            return
 
         for salon in salones:
             self.salon_maping[salon.salon_id] = salon.nombre  # Asocia el salon_id con su nombre
 
+        self.ui.vcListWidSalones.blockSignals(True)  # Evita recargar la tabla por cada salón añadido
         self.ui.vcListWidSalones.clear()  # Limpia la lista de salones
         self.ui.vcListWidSalones.addItems(list(self.salon_maping.values()))  # Añade los nombres de los salones a la lista
         self.ui.vcListWidSalones.setCurrentRow(0)  # Selecciona el primer salón
-        self.salon_selecionado = 1  # Establece el salón seleccionado por defecto
+        self.ui.vcListWidSalones.blockSignals(False)
+        self.salon_selecionado = salones[0].salon_id  # Establece el salón seleccionado por defecto
+
+        self.config_table()  # Configura la tabla de reservas
+        self.cargar_indice_huespedes()  # En segundo plano: hasta que esté, las búsquedas van a la base de datos
 
     def config_events(self):
         """
@@ -69,6 +106,13 @@ class MainCotroller(QMainWindow):
         self.ui.vcListWidSalones.currentTextChanged.connect(self.salon_changed)  # Conecta el cambio de salón seleccionado a la función salon_changed
         self.ui.vcbtnModificar.clicked.connect(lambda: self.open_modal(False))  # Abre el modal de modificación de reserva
         self.ui.vcbtnReservar.clicked.connect(lambda: self.open_modal(True))  # Abre el modal para una nueva reserva
+        self.btn_anteriores.clicked.connect(self.pedir_anteriores)  # Carga la página de reservas anterior
+        self.btn_exportar.clicked.connect(self.exportar_reservas)  # Exporta las reservas del salón a un fichero
+        self.btn_ocupacion.clicked.connect(self.abrir_ocupacion)  # Muestra la ocupación de todos los salones
+        self.model.siguientes_solicitados.connect(self.pedir_siguientes)  # Carga la página siguiente al llegar al final
+        self.txt_buscar.textEdited.connect(lambda _: self.temporizador_busqueda.start())  # Busca al dejar de escribir
+        self.temporizador_busqueda.timeout.connect(self.buscar_huespedes)
+        self.completer.activated[QModelIndex].connect(self.abrir_resultado)  # Abre la reserva elegida
 
     def salon_changed(self, salon_select):
         """
@@ -81,47 +125,148 @@ class MainCotroller(QMainWindow):
                 self.salon_selecionado = salon_id  # Actualiza el salón seleccionado
                 break
         
-        self.config_table()  # Actualiza la tabla de reservas para el salón seleccionado
+        with metricas.accion("cambio_salon"):  # Las consultas de la recarga se atribuyen al cambio de salón
+            self.config_table()  # Actualiza la tabla de reservas para el salón seleccionado
 
     def config_table(self):
         """
-        Configura la tabla de reservas, mostrando las reservas para el salón seleccionado.
+        Muestra las reservas del salón seleccionado: desde memoria si su primera página está en caché
+        y sigue vigente, o pidiéndolas en segundo plano. Si el usuario cambia de salón antes de que lleguen,
+        el resultado anterior se descarta.
         """
-        dao_reserva = ReservasDAO()  # DAO para las reservas
+        if self.salon_selecionado is None:
+            return
         self.reserva_seleccionada = 0  # Inicializa la variable de reserva seleccionada
-        headers = ["Fecha", "Persona", "Teléfono", "Tipo de Reserva", "Id"]  # Encabezados de la tabla
+        self.ejecutor.cancelar("reservas_siguientes")  # Las páginas pedidas para el salón anterior ya no sirven
+        self.ejecutor.cancelar("reservas_anteriores")
+        pagina = reservas_salon.get(self.salon_selecionado, datetime.date.today())
+        if pagina is not None:
+            self.ejecutor.cancelar("reservas")  # Una carga anterior aún en curso ya no sirve
+            self.mostrar_reservas(pagina)  # Sin consultas ni espera al hilo de datos
+            return
+        self.ejecutor.ejecutar(
+            self.cargar_reservas, self.salon_selecionado, clave="reservas",
+            al_terminar=self.mostrar_reservas,
+            al_fallar=lambda e: MessageBox("Error al cargar las reservas", "error", str(e)).show(),
+        )
+
+    def cargar_reservas(self, salon_id):
+        """
+        Obtiene la primera página de próximas reservas de un salón (desde hoy) y el nombre de cada tipo de reserva,
+        y la guarda en la caché de salones. Se ejecuta fuera del hilo de la interfaz.
 
-        # Obtener datos desde los DAOs
-        reservas = dao_reserva.get_by_salon_id(self.salon_selecionado)  # Obtiene las reservas para el salón seleccionado
-        tipos_reserva = self.dao_tipo_reserva.get_all()  # Obtiene todos los tipos de reserva
+        Args:
+            salon_id (int): El ID del salón.
 
-        # Crear un diccionario para mapear tipo_reserva_id -> nombre
-        mapa_tipos = {tipo.tipo_reserva_id: tipo.nombre for tipo in tipos_reserva}
+        Returns:
+            tuple: (salon_id, lista de objetos ReservaModel, hay más siguientes, diccionario tipo_reserva_id -> nombre,
+                fecha desde la que se han pedido).
+        """
+        return primera_pagina(salon_id, self.dao_reserva, self.dao_tipo_reserva)
 
-        # Mapear cada reserva para agregar el nombre del tipo de reserva
-        for reserva in reservas:
-            reserva.tipo_reserva_nombre = mapa_tipos.get(reserva.tipo_reserva_id, "Desconocido")
-
-        # Crear el modelo de la tabla
-        self.model = QStandardItemModel(len(reservas), len(headers))  # Modelo de la tabla con las filas y columnas necesarias
-        self.model.setHorizontalHeaderLabels(headers)  # Establece los encabezados de la tabla
-
-        # Llenar el modelo con datos de las reservas
-        for row, reserva in enumerate(reservas):
-            fecha_str = reserva.fecha.strftime("%Y-%m-%d")  # 🔹 Convierte la fecha a string
-            self.model.setItem(row, 0, QStandardItem(fecha_str))  # Coloca la fecha en la primera columna
-            self.model.setItem(row, 1, QStandardItem(reserva.persona))  # Coloca el nombre de la persona en la segunda columna
-            self.model.setItem(row, 2, QStandardItem(reserva.telefono))  # Coloca el teléfono en la tercera columna
-            self.model.setItem(row, 3, QStandardItem(reserva.tipo_reserva_nombre))  # Coloca el tipo de reserva
-            self.model.setItem(row, 4, QStandardItem(str(reserva.reserva_id)))  # Coloca el ID de la reserva en la última columna
-
-        # Configura la vista de la tabla
+    def mostrar_reservas(self, resultado):
+        """
+        Muestra en la tabla las reservas recibidas del hilo de acceso a datos.
+
+        Args:
+            resultado (tuple): Resultado de cargar_reservas.
+        """
+        salon_id, reservas, hay_siguientes, mapa_tipos, desde = resultado
+        if salon_id != self.salon_selecionado:
+            return  # El usuario ya cambió de salón
+        # Sustituye las filas sin crear un modelo nuevo; hasta pedir la página anterior no se sabe si hay más antiguas
+        self.model.cargar(reservas, mapa_tipos, hay_siguientes=hay_siguientes, hay_anteriores=True, desde=(desde, 0))
+        self.btn_anteriores.setEnabled(True)
+        sonda.marcar("principal_reservas")  # Solo cuenta la primera vez: salones y primera página visibles
+        self.precargar_vecinos()
+
+    def precargar_vecinos(self):
+        """
+        Pide en segundo plano la primera página de los salones junto al seleccionado en la lista
+        que no estén ya en caché, para que cambiar a ellos se muestre al instante.
+        """
+        actual = self.ui.vcListWidSalones.currentRow()
+        salones = list(self.salon_maping)  # En el mismo orden que la lista
+        hoy = datetime.date.today()
+        for fila in range(actual - SALONES_VECINOS, actual + SALONES_VECINOS + 1):
+            if fila == actual or not 0 <= fila < len(salones) or reservas_salon.contiene(salones[fila], hoy):
+                continue
+            with metricas.accion("precarga"):
+                self.precarga.ejecutar(self.cargar_reservas, salones[fila], clave=f"precarga_{salones[fila]}")
+
+    def pagina(self, salon_id, despues_de=None, antes_de=None):
+        """
+        Obtiene la página siguiente o anterior a una clave. Se ejecuta fuera del hilo de la interfaz.
+
+        Args:
+            salon_id (int): El ID del salón.
+            despues_de (tuple): Clave (fecha, reserva_id) tras la que empieza la página siguiente.
+            antes_de (tuple): Clave (fecha, reserva_id) antes de la que termina la página anterior.
+
+        Returns:
+            tuple: (salon_id, lista de objetos ReservaModel, hay más páginas en esa dirección).
+        """
+        if antes_de is not None:
+            reservas = self.dao_reserva.get_anteriores(salon_id, antes_de, limite=RESERVAS_POR_PAGINA + 1)
+            return salon_id, reservas[-RESERVAS_POR_PAGINA:], len(reservas) > RESERVAS_POR_PAGINA
+        reservas = self.dao_reserva.get_rango(salon_id, despues_de=despues_de, limite=RESERVAS_POR_PAGINA + 1)
+        return salon_id, reservas[:RESERVAS_POR_PAGINA], len(reservas) > RESERVAS_POR_PAGINA
+
+    def pedir_siguientes(self):
+        """
+        Pide la página siguiente cuando la vista llega al final de las reservas cargadas.
+        """
+        with metricas.accion("pagina_siguiente"):
+            self.ejecutor.ejecutar(
+                self.pagina, self.salon_selecionado, despues_de=self.model.ultima_clave(), clave="reservas_siguientes",
+                al_terminar=self.mostrar_siguientes,
+                al_fallar=lambda e: MessageBox("Error al cargar las reservas", "error", str(e)).show(),
+            )
+
+    def mostrar_siguientes(self, resultado):
+        """
+        Añade al final de la tabla la página siguiente.
+        """
+        salon_id, reservas, hay_mas = resultado
+        if salon_id == self.salon_selecionado:
+            self.model.agregar_siguientes(reservas, hay_mas)
+
+    def pedir_anteriores(self):
+        """
+        Pide la página de reservas anterior a la primera mostrada.
+        """
+        clave = self.model.primera_clave() or (datetime.date.today(), 0)  # Sin filas, se parte de hoy hacia atrás
+        self.btn_anteriores.setEnabled(False)
+        with metricas.accion("pagina_anterior"):
+            self.ejecutor.ejecutar(
+                self.pagina, self.salon_selecionado, antes_de=clave, clave="reservas_anteriores",
+                al_terminar=self.mostrar_anteriores,
+                al_fallar=lambda e: MessageBox("Error al cargar las reservas", "error", str(e)).show(),
+            )
+
+    def mostrar_anteriores(self, resultado):
+        """
+        Añade al principio de la tabla la página anterior, manteniendo a la vista las filas que ya se veían.
+        """
+        salon_id, reservas, hay_mas = resultado
+        if salon_id != self.salon_selecionado:
+            return
+        self.model.agregar_anteriores(reservas, hay_mas)
+        self.btn_anteriores.setEnabled(hay_mas)
+        if reservas:
+            self.ui.vcGridReservas.scrollTo(self.model.index(len(reservas) - 1, 0), QAbstractItemView.PositionAtTop)
+
+    def config_grid(self):
+        """
+        Configura una sola vez la vista de la tabla de reservas y su modelo.
+        """
+        self.model = ReservasTableModel(self)  # Modelo de la tabla, reutilizado en cada recarga
         self.ui.vcGridReservas.setModel(self.model)  # Establece el modelo de datos en la vista de la tabla
-        self.ui.vcGridReservas.setColumnHidden(4, True)  # Esconde la columna 4 (ID) de la vista
-        self.ui.vcGridReservas.resizeColumnsToContents()  # Ajusta el tamaño de las columnas automáticamente
+        self.ui.vcGridReservas.setColumnHidden(ReservasTableModel.COLUMNA_ID, True)  # Esconde la columna del ID de la vista
         self.ui.vcGridReservas.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)  # 🔹 Estira las columnas para ocupar todo el espacio disponible
         self.ui.vcGridReservas.horizontalHeader().setMinimumSectionSize(100)  # Establece un tamaño mínimo de sección
         self.ui.vcGridReservas.horizontalHeader().setStretchLastSection(True)  # Asegura que la última columna se estire
+        self.ui.vcGridReservas.verticalHeader().setSectionResizeMode(QHeaderView.Fixed)  # Altura fija: la vista no mide cada fila
         self.ui.vcGridReservas.setSelectionBehavior(QAbstractItemView.SelectRows)  # Selecciona filas completas
         self.ui.vcGridReservas.setSelectionMode(QAbstractItemView.SingleSelection)  # 🔹 Solo permite la selección de una fila a la vez
 
@@ -129,34 +274,279 @@ class MainCotroller(QMainWindow):
             QAbstractItemView.EditTrigger.NoEditTriggers
         )  # Desactiva la edición de las celdas de la tabla
 
+        # Botón para paginar hacia atrás: por defecto la tabla solo muestra las próximas reservas
+        self.btn_anteriores = QPushButton("Anteriores", self.ui.vcCentralWidget)
+        self.btn_anteriores.setMinimumSize(self.ui.vcbtnModificar.minimumSize())
+        self.btn_anteriores.setFont(self.ui.vcbtnModificar.font())
+        self.btn_anteriores.setEnabled(False)
+        self.ui.horizontalLayout.insertWidget(0, self.btn_anteriores)
+
+        # Botón para exportar todas las reservas del salón seleccionado
+        self.btn_exportar = QPushButton("Exportar", self.ui.vcCentralWidget)
+        self.btn_exportar.setToolTip("Exportar las reservas del salón a CSV o Parquet")
+        self.btn_exportar.setMinimumSize(self.ui.vcbtnModificar.minimumSize())
+        self.btn_exportar.setFont(self.ui.vcbtnModificar.font())
+        self.ui.horizontalLayout.addWidget(self.btn_exportar)
+        # Progreso de la exportación, aparte de los mensajes de carga de la tabla
+        self.lbl_exportacion = QLabel(self)
+        self.lbl_exportacion.hide()
+        self.statusBar().addPermanentWidget(self.lbl_exportacion)
+        self.exportacion_avanzada.connect(lambda total: self.lbl_exportacion.setText(f"Exportando... {total} reservas"))
+
+        # Botón para ver la ocupación de todos los salones a la vez
+        self.btn_ocupacion = QPushButton("Ocupación", self.ui.vcCentralWidget)
+        self.btn_ocupacion.setToolTip("Mapa de ocupación de todos los salones por día")
+        self.btn_ocupacion.setMinimumSize(self.ui.vcbtnModificar.minimumSize())
+        self.btn_ocupacion.setFont(self.ui.vcbtnModificar.font())
+        self.ui.horizontalLayout.addWidget(self.btn_ocupacion)
+
+    def config_busqueda(self):
+        """
+        Crea el cuadro de búsqueda de huéspedes de todos los salones, con los resultados en una lista desplegable.
+        """
+        self.txt_buscar = QLineEdit(self.ui.vcCentralWidget)
+        self.txt_buscar.setPlaceholderText("Buscar huésped por nombre o teléfono")
+        self.txt_buscar.setClearButtonEnabled(True)
+        self.ui.verticalLayout.insertWidget(1, self.txt_buscar)
+
+        self.resultados = QStandardItemModel(self)  # Reservas encontradas en la última búsqueda
+        self.completer = QCompleter(self.resultados, self)
+        self.completer.setCompletionMode(QCompleter.CompletionMode.UnfilteredPopupCompletion)  # Ya vienen filtradas
+        self.completer.setWidget(self.txt_buscar)  # Sin setCompleter: elegir un resultado no cambia el texto buscado
+
+        # Se busca cuando el usuario deja de escribir un momento, no con cada tecla
+        self.temporizador_busqueda = QTimer(self)
+        self.temporizador_busqueda.setSingleShot(True)
+        self.temporizador_busqueda.setInterval(ESPERA_BUSQUEDA_MS)
+
+    def exportar_reservas(self):
+        """
+        Pide un fichero y exporta en segundo plano todas las reservas del salón seleccionado.
+        El formato se elige por la extensión: CSV, CSV comprimido o Parquet.
+        """
+        if self.salon_selecionado is None:
+            return
+        nombre = self.salon_maping.get(self.salon_selecionado, "reservas")
+        ruta, filtro = QFileDialog.getSaveFileName(
+            self, "Exportar reservas", f"{nombre}.csv",
+            "CSV (*.csv);;CSV comprimido (*.csv.gz);;Parquet (*.parquet)",
+        )
+        if not ruta:
+            return
+        extension = filtro[filtro.find("*") + 1:-1]  # Extensión del filtro elegido, por si el nombre no la lleva
+        if extension and not ruta.lower().endswith((".csv", ".gz", ".parquet")):
+            ruta += extension
+        self.btn_exportar.setEnabled(False)
+        self.lbl_exportacion.setText("Exportando...")
+        self.lbl_exportacion.show()
+
+        def terminar(total):
+            self.btn_exportar.setEnabled(True)
+            self.lbl_exportacion.hide()
+            MessageBox("Exportación terminada", "success", f"{total} reservas exportadas a {ruta}").show()
+
+        def fallar(e):
+            self.btn_exportar.setEnabled(True)
+            self.lbl_exportacion.hide()
+            MessageBox("Error al exportar las reservas", "error", str(e)).show()
+
+        from modelos.exportacion import exportar  # Solo se carga si se exporta
+        # Con su propio ejecutor: la tabla sigue usable y cargando páginas mientras se exporta
+        self.exportacion.ejecutar(
+            exportar, ruta, self.salon_selecionado, clave="exportar",
+            al_avanzar=self.exportacion_avanzada.emit, al_terminar=terminar, al_fallar=fallar,
+        )
+
+    def abrir_ocupacion(self):
+        """
+        Muestra la ventana del mapa de ocupación, creándola la primera vez.
+        """
+        if self.ocupacion is None:
+            from controladores.ocupacion_controller import OcupacionController  # Solo se carga si se abre
+            self.ocupacion = OcupacionController(self)
+            self.ocupacion.salon_elegido.connect(self.seleccionar_salon)
+        if self.ocupacion.isVisible():
+            self.ocupacion.recargar()
+        self.ocupacion.show()
+        self.ocupacion.raise_()
+        self.ocupacion.activateWindow()
+
+    def seleccionar_salon(self, salon_id):
+        """
+        Selecciona un salón en la lista, lo que carga sus reservas en la tabla.
+
+        Args:
+            salon_id (int): El ID del salón.
+        """
+        nombre = self.salon_maping.get(salon_id)
+        coincidencias = self.ui.vcListWidSalones.findItems(nombre, Qt.MatchFlag.MatchExactly) if nombre else []
+        if coincidencias:
+            self.ui.vcListWidSalones.setCurrentItem(coincidencias[0])
+            self.activateWindow()
+
+    def refrescar_ocupacion(self):
+        """
+        Vuelve a pedir el mapa de ocupación si está abierto, tras guardar o recibir cambios de reservas.
+        """
+        if self.ocupacion is not None and self.ocupacion.isVisible():
+            self.ocupacion.recargar()
+
+    def cargar_indice_huespedes(self):
+        """
+        Construye en segundo plano el índice de huéspedes en memoria.
+        """
+        self.precarga.ejecutar(
+            self.dao_reserva.cargar_indice_huespedes, clave="indice_huespedes",
+            al_fallar=lambda e: self.statusBar().showMessage(f"No se pudo preparar la búsqueda de huéspedes: {e}", 5000),
+        )
+
+    def buscar_huespedes(self):
+        """
+        Busca en segundo plano las reservas de cualquier salón que coinciden con el texto escrito.
+        """
+        texto = self.txt_buscar.text()
+        if not es_busqueda_valida(*analizar(texto)):
+            self.busqueda.cancelar("buscar")
+            self.completer.popup().hide()
+            return
+        if indice_huespedes.estado == indice_huespedes.VACIO:
+            self.cargar_indice_huespedes()  # Se descartó tras una carga masiva: se vuelve a construir
+        with metricas.accion("buscar_huesped"):
+            self.busqueda.ejecutar(
+                self.dao_reserva.buscar_huespedes, texto, clave="buscar",
+                al_terminar=self.mostrar_resultados,
+                al_fallar=lambda e: MessageBox("Error al buscar", "error", str(e)).show(),
+            )
+
+    def mostrar_resultados(self, reservas):
+        """
+        Muestra las reservas encontradas en la lista desplegable del cuadro de búsqueda.
+
+        Args:
+            reservas (list): Objetos ReservaModel, de la más reciente a la más antigua.
+        """
+        self.resultados.clear()
+        for reserva in reservas:
+            salon = self.salon_maping.get(reserva.salon_id, reserva.salon_id)
+            opcion = QStandardItem(f"{reserva.persona} · {reserva.telefono} · {salon} · {reserva.fecha.strftime('%Y-%m-%d')}")
+            opcion.setData((reserva.reserva_id, reserva.salon_id), Qt.ItemDataRole.UserRole)
+            self.resultados.appendRow(opcion)
+        if not reservas:
+            opcion = QStandardItem("Sin resultados")
+            opcion.setEnabled(False)
+            self.resultados.appendRow(opcion)
+        self.completer.complete()
+
+    def abrir_resultado(self, index):
+        """
+        Muestra el salón de la reserva elegida en la búsqueda y la abre en el formulario.
+
+        Args:
+            index (QModelIndex): Índice del resultado elegido.
+        """
+        datos = index.data(Qt.ItemDataRole.UserRole)
+        if not datos:
+            return
+        reserva_id, salon_id = datos
+        self.seleccionar_salon(salon_id)
+        self.abrir_formulario(reserva_id, salon_id)
+
+    def mostrar_cargando(self, cargando):
+        """
+        Refleja en la ventana si hay consultas en curso, sin bloquearla.
+
+        Args:
+            cargando (bool): True mientras haya tareas pendientes en el ejecutor.
+        """
+        if cargando:
+            self.statusBar().showMessage("Cargando...")  # Indica la carga en la barra de estado
+            self.ui.vcGridReservas.setEnabled(False)  # Evita seleccionar filas que están a punto de cambiar
+        else:
+            self.statusBar().clearMessage()
+            self.ui.vcGridReservas.setEnabled(True)
+
+    def closeEvent(self, event):
+        """
+        Descarta las consultas pendientes al cerrar la ventana.
+        """
+        self.ejecutor.cancelar_todo()
+        self.precarga.cancelar_todo()
+        self.busqueda.cancelar_todo()
+        self.exportacion.cancelar_todo()
+        self.vigilante.detener()
+        super().closeEvent(event)
+
     def open_modal(self, nueva):
         """
         Abre el modal para crear o modificar una reserva.
         """
         if self.reserva_seleccionada != 0 or nueva:
-            if nueva:
-                self.controlador = ReversaController(None, self.salon_selecionado)  # Controlador para nueva reserva
-            else:
-                self.controlador = ReversaController(self.reserva_seleccionada, self.salon_selecionado)  # Controlador para modificar una reserva existente
-
-            if not isinstance(self.controlador, QDialog):
-                raise TypeError(
-                    "El controlador debe heredar de QDialog para ser modal."
-                )  # Asegura que el controlador sea un QDialog modal
-            self.controlador.setModal(True)  # Establece el controlador como modal
-            self.controlador.finished.connect(self.config_table)  # Cuando el modal se cierra, actualiza la tabla
-            self.controlador.exec()  # Ejecuta el modal
+            self.abrir_formulario(None if nueva else self.reserva_seleccionada, self.salon_selecionado)
         else:
             MessageBox("Seleccione una reserva para modificar", "warning").show()  # Muestra un mensaje de advertencia si no hay ninguna reserva seleccionada
 
+    def abrir_formulario(self, reserva_id, salon_id):
+        """
+        Abre el formulario de reservas, que se construye la primera vez y después se reutiliza.
+
+        Args:
+            reserva_id (int): La reserva a modificar, o None para crear una nueva.
+            salon_id (int): El salón de la reserva.
+        """
+        with metricas.accion("abrir_dialogo"):  # Solo la carga del formulario, no lo que se haga con él abierto
+            if self.controlador is None:
+                from controladores.reserva_controller import ReversaController  # El formulario se carga al abrirlo por primera vez
+                self.controlador = ReversaController(self)
+                if not isinstance(self.controlador, QDialog):
+                    raise TypeError(
+                        "El controlador debe heredar de QDialog para ser modal."
+                    )  # Asegura que el controlador sea un QDialog modal
+                self.controlador.setModal(True)  # Establece el controlador como modal
+                self.controlador.reserva_guardada.connect(self.reserva_guardada)  # Solo se refresca la fila guardada
+            self.controlador.load(reserva_id, salon_id)
+        self.controlador.exec()  # Ejecuta el modal
+
+    def reserva_guardada(self, reserva):
+        """
+        Coloca en la tabla la reserva creada o modificada en el formulario, sin volver a consultar el salón.
+        Solo se recarga la tabla si no se puede mostrar la fila con los datos que ya tiene (un tipo de reserva nuevo).
+
+        Args:
+            reserva (ReservaModel): La reserva guardada.
+        """
+        self.refrescar_ocupacion()
+        if reserva.salon_id != self.salon_selecionado:
+            return
+        if not self.model.conoce_tipo(reserva.tipo_reserva_id):
+            self.config_table()
+            return
+        self.model.colocar_reserva(reserva)
+
+    def aplicar_cambios(self, cambios):
+        """
+        Aplica a la tabla las reservas creadas, modificadas o borradas desde otros puestos, sin recargarla.
+        Las cachés ya se actualizaron al leer los cambios.
+
+        Args:
+            cambios (list): Tuplas (CambioModel, ReservaModel o None si la reserva ya no existe).
+        """
+        recargar = False
+        for cambio, reserva in cambios:
+            if reserva is not None and reserva.salon_id == self.salon_selecionado:
+                if self.model.conoce_tipo(reserva.tipo_reserva_id):
+                    self.model.colocar_reserva(reserva)
+                else:
+                    recargar = True
+            elif self.model.quitar_reserva(cambio.registro_id):  # Borrada o movida a otro salón
+                if self.reserva_seleccionada == cambio.registro_id:
+                    self.reserva_seleccionada = 0
+        if recargar:
+            self.config_table()
+        self.refrescar_ocupacion()
+
     def click_reserva(self, index: QModelIndex):
         """
         Maneja el clic sobre una reserva en la tabla para seleccionarla.
         """
         row = index.row()  # Obtiene la fila seleccionada
-
-        # Obtiene el valor de la columna 4 (ID) de esa fila
-        reserva_id_item = self.model.item(row, 4)  # Columna 4 (index base 0)
-
-        if reserva_id_item:
-            self.reserva_seleccionada = reserva_id_item.text() or 0  # Obtiene el ID de la reserva como texto o 0 si no se encuentra
+        self.reserva_seleccionada = self.model.reserva_id(row)  # Obtiene el ID de la reserva de esa fila, o 0 si no se encuentra
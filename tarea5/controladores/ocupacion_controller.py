@@ -0,0 +1,157 @@
+import datetime
+
+from PySide6.QtCore import Signal
+from PySide6.QtWidgets import QComboBox, QHBoxLayout, QLabel, QMainWindow, QPushButton, QVBoxLayout, QWidget
+
+from modelos.metricas import metricas
+from modelos.ocupacion import cargar_mapa, sumar_meses
+from utilidades.ejecutor import EjecutorDatos
+from utilidades.message_box import MessageBox
+from vistas.mapa_ocupacion import MESES, VistaMapaOcupacion
+
+PERIODOS = [("1 mes", 1), ("3 meses", 3), ("12 meses", 12)]  # Meses que abarca el mapa
+
+
+class OcupacionController(QMainWindow):
+    """
+    Ventana con el mapa de ocupación de todos los salones, día a día, para uno o varios meses.
+    Cada periodo se obtiene con una sola consulta agregada en segundo plano; el mapa se pinta
+    con una vista propia que solo dibuja las celdas visibles.
+    """
+    salon_elegido = Signal(int)  # salon_id de la celda sobre la que se hace doble clic
+
+    def __init__(self, parent=None):
+        """
+        Constructor de la clase OcupacionController.
+
+        Args:
+            parent (QWidget): Ventana principal de la aplicación.
+        """
+        super().__init__(parent)
+        self.setWindowTitle("Ocupación de salones")
+        self.resize(1000, 520)
+        self.inicio = datetime.date.today().replace(day=1)  # Primer día del periodo mostrado
+        self.ejecutor = EjecutorDatos(self)  # Ejecuta las consultas fuera del hilo de la interfaz
+        self.ejecutor.ocupado_cambiado.connect(self.mostrar_cargando)
+
+        self.init_ui()
+        self.config_events()
+
+    def init_ui(self):
+        """
+        Construye la barra de navegación y el mapa.
+        """
+        self.btn_anterior = QPushButton("◀")
+        self.btn_siguiente = QPushButton("▶")
+        self.btn_hoy = QPushButton("Hoy")
+        self.btn_actualizar = QPushButton("Actualizar")
+        self.lbl_periodo = QLabel()
+        self.cbo_periodo = QComboBox()
+        for nombre, meses in PERIODOS:
+            self.cbo_periodo.addItem(nombre, meses)
+
+        barra = QHBoxLayout()
+        barra.addWidget(self.btn_anterior)
+        barra.addWidget(self.lbl_periodo)
+        barra.addWidget(self.btn_siguiente)
+        barra.addStretch()
+        barra.addWidget(QLabel("Más oscuro = más asistentes"))
+        barra.addWidget(self.cbo_periodo)
+        barra.addWidget(self.btn_hoy)
+        barra.addWidget(self.btn_actualizar)
+
+        self.vista = VistaMapaOcupacion()
+        self.vista.setToolTip("Doble clic en un día para ver las reservas de ese salón")
+        central = QWidget(self)
+        layout = QVBoxLayout(central)
+        layout.addLayout(barra)
+        layout.addWidget(self.vista)
+        self.setCentralWidget(central)
+
+    def config_events(self):
+        """
+        Configura los eventos de la ventana.
+        """
+        self.btn_anterior.clicked.connect(lambda: self.mover(-self.meses()))
+        self.btn_siguiente.clicked.connect(lambda: self.mover(self.meses()))
+        self.btn_hoy.clicked.connect(self.ir_a_hoy)
+        self.btn_actualizar.clicked.connect(self.recargar)
+        self.cbo_periodo.currentIndexChanged.connect(lambda _: self.recargar())
+        self.vista.celda_activada.connect(lambda salon_id, fecha: self.salon_elegido.emit(salon_id))
+
+    def meses(self):
+        """
+        Devuelve los meses que abarca el periodo elegido.
+        """
+        return self.cbo_periodo.currentData()
+
+    def mover(self, meses):
+        """
+        Desplaza el periodo mostrado.
+
+        Args:
+            meses (int): Meses a avanzar (negativo para retroceder).
+        """
+        self.inicio = sumar_meses(self.inicio, meses)
+        self.recargar()
+
+    def ir_a_hoy(self):
+        """
+        Vuelve al periodo que empieza en el mes actual.
+        """
+        self.inicio = datetime.date.today().replace(day=1)
+        self.recargar()
+
+    def recargar(self):
+        """
+        Pide en segundo plano la ocupación del periodo; si se pide otro antes de que llegue, se descarta.
+        """
+        desde, hasta = self.inicio, sumar_meses(self.inicio, self.meses())
+        ultimo = hasta - datetime.timedelta(days=1)
+        self.lbl_periodo.setText(
+            f"{MESES[desde.month - 1]} {desde.year}" if self.meses() == 1
+            else f"{MESES[desde.month - 1]} {desde.year} – {MESES[ultimo.month - 1]} {ultimo.year}"
+        )
+        with metricas.accion("mapa_ocupacion"):
+            self.ejecutor.ejecutar(
+                cargar_mapa, desde, hasta, clave="mapa",
+                al_terminar=self.mostrar_mapa,
+                al_fallar=lambda e: MessageBox("Error al cargar la ocupación", "error", str(e)).show(),
+            )
+
+    def mostrar_mapa(self, mapa):
+        """
+        Muestra la rejilla recibida y un resumen de la ocupación en la barra de estado.
+
+        Args:
+            mapa (MapaOcupacion): Ocupación del periodo.
+        """
+        self.vista.set_mapa(mapa, datetime.date.today())
+        total = mapa.dias * len(mapa.salones)
+        ocupados = mapa.dias_ocupados()
+        porcentaje = 100 * ocupados / total if total else 0
+        self.statusBar().showMessage(f"{ocupados} de {total} días-salón ocupados ({porcentaje:.0f} %)")
+
+    def mostrar_cargando(self, cargando):
+        """
+        Indica en la barra de estado que hay una consulta en curso.
+
+        Args:
+            cargando (bool): True mientras haya tareas pendientes en el ejecutor.
+        """
+        if cargando:
+            self.statusBar().showMessage("Cargando...")
+
+    def showEvent(self, evento):
+        """
+        Carga el periodo cada vez que se muestra la ventana, para que refleje las últimas reservas.
+        """
+        super().showEvent(evento)
+        self.recargar()
+
+    def closeEvent(self, evento):
+        """
+        Descarta las consultas pendientes al cerrar la ventana.
+        """
+        self.ejecutor.cancelar_todo()
+        super().closeEvent(evento)
@@ -1,12 +1,19 @@
 from PySide6.QtWidgets import QDialog
-from PySide6.QtCore import QDate
+import datetime
+
+from PySide6.QtCore import QDate, Qt, Signal
+from PySide6.QtGui import QTextCharFormat
 
 from vistas.create_edit_reserva_ui import Ui_Reservar
 
-from modelos.datos import ReservasDAO, SalonesDAO, TiposCocinaDAO, TiposReservasDAO, BaseDAO
+from modelos import combos_catalogo
+from modelos.datos import ReservasDAO, SalonesDAO, TiposCocinaDAO, TiposReservasDAO, FechaOcupadaError, ConflictoVersionError
 from modelos.models import ReservaModel
+from modelos.disponibilidad import disponibilidad
+from modelos.metricas import metricas
 
 from utilidades.message_box import MessageBox
+from utilidades.ejecutor import EjecutorDatos
 
 
 class ReversaController(QDialog):
@@ -14,44 +21,71 @@ class ReversaController(QDialog):
     Controlador que gestiona la creación y modificación de reservas en la interfaz de usuario.
     Hereda de QDialog para mostrar un cuadro de diálogo modal.
     """
+    reserva_guardada = Signal(object)  # ReservaModel creada o actualizada, para refrescar solo esa fila de la rejilla
 
-    def __init__(self, reserva_id, salon_id):
+    def __init__(self, parent=None):
         """
-        Constructor de la clase ReversaController.
+        Constructor de la clase ReversaController. Construye la interfaz, los DAOs y los eventos una sola vez;
+        la ventana principal reutiliza la misma instancia y llama a load antes de cada apertura.
 
         Args:
-            reserva_id (int): Identificador de la reserva a modificar. Si es 0, se creará una nueva.
-            salon_id (int): Identificador del salón donde se realizará la reserva.
+            parent (QWidget): Ventana sobre la que se abre el formulario.
         """
         try:
-            super().__init__()  # Inicializa la clase QDialog
+            super().__init__(parent)  # Inicializa la clase QDialog
             self.ui = Ui_Reservar()  # Crea una instancia de la UI del formulario de reserva
             self.ui.setupUi(self)  # Configura la interfaz en el cuadro de diálogo
+            self.ejecutor = EjecutorDatos(self)  # Ejecuta las consultas fuera del hilo de la interfaz
+            self.ejecutor.ocupado_cambiado.connect(self.mostrar_cargando)
+            # Los combo boxes muestran los modelos compartidos, que ya tienen las opciones de aperturas anteriores
+            self.ui.vccboBoxTipoCocina.setModel(combos_catalogo.tipos_cocina)
+            self.ui.vccboBoxTipoRes.setModel(combos_catalogo.tipos_reserva)
 
             self.init_daos()  # Inicializa los DAOs para manejar datos
             self.config_events()  # Configura los eventos (conexión de botones, etc.)
 
-            self.salon_id = salon_id  # Asigna el ID del salón
-            if reserva_id:  # Si hay un ID de reserva, significa que es una edición
-                self.reserva_id = reserva_id
-                self.reserva_modificacion = self.dao_reserva.get(self.reserva_id)  # Obtiene la reserva a editar
-                self.es_editar = True  # Marca como edición
-            else:  # Si no hay ID de reserva, es una nueva reserva
-                self.reserva_id = 0
-                self.es_editar = False
-                self.reserva_modificacion = ReservaModel("","","","","","","","","")  # Reserva vacía para nueva
-
-            self.init_ui()  # Inicializa la interfaz de usuario con los valores predeterminados
+            self.salon_id = None
+            self.reserva_id = 0
+            self.es_editar = False
+            self.reserva_modificacion = ReservaModel("","","","","","","","","")  # Se sustituye por la reserva a editar al cargarla
 
         except Exception as e:
             # Si ocurre un error, se muestra un mensaje de error
             MessageBox("Error al cargar el formulario de reservas", "error", str(e)).show()
 
+    def load(self, reserva_id, salon_id):
+        """
+        Prepara el formulario para una nueva apertura: limpia los datos de la anterior y pide en segundo plano
+        la reserva a editar, si la hay.
+
+        Args:
+            reserva_id (int): Identificador de la reserva a modificar. Si es 0 o None, se creará una nueva.
+            salon_id (int): Identificador del salón donde se realizará la reserva.
+        """
+        self.salon_id = salon_id  # Asigna el ID del salón
+        self.reserva_id = reserva_id or 0
+        self.es_editar = bool(reserva_id)  # Si hay un ID de reserva, significa que es una edición
+        self.reserva_modificacion = ReservaModel("","","","","","","","","")
+
+        # Se vacían los campos de la apertura anterior
+        self.ui.vcTxtNombre.clear()
+        self.ui.vcTxtTelefono.clear()
+        self.ui.vcSpinBoxNAsist.setValue(0)
+        self.ui.vccboBoxTipoCocina.setCurrentIndex(0)
+        self.ui.vccboBoxTipoRes.setCurrentIndex(0)
+        self.tipo_res_changed()  # Oculta y reinicia los campos de congreso aunque el tipo no haya cambiado
+        self.ui.vcdateEdit.calendarWidget().setDateTextFormat(QDate(), QTextCharFormat())  # Sin marcas de otro salón
+        self.ui.vcdateEdit.setDate(QDate.currentDate())
+
+        self.init_ui()  # Inicializa la interfaz de usuario con los valores predeterminados
+
     def config_events(self):
         """
         Configura los eventos para los botones y otras interacciones de la interfaz.
         """
         self.ui.vcbtnReservar.clicked.connect(self.confirm_reserva)  # Conecta el botón de reservar
+        self.ui.vcdateEdit.setCalendarPopup(True)  # Habilita el popup del calendario (crea el calendarWidget)
+        self.ui.vcdateEdit.calendarWidget().currentPageChanged.connect(self.marcar_dias_ocupados)  # Marca los días ocupados del mes mostrado
         self.ui.vccboBoxTipoRes.currentTextChanged.connect(self.tipo_res_changed)  # Cambiar tipo de reserva
 
     def tipo_res_changed(self):
@@ -74,13 +108,46 @@ class ReversaController(QDialog):
         return self.tipo_reserva == "Congreso"
 
     def init_ui(self):
+        """
+        Pide en segundo plano los datos de los combo boxes y, si es una edición, la reserva seleccionada.
+        El formulario se rellena cuando llegan, sin bloquear la ventana mientras tanto.
+        """
+        self.ejecutor.ejecutar(
+            self.cargar_datos, clave="cargar",
+            al_terminar=self.rellenar_formulario,
+            al_fallar=lambda e: MessageBox("Error al inicializar la UI", "error", str(e)).show(),
+        )
+
+    def cargar_datos(self):
+        """
+        Obtiene los tipos de cocina, los tipos de reserva y la reserva a editar. Se ejecuta fuera del hilo de la interfaz.
+
+        Returns:
+            tuple: (lista de TipoCocinaModel, lista de TipoReservaModel, ReservaModel o None).
+        """
+        cocinas = self.dao_tipo_cocina.get_all()  # Obtiene todos los tipos de cocina
+        tipos_reserva = self.dao_tipo_reserva.get_all()  # Obtiene todos los tipos de reserva
+        reserva = self.dao_reserva.get(self.reserva_id) if self.es_editar else None  # Obtiene la reserva a editar
+        self.dao_reserva.asegurar_disponibilidad(self.salon_id)  # Deja en memoria los días ocupados del salón para el calendario
+        return cocinas, tipos_reserva, reserva
+
+    def rellenar_formulario(self, datos):
         """
         Inicializa la interfaz de usuario con los datos de los combo boxes y la fecha.
         Si es una edición, rellena los campos con los datos de la reserva seleccionada.
+
+        Args:
+            datos (tuple): Resultado de cargar_datos.
         """
+        cocinas, tipos_reserva, reserva = datos
         try:
-            self.fill_cbobox_cocina()  # Llena el combo box de tipos de cocina
-            self.fill_cbobox_tipo_reserva()  # Llena el combo box de tipos de reserva
+            self.fill_cbobox_cocina(cocinas)  # Llena el combo box de tipos de cocina
+            self.fill_cbobox_tipo_reserva(tipos_reserva)  # Llena el combo box de tipos de reserva
+
+            if self.es_editar:
+                if reserva is None:
+                    raise ValueError("La reserva seleccionada ya no existe.")
+                self.reserva_modificacion = reserva
             self.set_fecha()  # Establece la fecha actual o la de la reserva
 
             if self.es_editar:
@@ -90,6 +157,26 @@ class ReversaController(QDialog):
             # Si ocurre un error al inicializar la UI, muestra un mensaje de error
             MessageBox("Error al inicializar la UI", "error", str(e)).show()
 
+    def mostrar_cargando(self, cargando):
+        """
+        Deshabilita el botón de confirmar y muestra el cursor de espera mientras hay consultas en curso.
+
+        Args:
+            cargando (bool): True mientras haya tareas pendientes en el ejecutor.
+        """
+        self.ui.vcbtnReservar.setEnabled(not cargando)
+        if cargando:
+            self.setCursor(Qt.CursorShape.BusyCursor)
+        else:
+            self.unsetCursor()
+
+    def done(self, resultado):
+        """
+        Descarta las consultas pendientes al cerrar el cuadro de diálogo.
+        """
+        self.ejecutor.cancelar_todo()
+        super().done(resultado)
+
     def init_daos(self):
         """
         Inicializa los objetos de acceso a datos (DAOs) necesarios para manejar la información de reservas,
@@ -108,12 +195,13 @@ class ReversaController(QDialog):
         """
         Rellena los campos de la interfaz con los datos de la reserva que se está editando.
         """
-        tipo_reserva = self.dao_tipo_reserva.get(self.reserva_modificacion.tipo_reserva_id)
-        tipo_cocina = self.dao_tipo_cocina.get(self.reserva_modificacion.tipo_cocina_id)
-        if tipo_cocina:
-            self.ui.vccboBoxTipoCocina.setCurrentText(tipo_cocina.nombre)  # Establece el tipo de cocina
-        if tipo_reserva:
-            self.ui.vccboBoxTipoRes.setCurrentText(tipo_reserva.nombre)  # Establece el tipo de reserva
+        # Los combo boxes ya guardan el ID de cada opción, así que no hace falta consultar los catálogos
+        indice_cocina = self.ui.vccboBoxTipoCocina.findData(self.reserva_modificacion.tipo_cocina_id)
+        indice_tipo = self.ui.vccboBoxTipoRes.findData(self.reserva_modificacion.tipo_reserva_id)
+        if indice_cocina >= 0:
+            self.ui.vccboBoxTipoCocina.setCurrentIndex(indice_cocina)  # Establece el tipo de cocina
+        if indice_tipo >= 0:
+            self.ui.vccboBoxTipoRes.setCurrentIndex(indice_tipo)  # Establece el tipo de reserva
 
         # Rellena los demás campos del formulario con los datos de la reserva
         self.ui.vcTxtNombre.setText(self.reserva_modificacion.persona)
@@ -122,29 +210,29 @@ class ReversaController(QDialog):
         self.ui.vcchkBoxHabitaciones.setChecked(self.reserva_modificacion.habitaciones == 1)
         self.ui.vcSpinBoxJornadas.setValue(self.reserva_modificacion.jornadas)
 
-    def fill_cbobox_cocina(self):
+    def fill_cbobox_cocina(self, cocinas):
         """
-        Llena el combo box de tipos de cocina con los datos obtenidos desde el DAO.
+        Actualiza las opciones de tipos de cocina del modelo compartido; solo se reconstruye si el catálogo ha cambiado.
+
+        Args:
+            cocinas (list): Lista de objetos TipoCocinaModel.
         """
-        self.ui.vccboBoxTipoCocina.clear()  # Limpia el combo box antes de llenarlo
-        cocinas = self.dao_tipo_cocina.get_all()  # Obtiene todos los tipos de cocina
         if not cocinas:
             self.close()  # Si no hay tipos de cocina, cierra la ventana
             raise ValueError("La consulta no devolvió tipos de cocina.")
-        for cocina in cocinas:
-            self.ui.vccboBoxTipoCocina.addItem(cocina.nombre, cocina.tipo_cocina_id)  # Agrega los tipos de cocina al combo box
+        combos_catalogo.tipos_cocina.actualizar(cocinas)
 
-    def fill_cbobox_tipo_reserva(self):
+    def fill_cbobox_tipo_reserva(self, reservas):
         """
-        Llena el combo box de tipos de reserva con los datos obtenidos desde el DAO.
+        Actualiza las opciones de tipos de reserva del modelo compartido; solo se reconstruye si el catálogo ha cambiado.
+
+        Args:
+            reservas (list): Lista de objetos TipoReservaModel.
         """
-        self.ui.vccboBoxTipoRes.clear()  # Limpia el combo box antes de llenarlo
-        reservas = self.dao_tipo_reserva.get_all()  # Obtiene todos los tipos de reserva
         if not reservas:
             self.close()  # Si no hay tipos de reserva, cierra la ventana
             raise ValueError("La consulta no devolvió tipos de reservas.")
-        for reserva in reservas:
-            self.ui.vccboBoxTipoRes.addItem(reserva.nombre, reserva.tipo_reserva_id)  # Agrega los tipos de reserva al combo box
+        combos_catalogo.tipos_reserva.actualizar(reservas)
 
     def set_fecha(self):
         """
@@ -162,6 +250,31 @@ class ReversaController(QDialog):
         self.ui.vcdateEdit.setMinimumDate(fecha_hoy)  # Asegura que la fecha mínima sea hoy
         self.ui.vcdateEdit.setCalendarPopup(True)  # Habilita el popup del calendario
         self.ui.vcdateEdit.setDisplayFormat("yyyy-MM-dd")  # Formato de visualización de la fecha
+        calendario = self.ui.vcdateEdit.calendarWidget()
+        self.marcar_dias_ocupados(calendario.yearShown(), calendario.monthShown())
+
+    def marcar_dias_ocupados(self, anio, mes):
+        """
+        Marca en gris los días ocupados del salón en el mes que muestra el calendario.
+        Los datos salen del índice de disponibilidad en memoria, sin consultar la base de datos.
+
+        Args:
+            anio (int): Año mostrado en el calendario.
+            mes (int): Mes mostrado en el calendario.
+        """
+        if not disponibilidad.cargado(self.salon_id):
+            return
+        calendario = self.ui.vcdateEdit.calendarWidget()
+        calendario.setDateTextFormat(QDate(), QTextCharFormat())  # Limpia las marcas del mes anterior
+
+        formato = QTextCharFormat()
+        formato.setForeground(Qt.GlobalColor.gray)
+        formato.setFontStrikeOut(True)
+        # Se cubre también la semana anterior y la siguiente, que el calendario muestra en los bordes
+        desde = datetime.date(anio, mes, 1) - datetime.timedelta(days=7)
+        hasta = datetime.date(anio, mes, 28) + datetime.timedelta(days=14)
+        for dia in disponibilidad.dias_ocupados(self.salon_id, desde, hasta, excluir=self.reserva_id):
+            calendario.setDateTextFormat(QDate(dia.year, dia.month, dia.day), formato)
 
     def confirm_reserva(self):
         """
@@ -181,45 +294,77 @@ class ReversaController(QDialog):
 
     def set_reserva(self, nombre, telefono):
         """
-        Crea y devuelve un objeto ReservaModel con los datos de la reserva, si la fecha es válida.
+        Crea y devuelve un objeto ReservaModel con los datos del formulario.
+        Lleva la versión de la reserva leída para que la base de datos rechace la modificación si otro puesto la ha cambiado.
         """
         fecha = self.ui.vcdateEdit.date().toPython()  # Convierte la fecha seleccionada a formato Python
 
-        if self.dao_reserva.checkFechaOcupada(fecha, self.salon_id, self.reserva_id) == False:
-            # Si la fecha no está ocupada, crea una nueva reserva
-            return ReservaModel(
-                reserva_id=self.reserva_id,
-                persona=nombre,
-                telefono=telefono,
-                fecha=fecha, 
-                tipo_reserva_id=self.ui.vccboBoxTipoRes.currentData(),
-                salon_id=self.salon_id,
-                tipo_cocina_id=self.ui.vccboBoxTipoCocina.currentData(),
-                ocupacion=self.ui.vcSpinBoxNAsist.value(),
-                jornadas=self.ui.vcSpinBoxJornadas.value(),
-                habitaciones=int(self.ui.vcchkBoxHabitaciones.isChecked()),
-            )
-        else:
-            # Si la fecha ya está ocupada, muestra un mensaje de advertencia
-            MessageBox("La fecha no está disponible", "warning").show()
-
-        return None
+        return ReservaModel(
+            reserva_id=self.reserva_id,
+            persona=nombre,
+            telefono=telefono,
+            fecha=fecha, 
+            tipo_reserva_id=self.ui.vccboBoxTipoRes.currentData(),
+            salon_id=self.salon_id,
+            tipo_cocina_id=self.ui.vccboBoxTipoCocina.currentData(),
+            ocupacion=self.ui.vcSpinBoxNAsist.value(),
+            jornadas=self.ui.vcSpinBoxJornadas.value(),
+            habitaciones=int(self.ui.vcchkBoxHabitaciones.isChecked()),
+            version=self.reserva_modificacion.version,
+        )
 
     def safe(self, reserva):
         """
-        Guarda la reserva en la base de datos, ya sea actualizando o creando una nueva.
+        Guarda la reserva en la base de datos en segundo plano, ya sea actualizando o creando una nueva.
         """
-        try:
-            if self.es_editar:
-                self.dao_reserva.update(reserva)  # Actualiza la reserva si es una modificación
-            else:
-                self.dao_reserva.create(reserva)  # Crea una nueva reserva si no es edición
+        with metricas.accion("confirmar"):
+            self.ejecutor.ejecutar(
+                self.guardar, reserva, clave="guardar",
+                al_terminar=self.guardado,
+                al_fallar=self.error_guardado,
+            )
 
-            respuesta = MessageBox("Operación exitosa").show()  # Muestra un mensaje de éxito
-            if respuesta:
-                self.accept()  # Acepta el formulario y cierra la ventana
-                self.close()
+    def guardar(self, reserva):
+        """
+        Guarda la reserva con una sola sentencia. Se ejecuta fuera del hilo de la interfaz.
+        No se comprueba antes la fecha: la base de datos rechaza la escritura si pisa otra reserva o si la reserva
+        editada ha cambiado desde que se leyó, aunque otro puesto guarde a la vez.
 
-        except Exception as e:
+        Args:
+            reserva (ReservaModel): La reserva a guardar.
+
+        Returns:
+            ReservaModel: La reserva guardada.
+
+        Raises:
+            FechaOcupadaError: Si el salón ya está reservado en alguno de los días de la reserva.
+            ConflictoVersionError: Si la reserva editada se ha modificado o eliminado desde otro puesto.
+        """
+        if self.es_editar:
+            return self.dao_reserva.update(reserva, anterior=self.reserva_modificacion)  # Actualiza la reserva si es una modificación
+        return self.dao_reserva.create(reserva)  # Crea una nueva reserva si no es edición
+
+    def guardado(self, reserva):
+        """
+        Avisa de la reserva guardada, informa del éxito de la operación y cierra el formulario.
+        """
+        self.reserva_guardada.emit(reserva)
+        respuesta = MessageBox("Operación exitosa").show()  # Muestra un mensaje de éxito
+        if respuesta:
+            self.accept()  # Acepta el formulario y cierra la ventana
+            self.close()
+
+    def error_guardado(self, error):
+        """
+        Informa de que no se pudo guardar la reserva.
+        """
+        if isinstance(error, FechaOcupadaError):
+            # Si la fecha ya está ocupada, muestra un mensaje de advertencia
+            MessageBox("La fecha no está disponible", "warning").show()
+        elif isinstance(error, ConflictoVersionError):
+            # Otro puesto ha cambiado la reserva: se avisa y se vuelve a cargar para partir de sus datos actuales
+            MessageBox("Otro puesto ha modificado esta reserva. Se muestran sus datos actuales; revíselos y vuelva a guardar.", "warning").show()
+            self.init_ui()
+        else:
             # Si ocurre un error al guardar, muestra un mensaje de error
-            MessageBox("Error al procesar la operación", "error", str(e)).show()
+            MessageBox("Error al procesar la operación", "error", str(error)).show()
@@ -1,23 +1,61 @@
 #!/usr/bin/python3
+import time
+
+INICIO = time.perf_counter()  # Referencia de la sonda de arranque: se toma antes de cualquier otro import
+
 import sys
+import threading
 
 from PySide6.QtWidgets import QApplication, QMainWindow
 
 from controladores.login_controller import LoginController
-from controladores.main_controller import MainCotroller
+from utilidades.message_box import MessageBox
+from utilidades.sonda_arranque import fichero_arranque, sonda
+
+# La ventana principal, los DAOs y el conector de la base de datos no se importan aquí:
+# se cargan en segundo plano mientras el usuario escribe sus credenciales (ver precalentar_en_segundo_plano).
+
 
-def login(app):
+def precalentar_en_segundo_plano(estado):
+    """
+    Lanza en un hilo el precalentamiento: importa los módulos de datos y la ventana principal, aplica las migraciones,
+    abre conexiones y llena las cachés de catálogos y de la primera página, sin retrasar el login.
+
+    Args:
+        estado (dict): Se rellena con el hilo ("hilo") y, si falla, la excepción ("error").
+    """
+    if "hilo" in estado:
+        return
+
+    def precalentar():
+        try:
+            from modelos.precalentamiento import precalentar
+            estado["tiempos"] = precalentar()
+            import controladores.main_controller  # noqa: F401  Solo se importa: los widgets se crean en el hilo de la interfaz
+        except Exception as e:
+            estado["error"] = e
+        sonda.marcar("precalentado")
+
+    # Hilo demonio: si se cierra el login sin entrar, no hay que esperar a una base de datos lenta
+    estado["hilo"] = threading.Thread(target=precalentar, name="precalentamiento", daemon=True)
+    estado["hilo"].start()
+
+
+def login(app, precalentamiento):
     """
     Función que maneja la ventana de login y retorna si el usuario ha iniciado sesión correctamente.
+    En cuanto la ventana responde, empieza el precalentamiento en segundo plano.
 
     Args:
         app (QApplication): Instancia de la aplicación Qt que se utilizará para ejecutar el ciclo de eventos de la GUI.
+        precalentamiento (dict): Estado del precalentamiento (ver precalentar_en_segundo_plano).
 
     Returns:
         bool: Retorna True si el login fue exitoso, False en caso contrario.
     """
     login_window = QMainWindow()
     login_controler = LoginController(login_window)
+    sonda.vigilar(login_window, "login", al_interactuar=lambda: precalentar_en_segundo_plano(precalentamiento))
     login_window.show()
 
     # Inicia el ciclo de eventos de la aplicación Qt (esto hace que la ventana se muestre y se quede activa).
@@ -26,17 +64,26 @@ def login(app):
     return login_controler.bLogado
 
 
-def init_app(app):
+def init_app(app, precalentamiento):
     """
     Inicializa la aplicación principal después de un login exitoso.
 
-    Esta función se encarga de crear la conexión a la base de datos y mostrar la ventana principal de la aplicación.
+    Espera a que termine el precalentamiento (que aplica las migraciones pendientes del esquema), normalmente
+    ya acabado mientras el usuario escribía, y muestra la ventana principal con los datos ya en caché.
 
     Args:
         app (QApplication): Instancia de la aplicación Qt que se utilizará para ejecutar el ciclo de eventos de la GUI.
+        precalentamiento (dict): Estado del precalentamiento (ver precalentar_en_segundo_plano).
     """
+    precalentar_en_segundo_plano(precalentamiento)  # Por si el login no llegó a pintarse
+    precalentamiento["hilo"].join()
+    if "error" in precalentamiento:
+        MessageBox("Error al actualizar el esquema de la base de datos", "error", str(precalentamiento["error"])).show()
+        return
 
+    from controladores.main_controller import MainCotroller  # Ya importado por el precalentamiento
     main_window = MainCotroller()
+    sonda.vigilar(main_window, "principal")
     main_window.show()
 
     # Inicia el ciclo de eventos de la aplicación Qt, lo que permite que la ventana se mantenga abierta.
@@ -49,10 +96,22 @@ def main():
 
     Inicia el proceso de login y, si es exitoso, inicializa la aplicación principal.
     """
+    sonda.iniciar(INICIO)
     app = QApplication(sys.argv)
-
-    if login(app):
-        init_app(app)
+    precalentamiento = {}
+
+    try:
+        if login(app, precalentamiento):
+            init_app(app, precalentamiento)
+    finally:
+        from modelos.conexion import cerrar_pool
+        from modelos.metricas import METRICAS_FICHERO, metricas
+        cerrar_pool()  # Cierra las conexiones abiertas por los DAOs al salir
+        if METRICAS_FICHERO:
+            metricas.guardar(METRICAS_FICHERO)  # Vuelca las métricas de las consultas (JSON o Prometheus según la extensión)
+        arranque = fichero_arranque()  # Después de importar modelos, que carga el .env
+        if arranque:
+            sonda.guardar(arranque)  # Tiempos de arranque: primer pintado e interactividad de cada ventana
 
 
 # Bloque que asegura que el código se ejecute solo si el script es ejecutado directamente.
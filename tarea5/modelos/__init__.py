@@ -0,0 +1,5 @@
+from dotenv import load_dotenv
+
+# Carga la configuración de tarea5/.env antes que cualquier módulo lea las variables de entorno.
+# Las variables ya definidas en el entorno tienen prioridad sobre las del fichero.
+load_dotenv()
@@ -0,0 +1,406 @@
+import argparse
+import asyncio
+import contextvars
+import datetime
+import http
+import json
+import logging
+import os
+import re
+import signal
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import parse_qs, urlsplit
+
+from modelos.cambios import INTERVALO_CAMBIOS, leer_cambios, marca_inicial
+from modelos.conexion import PoolAgotadoError, cerrar_pool, get_pool
+from modelos.datos import ConflictoVersionError, FechaOcupadaError
+from modelos.metricas import METRICAS_FICHERO, metricas
+from modelos.migraciones import migrar
+from modelos.servicio import NoEncontrada, PeticionInvalida, ServicioReservas, leer_entero, leer_fecha
+
+logger = logging.getLogger(__name__)
+
+API_HOST = os.environ.get("HOTEL_API_HOST", "127.0.0.1")  # Dirección en la que escucha el servicio
+API_PUERTO = int(os.environ.get("HOTEL_API_PUERTO", 8080))
+API_CONCURRENCIA = int(os.environ.get("HOTEL_API_CONCURRENCIA", 0))  # Peticiones atendidas a la vez (0: tantas como conexiones del pool)
+API_COLA = int(os.environ.get("HOTEL_API_COLA", 100))  # Peticiones que pueden esperar turno; a partir de ahí se responde 503
+MAX_CUERPO = 64 * 1024  # Bytes máximos del cuerpo de una petición
+MAX_CABECERAS = 64  # Cabeceras máximas por petición
+ESPERA_INACTIVA = 30  # Segundos que se mantiene abierta una conexión sin peticiones
+
+
+class ErrorHTTP(Exception):
+    """
+    Se lanza para responder con un error HTTP: estado, código de error y mensaje para el cliente.
+    """
+    def __init__(self, estado, codigo, mensaje):
+        super().__init__(mensaje)
+        self.estado = estado
+        self.codigo = codigo
+
+
+class ServidorAPI:
+    """
+    Servicio HTTP/JSON sin interfaz gráfica sobre ServicioReservas, con asyncio.
+    Las operaciones de base de datos se ejecutan en un grupo de hilos del mismo tamaño que el pool de conexiones,
+    así que ningún hilo espera conexión; un semáforo limita las peticiones atendidas a la vez y, si ya esperan
+    demasiadas, se responde 503 en lugar de encolarlas sin límite. Cada endpoint registra su latencia en las métricas
+    del proceso, y sus consultas cuentan como viajes de la acción "api_<endpoint>".
+    Un bucle en segundo plano lee el registro de cambios para que el índice de disponibilidad vea también
+    las reservas hechas desde los puestos de recepción.
+    """
+    def __init__(self, servicio=None, pool=None, concurrencia=API_CONCURRENCIA, cola=API_COLA, intervalo_cambios=INTERVALO_CAMBIOS):
+        """
+        Inicializa el servidor sin escuchar todavía.
+
+        Args:
+            servicio (ServicioReservas): Servicio a exponer (por defecto uno sobre el pool).
+            pool (PoolConexiones): Pool del que tomar las conexiones (por defecto el del proceso).
+            concurrencia (int): Peticiones atendidas a la vez (0: el tamaño del pool).
+            cola (int): Peticiones que pueden esperar turno antes de responder 503.
+            intervalo_cambios (float): Segundos entre lecturas del registro de cambios (0 lo desactiva).
+        """
+        self.pool = pool or get_pool()
+        self.servicio = servicio or ServicioReservas(self.pool)
+        self.concurrencia = concurrencia or self.pool.tamanio
+        self.cola = cola
+        self.intervalo_cambios = intervalo_cambios
+        self.hilos = ThreadPoolExecutor(max_workers=self.concurrencia, thread_name_prefix="api")
+        self.limite = asyncio.Semaphore(self.concurrencia)
+        self.esperando = 0  # Peticiones a la espera del semáforo
+        self.servidor = None
+        self._tarea_cambios = None
+        # (método, ruta, nombre del endpoint para las métricas, función, si consulta la base de datos)
+        self.rutas = [
+            ("GET", re.compile(r"/catalogos"), "catalogos", self._catalogos, True),
+            ("GET", re.compile(r"/salones/(\d+)/reservas"), "listar_reservas", self._listar, True),
+            ("GET", re.compile(r"/salones/(\d+)/disponibilidad"), "disponibilidad", self._disponibilidad, True),
+            ("GET", re.compile(r"/salones/(\d+)/ocupacion"), "ocupacion", self._ocupacion, True),
+            ("GET", re.compile(r"/reservas/(\d+)"), "obtener_reserva", self._obtener, True),
+            ("POST", re.compile(r"/reservas"), "crear_reserva", self._crear, True),
+            ("PUT", re.compile(r"/reservas/(\d+)"), "actualizar_reserva", self._actualizar, True),
+            ("GET", re.compile(r"/salud"), "salud", self._salud, False),
+            ("GET", re.compile(r"/metricas"), "metricas", self._metricas, False),
+        ]
+
+    async def iniciar(self, host=API_HOST, puerto=API_PUERTO):
+        """
+        Empieza a escuchar y arranca la lectura del registro de cambios.
+
+        Args:
+            host (str): Dirección en la que escuchar.
+            puerto (int): Puerto (0 para uno libre cualquiera).
+
+        Returns:
+            tuple: (host, puerto) en los que escucha.
+        """
+        self.servidor = await asyncio.start_server(self._atender, host, puerto, limit=MAX_CUERPO)
+        if self.intervalo_cambios > 0:
+            self._tarea_cambios = asyncio.create_task(self._seguir_cambios())
+        return self.servidor.sockets[0].getsockname()[:2]
+
+    async def detener(self):
+        """
+        Deja de aceptar conexiones, para la lectura de cambios y espera a que terminen las consultas en curso.
+        """
+        if self._tarea_cambios is not None:
+            self._tarea_cambios.cancel()
+        if self.servidor is not None:
+            self.servidor.close()
+            await self.servidor.wait_closed()
+        await asyncio.get_running_loop().run_in_executor(None, self.hilos.shutdown)
+
+    async def en_hilo(self, funcion, *args):
+        """
+        Ejecuta una función bloqueante en el grupo de hilos, con el contexto actual (la acción de las métricas).
+        """
+        contexto = contextvars.copy_context()
+        return await asyncio.get_running_loop().run_in_executor(self.hilos, contexto.run, funcion, *args)
+
+    async def _seguir_cambios(self):
+        """
+        Lee periódicamente el registro de cambios; leer_cambios aplica cada cambio al índice de disponibilidad
+        y a las páginas en caché, así que aquí solo se avanza la marca.
+        """
+        marca = None
+        while True:
+            try:
+                if marca is None:
+                    marca = await self.en_hilo(marca_inicial)
+                hay_mas = True
+                while hay_mas:
+                    marca, _, hay_mas = await self.en_hilo(leer_cambios, marca)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning("No se pudo leer el registro de cambios: %s", e)
+            await asyncio.sleep(self.intervalo_cambios)
+
+    async def _atender(self, lector, escritor):
+        """
+        Atiende las peticiones de una conexión, una detrás de otra mientras el cliente la mantenga abierta.
+        """
+        try:
+            while True:
+                try:
+                    linea = await asyncio.wait_for(lector.readline(), ESPERA_INACTIVA)
+                except asyncio.TimeoutError:
+                    break
+                except ValueError:  # Más larga que el límite del lector (asyncio.LimitOverrunError): se responde 400
+                    linea = None
+                if linea is not None and not linea.strip():
+                    break
+                inicio = time.perf_counter()
+                endpoint, seguir = "desconocido", False
+                try:
+                    if linea is None:
+                        raise ErrorHTTP(400, "peticion_invalida", "Línea de petición demasiado larga.")
+                    metodo, destino, version, cabeceras, cuerpo = await self._leer_peticion(linea, lector)
+                    seguir = version == "HTTP/1.1" and cabeceras.get("connection", "").lower() != "close"
+                    endpoint, estado, datos = await self._resolver(metodo, destino, cuerpo)
+                except ErrorHTTP as e:
+                    estado, datos = e.estado, {"error": e.codigo, "mensaje": str(e)}
+                await self._responder(escritor, estado, datos, seguir)
+                metricas.registrar_peticion(endpoint, time.perf_counter() - inicio, estado)
+                if not seguir:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            escritor.close()
+
+    async def _leer_peticion(self, linea, lector):
+        """
+        Lee la línea de petición, las cabeceras y el cuerpo.
+
+        Returns:
+            tuple: (método, destino, versión HTTP, cabeceras en minúsculas, cuerpo en bytes).
+
+        Raises:
+            ErrorHTTP: Si la petición está mal formada o es demasiado grande.
+        """
+        partes = linea.decode("latin-1").split()
+        if len(partes) != 3 or not partes[2].startswith("HTTP/1."):
+            raise ErrorHTTP(400, "peticion_invalida", "Línea de petición HTTP no válida.")
+        metodo, destino, version = partes
+        cabeceras = {}
+        while True:
+            try:
+                linea = await lector.readline()
+            except ValueError:  # Cabecera más larga que el límite del lector (asyncio.LimitOverrunError)
+                raise ErrorHTTP(431, "cabeceras_excesivas", "Cabecera demasiado larga.") from None
+            if linea in (b"\r\n", b"\n", b""):
+                break
+            if len(cabeceras) >= MAX_CABECERAS:
+                raise ErrorHTTP(431, "cabeceras_excesivas", "Demasiadas cabeceras.")
+            nombre, _, valor = linea.decode("latin-1").partition(":")
+            cabeceras[nombre.strip().lower()] = valor.strip()
+        if "chunked" in cabeceras.get("transfer-encoding", "").lower():
+            raise ErrorHTTP(411, "longitud_requerida", "Indique Content-Length; no se admite chunked.")
+        try:
+            longitud = int(cabeceras.get("content-length", 0))
+        except ValueError:
+            raise ErrorHTTP(400, "peticion_invalida", "Content-Length no válido.") from None
+        if longitud > MAX_CUERPO:
+            raise ErrorHTTP(413, "cuerpo_excesivo", f"El cuerpo no puede superar {MAX_CUERPO} bytes.")
+        cuerpo = await lector.readexactly(longitud) if longitud > 0 else b""
+        return metodo, destino, version, cabeceras, cuerpo
+
+    async def _resolver(self, metodo, destino, cuerpo):
+        """
+        Busca la ruta, aplica el límite de concurrencia y ejecuta el endpoint traduciendo los errores a HTTP.
+
+        Returns:
+            tuple: (nombre del endpoint, estado HTTP, datos de la respuesta).
+        """
+        url = urlsplit(destino)
+        consulta = {clave: valores[-1] for clave, valores in parse_qs(url.query).items()}
+        metodos_ruta = set()
+        for metodo_ruta, patron, endpoint, funcion, usa_datos in self.rutas:
+            coincidencia = patron.fullmatch(url.path.rstrip("/") or "/")
+            if coincidencia is None:
+                continue
+            if metodo_ruta != metodo:
+                metodos_ruta.add(metodo_ruta)
+                continue
+            try:
+                if not usa_datos:
+                    return endpoint, *await funcion(consulta, cuerpo, *coincidencia.groups())
+                with metricas.accion(f"api_{endpoint}"):
+                    return endpoint, *await self._limitado(funcion(consulta, cuerpo, *map(int, coincidencia.groups())))
+            except ErrorHTTP as e:
+                return endpoint, e.estado, {"error": e.codigo, "mensaje": str(e)}
+        if metodos_ruta:
+            raise ErrorHTTP(405, "metodo_no_permitido", f"Métodos admitidos: {', '.join(sorted(metodos_ruta))}.")
+        raise ErrorHTTP(404, "no_encontrado", f"No existe la ruta {url.path}.")
+
+    async def _limitado(self, corrutina):
+        """
+        Ejecuta el endpoint cuando hay hueco en el semáforo, o responde 503 si ya hay demasiadas peticiones esperando.
+        """
+        if self.limite.locked() and self.esperando >= self.cola:
+            corrutina.close()
+            raise ErrorHTTP(503, "saturado", "El servicio está saturado; vuelva a intentarlo en unos segundos.")
+        self.esperando += 1
+        try:
+            await self.limite.acquire()
+        finally:
+            self.esperando -= 1
+        try:
+            return await corrutina
+        except ErrorHTTP:
+            raise
+        except PeticionInvalida as e:
+            raise ErrorHTTP(400, "peticion_invalida", str(e)) from None
+        except NoEncontrada as e:
+            raise ErrorHTTP(404, "no_encontrado", str(e)) from None
+        except FechaOcupadaError as e:
+            raise ErrorHTTP(409, "fecha_ocupada", str(e)) from None
+        except ConflictoVersionError as e:
+            raise ErrorHTTP(409, "conflicto_version", str(e)) from None
+        except PoolAgotadoError as e:
+            raise ErrorHTTP(503, "saturado", str(e)) from None
+        except Exception:
+            logger.exception("Error al atender la petición")
+            raise ErrorHTTP(500, "error_interno", "Error interno del servicio.") from None
+        finally:
+            self.limite.release()
+
+    async def _responder(self, escritor, estado, datos, seguir):
+        """
+        Escribe la respuesta: JSON, o texto plano si los datos ya son una cadena (métricas de Prometheus).
+        """
+        if isinstance(datos, str):
+            cuerpo, tipo = datos.encode("utf-8"), "text/plain; version=0.0.4; charset=utf-8"
+        else:
+            cuerpo, tipo = json.dumps(datos, ensure_ascii=False).encode("utf-8"), "application/json; charset=utf-8"
+        cabeceras = [
+            f"HTTP/1.1 {estado} {http.HTTPStatus(estado).phrase}",
+            f"Content-Type: {tipo}",
+            f"Content-Length: {len(cuerpo)}",
+            f"Connection: {'keep-alive' if seguir else 'close'}",
+        ]
+        if estado == 503:
+            cabeceras.append("Retry-After: 1")
+        escritor.write(("\r\n".join(cabeceras) + "\r\n\r\n").encode("latin-1") + cuerpo)
+        await escritor.drain()
+
+    @staticmethod
+    def _json(cuerpo):
+        """
+        Decodifica el cuerpo JSON de una petición.
+        """
+        try:
+            return json.loads(cuerpo or b"null")
+        except ValueError:
+            raise ErrorHTTP(400, "peticion_invalida", "El cuerpo no es JSON válido.") from None
+
+    @staticmethod
+    def _fecha(consulta, campo, obligatorio=True):
+        """
+        Lee una fecha de los parámetros de la URL.
+        """
+        if campo not in consulta:
+            if obligatorio:
+                raise PeticionInvalida(f"Falta el parámetro {campo}.")
+            return None
+        return leer_fecha(consulta[campo], campo)
+
+    async def _catalogos(self, consulta, cuerpo):
+        return 200, await self.en_hilo(self.servicio.catalogos)
+
+    async def _listar(self, consulta, cuerpo, salon_id):
+        desde = self._fecha(consulta, "desde", False)
+        hasta = self._fecha(consulta, "hasta", False)
+        return 200, await self.en_hilo(
+            self.servicio.listar, salon_id, desde, hasta, consulta.get("despues_de"), consulta.get("limite", 100),
+        )
+
+    async def _disponibilidad(self, consulta, cuerpo, salon_id):
+        fecha = self._fecha(consulta, "fecha")
+        excluir = leer_entero(consulta["excluir"], "excluir") if "excluir" in consulta else None
+        return 200, await self.en_hilo(self.servicio.disponibilidad, salon_id, fecha, consulta.get("jornadas", 0), excluir)
+
+    async def _ocupacion(self, consulta, cuerpo, salon_id):
+        desde = self._fecha(consulta, "desde", False) or datetime.date.today()
+        hasta = self._fecha(consulta, "hasta", False) or desde + datetime.timedelta(days=31)
+        return 200, await self.en_hilo(self.servicio.dias_ocupados, salon_id, desde, hasta)
+
+    async def _obtener(self, consulta, cuerpo, reserva_id):
+        return 200, await self.en_hilo(self.servicio.obtener, reserva_id)
+
+    async def _crear(self, consulta, cuerpo):
+        return 201, await self.en_hilo(self.servicio.crear, self._json(cuerpo))
+
+    async def _actualizar(self, consulta, cuerpo, reserva_id):
+        return 200, await self.en_hilo(self.servicio.actualizar, reserva_id, self._json(cuerpo))
+
+    async def _salud(self, consulta, cuerpo):
+        return 200, {
+            "estado": "ok",
+            "backend": self.pool.backend.describir() if self.pool.backend else None,
+            "pool": self.pool.estadisticas(),
+            "concurrencia": self.concurrencia,
+            "esperando": self.esperando,
+        }
+
+    async def _metricas(self, consulta, cuerpo):
+        if consulta.get("formato") == "json":
+            return 200, metricas.instantanea()
+        return 200, metricas.a_prometheus()
+
+
+async def servir(host=API_HOST, puerto=API_PUERTO, concurrencia=API_CONCURRENCIA, cola=API_COLA):
+    """
+    Arranca el servicio y lo mantiene hasta recibir SIGINT o SIGTERM.
+
+    Args:
+        host (str): Dirección en la que escuchar.
+        puerto (int): Puerto.
+        concurrencia (int): Peticiones atendidas a la vez (0: el tamaño del pool).
+        cola (int): Peticiones que pueden esperar turno antes de responder 503.
+    """
+    servidor = ServidorAPI(concurrencia=concurrencia, cola=cola)
+    host, puerto = await servidor.iniciar(host, puerto)
+    logger.info("Servicio de reservas en http://%s:%s (%s, %d peticiones a la vez)", host, puerto, servidor.pool.backend.describir(), servidor.concurrencia)
+    parar = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for senial in (signal.SIGINT, signal.SIGTERM):
+        try:
+            loop.add_signal_handler(senial, parar.set)
+        except (NotImplementedError, RuntimeError):
+            pass  # En Windows se sale con Ctrl+C (KeyboardInterrupt)
+    try:
+        await parar.wait()
+    finally:
+        await servidor.detener()
+
+
+def main(argv=None):
+    """
+    Punto de entrada de línea de comandos: python -m modelos.api [--host H] [--puerto P] [--concurrencia N] [--cola N]
+    """
+    parser = argparse.ArgumentParser(description="Servicio HTTP/JSON de reservas, sin interfaz gráfica.")
+    parser.add_argument("--host", default=API_HOST, help="Dirección en la que escuchar.")
+    parser.add_argument("--puerto", type=int, default=API_PUERTO, help="Puerto en el que escuchar.")
+    parser.add_argument("--concurrencia", type=int, default=API_CONCURRENCIA, help="Peticiones atendidas a la vez (0: tamaño del pool).")
+    parser.add_argument("--cola", type=int, default=API_COLA, help="Peticiones en espera antes de responder 503.")
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+
+    try:
+        migrar()  # Aplica las migraciones pendientes, como la aplicación de escritorio
+        asyncio.run(servir(args.host, args.puerto, args.concurrencia, args.cola))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        cerrar_pool()
+        if METRICAS_FICHERO:
+            metricas.guardar(METRICAS_FICHERO)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,465 @@
+import datetime
+import functools
+import os
+import re
+import sqlite3
+import threading
+from contextlib import contextmanager
+
+BACKEND = os.environ.get("HOTEL_DB_BACKEND", "mysql").lower()  # Motor de base de datos: mysql o sqlite
+
+# Parámetros de conexión a la base de datos MySQL (se pueden sobrescribir con variables de entorno o en .env)
+DB_CONFIG = {
+    "user": os.environ.get("HOTEL_DB_USUARIO", "root"),            # Usuario para la conexión
+    "password": os.environ.get("HOTEL_DB_CONTRASENIA", "root"),    # Contraseña para la conexión
+    "port": os.environ.get("HOTEL_DB_PUERTO", "3307"),             # Puerto de la base de datos
+    "host": os.environ.get("HOTEL_DB_HOST", "localhost"),          # Dirección del host (servidor)
+    "database": os.environ.get("HOTEL_DB_NOMBRE", "TAREA3DI"),     # Nombre de la base de datos
+}
+
+SQLITE_RUTA = os.environ.get("HOTEL_DB_SQLITE_RUTA", "hotel.db")  # Fichero de la base de datos SQLite
+SQLITE_ESPERA = float(os.environ.get("HOTEL_DB_SQLITE_ESPERA", 5))  # Segundos de espera si otra conexión está escribiendo
+
+# Pragmas de cada conexión SQLite: WAL permite lecturas concurrentes con una escritura y, con él,
+# synchronous=NORMAL es seguro ante caídas de la aplicación sin sincronizar el disco en cada commit
+PRAGMAS_SQLITE = {
+    "journal_mode": "WAL",
+    "synchronous": "NORMAL",
+    "foreign_keys": "ON",
+    "temp_store": "MEMORY",
+    "cache_size": "-65536",      # 64 MiB de caché de páginas por conexión
+    "mmap_size": "268435456",    # 256 MiB de lectura mapeada en memoria
+    "busy_timeout": str(int(SQLITE_ESPERA * 1000)),
+}
+
+# SQLite guarda las fechas como texto ISO; se convierten a date/datetime según el tipo declarado de la columna
+sqlite3.register_adapter(datetime.date, datetime.date.isoformat)
+sqlite3.register_adapter(datetime.datetime, lambda valor: valor.isoformat(" "))
+sqlite3.register_converter("DATE", lambda valor: datetime.date.fromisoformat(valor.decode()))
+sqlite3.register_converter("TIMESTAMP", lambda valor: datetime.datetime.fromisoformat(valor.decode()))
+
+
+class Backend:
+    """
+    Interfaz de un motor de base de datos: cómo abrir conexiones y las diferencias de dialecto SQL.
+    Los DAOs escriben sus consultas con marcadores %s y el SQL común a MySQL y SQLite;
+    el backend traduce lo necesario y resuelve lo que no es común (cerrojos, planes, índices).
+    """
+    nombre = None  # Nombre del motor en la configuración (HOTEL_DB_BACKEND)
+    preparadas = False  # Si admite cursores con sentencias preparadas reutilizables
+
+    def conectar(self):
+        """
+        Abre una conexión nueva en modo autocommit.
+        """
+        raise NotImplementedError
+
+    def esta_viva(self, conn):
+        """
+        Comprueba si una conexión sigue siendo utilizable.
+        """
+        raise NotImplementedError
+
+    def cursor(self, conn):
+        """
+        Devuelve un cursor de tuplas con todas las filas leídas al ejecutar.
+        """
+        return conn.cursor()
+
+    def cursor_preparado(self, conn):
+        """
+        Devuelve un cursor que prepara su sentencia en el servidor (solo si preparadas es True).
+        """
+        raise NotImplementedError
+
+    def cursor_flujo(self, conn):
+        """
+        Devuelve un cursor que lee las filas del servidor a medida que se piden con fetchmany.
+        """
+        return conn.cursor()
+
+    def traducir(self, query):
+        """
+        Adapta los marcadores de parámetros de una consulta al motor.
+        """
+        return query
+
+    def adaptar_ddl(self, sql):
+        """
+        Adapta una sentencia de definición del esquema escrita para MySQL al motor.
+        """
+        return sql
+
+    def iniciar_transaccion(self, conn):
+        """
+        Empieza una transacción explícita en una conexión en modo autocommit (se termina con conn.commit()).
+        """
+        raise NotImplementedError
+
+    @contextmanager
+    def bloqueo_migraciones(self, cursor):
+        """
+        Impide que dos procesos apliquen migraciones a la vez sobre la misma base de datos.
+        """
+        raise NotImplementedError
+        yield
+
+    def indices(self, cursor, tabla):
+        """
+        Devuelve los índices de una tabla.
+
+        Returns:
+            list: Tuplas (nombre, tupla de columnas en orden, es único).
+        """
+        raise NotImplementedError
+
+    def explicar(self, cursor, query, params):
+        """
+        Obtiene el plan de una consulta y detecta si recorre alguna tabla completa sin índice aplicable.
+
+        Returns:
+            tuple: (filas del plan como diccionarios, lista de tablas recorridas sin índice).
+        """
+        raise NotImplementedError
+
+    def analizar(self, cursor, tabla):
+        """
+        Actualiza las estadísticas de una tabla para el optimizador.
+        """
+        raise NotImplementedError
+
+    def describir(self):
+        """
+        Devuelve una descripción legible de la base de datos a la que apunta el backend.
+        """
+        raise NotImplementedError
+
+    def es_duplicado(self, error):
+        """
+        Indica si una excepción del conector es la violación de una restricción UNIQUE o PRIMARY KEY.
+        """
+        raise NotImplementedError
+
+    def contiene_palabras(self, columna, terminos):
+        """
+        Construye la condición de que una columna de texto contenga todos los términos (ya normalizados).
+
+        Returns:
+            tuple: (condición SQL con marcadores %s, lista de parámetros).
+        """
+        raise NotImplementedError
+
+    def empieza_por(self, columna, prefijo):
+        """
+        Construye la condición de que una columna empiece por un prefijo, resoluble con su índice.
+
+        Returns:
+            tuple: (condición SQL con un marcador %s, parámetro).
+        """
+        raise NotImplementedError
+
+    def hace_segundos(self):
+        """
+        Construye la expresión del momento de hace %s segundos según el reloj de la base de datos,
+        comparable con las columnas que se rellenan con CURRENT_TIMESTAMP (en SQLite, UTC).
+        """
+        raise NotImplementedError
+
+    def mes(self, columna):
+        """
+        Construye la expresión que convierte una columna de fecha en su mes como entero AAAAMM.
+        """
+        raise NotImplementedError
+
+    @staticmethod
+    def diccionarios(cursor):
+        """
+        Convierte las filas pendientes de un cursor en diccionarios por nombre de columna.
+        """
+        nombres = [columna[0] for columna in cursor.description]
+        return [dict(zip(nombres, fila)) for fila in cursor.fetchall()]
+
+
+class BackendMySQL(Backend):
+    """
+    Servidor MySQL, con los parámetros de DB_CONFIG.
+    mysql.connector se importa al abrir la primera conexión: cargarlo cuesta decenas de milisegundos
+    que no deben pagar el arranque de la aplicación ni las instalaciones con SQLite.
+    """
+    nombre = "mysql"
+    preparadas = True
+
+    def __init__(self, config=None):
+        """
+        Inicializa el backend.
+
+        Args:
+            config (dict): Parámetros de mysql.connector.connect (por defecto DB_CONFIG).
+        """
+        self.config = config if config is not None else DB_CONFIG
+
+    def conectar(self):
+        """
+        Abre una conexión nueva a MySQL.
+
+        Returns:
+            Conexión de mysql.connector en modo autocommit, de forma que las lecturas
+            no dejen transacciones abiertas en las conexiones que vuelven al pool.
+        """
+        import mysql.connector
+        conn = mysql.connector.connect(**self.config)
+        conn.autocommit = True
+        return conn
+
+    def esta_viva(self, conn):
+        return conn.is_connected()
+
+    def cursor(self, conn):
+        return conn.cursor(buffered=True)
+
+    def cursor_preparado(self, conn):
+        return conn.cursor(prepared=True)
+
+    def iniciar_transaccion(self, conn):
+        conn.start_transaction()
+
+    @contextmanager
+    def bloqueo_migraciones(self, cursor):
+        """
+        Toma un cerrojo con nombre del servidor; en MySQL el DDL no es transaccional, así que no hay rollback.
+        """
+        cursor.execute("SELECT GET_LOCK('hotel_migraciones', 30)")
+        if cursor.fetchone()[0] != 1:
+            raise RuntimeError("Otro proceso está aplicando migraciones.")
+        try:
+            yield
+        finally:
+            cursor.execute("SELECT RELEASE_LOCK('hotel_migraciones')")
+            cursor.fetchall()
+
+    def indices(self, cursor, tabla):
+        cursor.execute(
+            """
+            SELECT INDEX_NAME, NON_UNIQUE, GROUP_CONCAT(COLUMN_NAME ORDER BY SEQ_IN_INDEX) AS columnas
+            FROM information_schema.STATISTICS
+            WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s
+            GROUP BY INDEX_NAME, NON_UNIQUE
+            """,
+            (tabla,),
+        )
+        return [(nombre, tuple(columnas.split(",")), not no_unico) for nombre, no_unico, columnas in cursor.fetchall()]
+
+    def explicar(self, cursor, query, params):
+        cursor.execute("EXPLAIN " + query, params)
+        filas = self.diccionarios(cursor)
+        sin_indice = [fila.get("table") for fila in filas if fila.get("type") == "ALL" and not fila.get("possible_keys")]
+        return filas, sin_indice
+
+    def analizar(self, cursor, tabla):
+        cursor.execute(f"ANALYZE TABLE {tabla}")
+        cursor.fetchall()
+
+    def describir(self):
+        return f"MySQL {self.config['host']}:{self.config['port']}/{self.config['database']}"
+
+    def es_duplicado(self, error):
+        import mysql.connector
+        return isinstance(error, mysql.connector.errors.IntegrityError) and error.errno == 1062  # ER_DUP_ENTRY
+
+    def contiene_palabras(self, columna, terminos):
+        # Índice FULLTEXT con el analizador ngram: cada término es una frase de n-gramas que debe aparecer
+        return f"MATCH({columna}) AGAINST (%s IN BOOLEAN MODE)", [" ".join(f'+"{termino}"' for termino in terminos)]
+
+    def empieza_por(self, columna, prefijo):
+        return f"{columna} LIKE %s", prefijo + "%"
+
+    def hace_segundos(self):
+        return "CURRENT_TIMESTAMP - INTERVAL %s SECOND"
+
+    def mes(self, columna):
+        return f"EXTRACT(YEAR_MONTH FROM {columna})"
+
+
+class BackendSQLite(Backend):
+    """
+    Base de datos SQLite embebida en un fichero, sin servidor: pensada para instalaciones pequeñas,
+    pruebas y benchmarks en el propio proceso. Usa WAL y los pragmas de PRAGMAS_SQLITE.
+    """
+    nombre = "sqlite"
+    preparadas = False  # sqlite3 ya guarda en caché las sentencias compiladas de cada conexión
+
+    _MARCADORES = re.compile(r"%s")
+    _AUTOINCREMENTO = re.compile(r"\bINT\s+AUTO_INCREMENT\s+PRIMARY\s+KEY\b", re.IGNORECASE)
+
+    def __init__(self, ruta=None, pragmas=None):
+        """
+        Inicializa el backend.
+
+        Args:
+            ruta (str): Fichero de la base de datos (por defecto SQLITE_RUTA); se crea si no existe.
+            pragmas (dict): Pragmas que se aplican a cada conexión (por defecto PRAGMAS_SQLITE).
+        """
+        self.ruta = ruta or SQLITE_RUTA
+        self.pragmas = pragmas if pragmas is not None else PRAGMAS_SQLITE
+
+    def conectar(self):
+        """
+        Abre una conexión nueva al fichero SQLite.
+
+        Returns:
+            sqlite3.Connection: Conexión en modo autocommit (isolation_level=None), utilizable desde
+            cualquier hilo porque el pool garantiza que solo la use uno a la vez.
+        """
+        conn = sqlite3.connect(
+            self.ruta, timeout=SQLITE_ESPERA, detect_types=sqlite3.PARSE_DECLTYPES,
+            isolation_level=None, check_same_thread=False, cached_statements=256,
+        )
+        for pragma, valor in self.pragmas.items():
+            conn.execute(f"PRAGMA {pragma} = {valor}")
+        return conn
+
+    def esta_viva(self, conn):
+        conn.execute("SELECT 1")
+        return True
+
+    def traducir(self, query):
+        return _traducir_sqlite(query)
+
+    def adaptar_ddl(self, sql):
+        return self._AUTOINCREMENTO.sub("INTEGER PRIMARY KEY AUTOINCREMENT", sql)
+
+    def iniciar_transaccion(self, conn):
+        conn.execute("BEGIN")
+
+    @contextmanager
+    def bloqueo_migraciones(self, cursor):
+        """
+        Toma el cerrojo de escritura de la base de datos; en SQLite el DDL es transaccional,
+        así que si una migración falla se deshace completa.
+        """
+        cursor.execute("BEGIN IMMEDIATE")
+        try:
+            yield
+        except BaseException:
+            cursor.execute("ROLLBACK")
+            raise
+        cursor.execute("COMMIT")
+
+    def indices(self, cursor, tabla):
+        cursor.execute(f"PRAGMA index_list({tabla})")
+        resultado = []
+        for _, nombre, unico, *_ in cursor.fetchall():
+            cursor.execute(f"PRAGMA index_info({nombre})")
+            columnas = tuple(columna for _, _, columna in sorted(cursor.fetchall()))
+            resultado.append((nombre, columnas, bool(unico)))
+        return resultado
+
+    def explicar(self, cursor, query, params):
+        cursor.execute("EXPLAIN QUERY PLAN " + self.traducir(query), params)
+        filas = self.diccionarios(cursor)
+        # "SCAN tabla" sin "USING ... INDEX" es un recorrido completo; SEARCH o SCAN con índice no lo son
+        sin_indice = [
+            fila["detail"].split()[1] for fila in filas
+            if fila["detail"].startswith("SCAN ") and "INDEX" not in fila["detail"]
+        ]
+        return filas, sin_indice
+
+    def analizar(self, cursor, tabla):
+        cursor.execute(f"ANALYZE {tabla}")
+
+    def describir(self):
+        return f"SQLite {os.path.abspath(self.ruta)}"
+
+    def es_duplicado(self, error):
+        return isinstance(error, sqlite3.IntegrityError) and "UNIQUE constraint failed" in str(error)
+
+    def contiene_palabras(self, columna, terminos):
+        # Sin índice de texto: recorre la tabla, suficiente para desarrollo y pruebas
+        return " AND ".join(f"{columna} LIKE %s" for _ in terminos), [f"%{termino}%" for termino in terminos]
+
+    def empieza_por(self, columna, prefijo):
+        # GLOB distingue mayúsculas, así que SQLite puede resolverlo con un índice normal (LIKE necesitaría NOCASE)
+        return f"{columna} GLOB %s", prefijo + "*"
+
+    def hace_segundos(self):
+        return "datetime('now', '-' || %s || ' seconds')"
+
+    def mes(self, columna):
+        return f"CAST(strftime('%Y%m', {columna}) AS INTEGER)"
+
+
+@functools.lru_cache(maxsize=512)
+def _traducir_sqlite(query):
+    """
+    Cambia los marcadores %s por ?. Las consultas de los DAOs son textos fijos, así que se guarda en caché.
+    """
+    return BackendSQLite._MARCADORES.sub("?", query)
+
+
+BACKENDS = {backend.nombre: backend for backend in (BackendMySQL, BackendSQLite)}  # Motores disponibles por nombre
+
+
+def crear_backend(nombre=None, **opciones):
+    """
+    Crea un backend a partir de su nombre.
+
+    Args:
+        nombre (str): "mysql" o "sqlite" (por defecto el de HOTEL_DB_BACKEND).
+        **opciones: Argumentos del constructor del backend (config para MySQL; ruta y pragmas para SQLite).
+
+    Returns:
+        Backend: El backend creado.
+
+    Raises:
+        ValueError: Si el nombre no corresponde a ningún motor.
+    """
+    nombre = (nombre or BACKEND).lower()
+    if nombre not in BACKENDS:
+        raise ValueError(f"Motor de base de datos desconocido: {nombre} (disponibles: {', '.join(BACKENDS)}).")
+    return BACKENDS[nombre](**opciones)
+
+
+_backend = None
+_backend_lock = threading.Lock()
+
+
+def get_backend():
+    """
+    Devuelve el backend configurado para el proceso, creándolo la primera vez.
+
+    Returns:
+        Backend: El backend compartido.
+    """
+    global _backend
+    with _backend_lock:
+        if _backend is None:
+            _backend = crear_backend()
+        return _backend
+
+
+def configurar_backend(nombre=None, **opciones):
+    """
+    Sustituye el backend del proceso. Los pools creados después lo usarán.
+
+    Args:
+        nombre (str): "mysql" o "sqlite".
+        **opciones: Argumentos del constructor del backend.
+
+    Returns:
+        Backend: El nuevo backend compartido.
+    """
+    global _backend
+    backend = crear_backend(nombre, **opciones)
+    with _backend_lock:
+        _backend = backend
+    return backend
+
+
+def conectar_mysql():
+    """
+    Abre una conexión nueva a MySQL con los parámetros de DB_CONFIG.
+
+    Returns:
+        Conexión de mysql.connector en modo autocommit.
+    """
+    return BackendMySQL().conectar()
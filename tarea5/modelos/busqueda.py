@@ -0,0 +1,384 @@
+import bisect
+import heapq
+import re
+import sys
+import threading
+import unicodedata
+
+MIN_NOMBRE = 2  # Letras mínimas de un término de nombre
+MIN_TELEFONO = 3  # Dígitos mínimos de un prefijo de teléfono
+LIMITE_RESULTADOS = 50  # Reservas que se devuelven como máximo en cada búsqueda
+MAX_MEZCLA = 32  # Postings a partir de los cuales se ordenan juntos en lugar de mezclarse
+
+_NO_ALFANUMERICO = re.compile(r"[^0-9a-z]+")
+_NO_DIGITO = re.compile(r"\D+")
+
+
+def normalizar(texto):
+    """
+    Pasa un texto a minúsculas sin tildes y con cualquier carácter que no sea letra o dígito convertido en espacio.
+
+    Args:
+        texto (str): El texto.
+
+    Returns:
+        str: El texto normalizado.
+    """
+    descompuesto = unicodedata.normalize("NFKD", texto or "").lower()
+    sin_tildes = "".join(c for c in descompuesto if not unicodedata.combining(c))
+    return _NO_ALFANUMERICO.sub(" ", sin_tildes).strip()
+
+
+def digitos(telefono):
+    """
+    Deja solo los dígitos de un teléfono, como la columna telefono_digitos de la base de datos.
+
+    Args:
+        telefono (str): El teléfono tal como se escribió.
+
+    Returns:
+        str: Sus dígitos.
+    """
+    return _NO_DIGITO.sub("", telefono or "")
+
+
+def analizar(texto):
+    """
+    Separa lo que se busca en términos de nombre y prefijo de teléfono: los términos solo con dígitos
+    se juntan en un prefijo de teléfono ("612 34" busca 61234...) y el resto son partes del nombre.
+
+    Args:
+        texto (str): Lo escrito en el cuadro de búsqueda.
+
+    Returns:
+        tuple: (lista de términos de nombre, prefijo de teléfono o "").
+    """
+    terminos = normalizar(texto).split()
+    telefono = "".join(termino for termino in terminos if termino.isdigit())
+    nombre = [termino for termino in terminos if not termino.isdigit()]
+    return nombre, telefono
+
+
+def es_busqueda_valida(nombre, telefono):
+    """
+    Indica si los términos son lo bastante largos para buscar sin devolver medio histórico.
+    """
+    if not nombre and not telefono:
+        return False
+    return all(len(termino) >= MIN_NOMBRE for termino in nombre) and (not telefono or len(telefono) >= MIN_TELEFONO)
+
+
+def _trigramas(palabra):
+    return {palabra[i:i + 3] for i in range(len(palabra) - 2)}
+
+
+def _lista(posting):
+    return (posting,) if isinstance(posting, int) else posting
+
+
+def _tamanio(posting):
+    return 1 if isinstance(posting, int) else len(posting)
+
+
+def _anadir(postings, clave, reserva_id, ordenar):
+    """
+    Añade una reserva al posting de una clave, manteniéndolo ordenado si se pide.
+
+    Returns:
+        bool: True si la clave no existía.
+    """
+    actual = postings.get(clave)
+    if actual is None:
+        postings[clave] = reserva_id
+        return True
+    if isinstance(actual, int):
+        postings[clave] = [min(actual, reserva_id), max(actual, reserva_id)]
+    elif ordenar:
+        bisect.insort(actual, reserva_id)
+    else:
+        actual.append(reserva_id)
+    return False
+
+
+def _retirar(postings, clave, reserva_id):
+    """
+    Quita una reserva del posting de una clave.
+
+    Returns:
+        bool: True si la clave se ha quedado sin reservas y se ha eliminado.
+    """
+    actual = postings[clave]
+    if isinstance(actual, int):
+        del postings[clave]
+        return True
+    actual.remove(reserva_id)
+    if len(actual) == 1:
+        postings[clave] = actual[0]
+    return False
+
+
+class IndiceHuespedes:
+    """
+    Índice invertido en memoria de los nombres y teléfonos de todas las reservas, para buscar huéspedes
+    en todos los salones sin consultar la base de datos.
+
+    Los nombres se indexan por palabra normalizada (reservas por palabra) y, sobre el vocabulario de palabras
+    distintas, por trigramas y en una lista ordenada: un término de dos letras busca palabras que empiezan por él
+    y uno más largo, palabras que lo contienen. Los teléfonos se indexan por sus dígitos en otra lista ordenada,
+    donde un prefijo es un rango que se encuentra con dos búsquedas binarias. Las reservas de cada palabra
+    o teléfono (su posting) son una lista ordenada de IDs, o el propio ID si solo hay una, que es lo habitual
+    en los teléfonos: con un millón de reservas, la diferencia son cientos de megas.
+    Se construye una vez desde la base de datos por lotes y después se mantiene con cada alta, modificación
+    o baja (propia o de otro puesto). Todos los métodos son seguros entre hilos.
+    """
+    VACIO, CARGANDO, LISTO = "vacío", "cargando", "listo"
+
+    def __init__(self):
+        """
+        Inicializa el índice vacío.
+        """
+        self._lock = threading.RLock()
+        self.estado = self.VACIO
+        self._generacion = 0  # Cambia al empezar una carga o invalidar: una carga anterior ya no debe completarse
+        self._vaciar()
+
+    def _vaciar(self):
+        """
+        Descarta todo el contenido. Debe llamarse con el cerrojo tomado.
+        """
+        self._reservas = {}  # reserva_id -> "palabras del nombre\tdígitos del teléfono"
+        self._palabras = {}  # palabra -> reservas que la tienen en el nombre (posting)
+        self._trigramas = {}  # trigrama -> palabras del vocabulario que lo contienen
+        self._telefonos = {}  # dígitos -> reservas con ese teléfono (posting)
+        self._vocabulario = []  # Palabras distintas, ordenadas
+        self._numeros = []  # Teléfonos distintos, ordenados
+        self._recientes = set()  # Reservas registradas durante la carga, que los lotes ya leídos no deben pisar
+
+    def listo(self):
+        """
+        Indica si el índice tiene todas las reservas y puede responder búsquedas.
+        """
+        return self.estado == self.LISTO
+
+    def cargar(self, lotes):
+        """
+        Construye el índice desde cero con las reservas de la base de datos, leídas por lotes.
+        Las altas y modificaciones que lleguen mientras tanto se aplican al momento y prevalecen sobre los lotes.
+
+        Args:
+            lotes (iterable): Lotes de tuplas (reserva_id, persona, telefono).
+
+        Returns:
+            int: Reservas indexadas, o None si el índice se invalidó o se volvió a cargar mientras tanto.
+        """
+        with self._lock:
+            self._vaciar()
+            self.estado = self.CARGANDO
+            self._generacion += 1
+            generacion = self._generacion
+        try:
+            for filas in lotes:
+                with self._lock:
+                    if self._generacion != generacion:
+                        return None
+                    for reserva_id, persona, telefono in filas:
+                        if reserva_id not in self._recientes:
+                            self._poner(reserva_id, persona, telefono, ordenar=False)
+        except BaseException:
+            with self._lock:
+                if self._generacion == generacion:
+                    self._vaciar()
+                    self.estado = self.VACIO
+            raise
+        with self._lock:
+            if self._generacion != generacion:
+                return None
+            # Las listas ordenadas se construyen una vez al final, no con una inserción ordenada por cada reserva
+            for postings in (self._palabras, self._telefonos):
+                for posting in postings.values():
+                    if not isinstance(posting, int):
+                        posting.sort()
+            self._vocabulario = sorted(self._palabras)
+            self._numeros = sorted(self._telefonos)
+            self._recientes = set()
+            self.estado = self.LISTO
+            return len(self._reservas)
+
+    def invalidar(self):
+        """
+        Descarta el índice (por ejemplo, tras una carga masiva); hasta que se vuelva a cargar, las búsquedas van a la base de datos.
+        """
+        with self._lock:
+            self._vaciar()
+            self.estado = self.VACIO
+            self._generacion += 1
+
+    def registrar(self, reserva, anterior=None):
+        """
+        Indexa una reserva creada o modificada, sustituyendo su nombre y teléfono anteriores.
+        No hace nada si el índice no se ha empezado a cargar: la carga ya leerá la reserva.
+
+        Args:
+            reserva (ReservaModel): La reserva guardada.
+            anterior (tuple): No se usa: el índice ya guarda lo que tenía cada reserva.
+        """
+        with self._lock:
+            if self.estado == self.VACIO:
+                return
+            if self.estado == self.CARGANDO:
+                self._recientes.add(reserva.reserva_id)
+            self._poner(reserva.reserva_id, reserva.persona, reserva.telefono, ordenar=self.estado == self.LISTO)
+
+    def descartar_salon(self, salon_id):
+        """
+        Avisa de una carga masiva en un salón, que no notifica reserva a reserva: el índice deja de estar completo.
+
+        Args:
+            salon_id (int): El ID del salón.
+        """
+        self.invalidar()
+
+    def quitar(self, reserva_id):
+        """
+        Quita una reserva borrada del índice.
+
+        Args:
+            reserva_id (int): El ID de la reserva.
+        """
+        with self._lock:
+            if self.estado == self.CARGANDO:
+                self._recientes.add(reserva_id)
+            self._sacar(reserva_id)
+
+    def buscar(self, texto, limite=LIMITE_RESULTADOS):
+        """
+        Busca reservas cuyo nombre contenga todos los términos y cuyo teléfono empiece por los dígitos escritos.
+        Se recorren de la más reciente a la más antigua las reservas del criterio más selectivo, comprobando
+        los demás sobre cada una, y se para al llegar al límite: el coste depende de los resultados pedidos,
+        no de cuántas reservas coinciden en todo el histórico.
+
+        Args:
+            texto (str): Lo escrito en el cuadro de búsqueda.
+            limite (int): Número máximo de reservas a devolver.
+
+        Returns:
+            list: IDs de las reservas encontradas, de la más reciente a la más antigua.
+        """
+        nombre, telefono = analizar(texto)
+        if not es_busqueda_valida(nombre, telefono):
+            return []
+        with self._lock:
+            criterios = [(self._palabras, self._por_palabra(termino)) for termino in nombre]
+            if telefono:
+                criterios.append((self._telefonos, self._rango(self._numeros, telefono)))
+            postings, claves = min(criterios, key=lambda criterio: sum(_tamanio(criterio[0][clave]) for clave in criterio[1]))
+            resultado, anterior = [], None
+            if len(claves) > MAX_MEZCLA:
+                # Muchas palabras (p. ej. "garc" con cientos de variantes): ordenar todos los IDs de una vez
+                # sale más barato que una mezcla con un iterador por palabra
+                candidatos = [reserva_id for clave in claves for reserva_id in _lista(postings[clave])]
+                candidatos.sort(reverse=True)
+            else:
+                candidatos = heapq.merge(*(reversed(_lista(postings[clave])) for clave in claves), reverse=True)
+            for reserva_id in candidatos:
+                if reserva_id == anterior:
+                    continue  # Reserva con dos palabras que encajan con el mismo término
+                anterior = reserva_id
+                if self._cumple(reserva_id, nombre, telefono):
+                    resultado.append(reserva_id)
+                    if len(resultado) == limite:
+                        break
+            return resultado
+
+    def estadisticas(self):
+        """
+        Devuelve el tamaño del índice.
+
+        Returns:
+            dict: Estado, reservas, palabras distintas, trigramas y teléfonos distintos.
+        """
+        with self._lock:
+            return {
+                "estado": self.estado,
+                "reservas": len(self._reservas),
+                "palabras": len(self._palabras),
+                "trigramas": len(self._trigramas),
+                "telefonos": len(self._telefonos),
+            }
+
+    def _por_palabra(self, termino):
+        """
+        Devuelve las palabras del vocabulario que encajan con un término: las que empiezan por él si es corto
+        y las que lo contienen si tiene tres letras o más. Debe llamarse con el cerrojo tomado.
+        """
+        if len(termino) < 3:
+            return self._rango(self._vocabulario, termino)
+        conjuntos = sorted((self._trigramas.get(trigrama, set()) for trigrama in _trigramas(termino)), key=len)
+        return [palabra for palabra in conjuntos[0].intersection(*conjuntos[1:]) if termino in palabra]
+
+    def _cumple(self, reserva_id, nombre, telefono):
+        """
+        Comprueba si una reserva encaja con todos los términos de nombre y con el prefijo de teléfono.
+        Debe llamarse con el cerrojo tomado.
+        """
+        palabras, _, numero = self._reservas[reserva_id].partition("\t")
+        if not numero.startswith(telefono):
+            return False
+        palabras = palabras.split()
+        return all(any(palabra.startswith(termino) if len(termino) < 3 else termino in palabra for palabra in palabras) for termino in nombre)
+
+    @staticmethod
+    def _rango(ordenados, prefijo):
+        """
+        Devuelve los elementos de una lista ordenada que empiezan por un prefijo, con dos búsquedas binarias.
+        """
+        inicio = bisect.bisect_left(ordenados, prefijo)
+        fin = bisect.bisect_left(ordenados, prefijo + "\uffff", inicio)
+        return ordenados[inicio:fin]
+
+    def _poner(self, reserva_id, persona, telefono, ordenar):
+        """
+        Indexa una reserva, quitando antes lo que tuviera. Con ordenar=False (durante la carga) no se mantienen
+        ordenadas las listas, que se ordenan de una vez al terminar. Debe llamarse con el cerrojo tomado.
+        """
+        palabras = [sys.intern(palabra) for palabra in dict.fromkeys(normalizar(persona).split())]
+        numero = digitos(telefono)
+        texto = " ".join(palabras) + "\t" + numero  # Una sola cadena por reserva: ocupa menos que una tupla de palabras
+        if self._reservas.get(reserva_id) == texto:
+            return
+        self._sacar(reserva_id)
+        self._reservas[reserva_id] = texto
+        for palabra in palabras:
+            if _anadir(self._palabras, palabra, reserva_id, ordenar):
+                for trigrama in _trigramas(palabra):
+                    self._trigramas.setdefault(trigrama, set()).add(palabra)
+                if ordenar:
+                    bisect.insort(self._vocabulario, palabra)
+        if numero and _anadir(self._telefonos, numero, reserva_id, ordenar) and ordenar:
+            bisect.insort(self._numeros, numero)
+
+    def _sacar(self, reserva_id):
+        """
+        Quita una reserva del índice; las palabras y teléfonos que se quedan sin reservas salen del vocabulario.
+        Debe llamarse con el cerrojo tomado.
+        """
+        anterior = self._reservas.pop(reserva_id, None)
+        if anterior is None:
+            return
+        palabras, _, numero = anterior.partition("\t")
+        for palabra in palabras.split():
+            if _retirar(self._palabras, palabra, reserva_id):
+                for trigrama in _trigramas(palabra):
+                    self._trigramas[trigrama].discard(palabra)
+                self._quitar_ordenado(self._vocabulario, palabra)
+        if numero and _retirar(self._telefonos, numero, reserva_id):
+            self._quitar_ordenado(self._numeros, numero)
+
+    @staticmethod
+    def _quitar_ordenado(ordenados, valor):
+        posicion = bisect.bisect_left(ordenados, valor)
+        if posicion < len(ordenados) and ordenados[posicion] == valor:
+            del ordenados[posicion]
+
+
+indice_huespedes = IndiceHuespedes()  # Índice compartido por todo el proceso
@@ -0,0 +1,428 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+
+CATALOGO_TTL = float(os.environ.get("HOTEL_CATALOGO_TTL", 300))  # Segundos que se consideran vigentes los catálogos
+SALONES_EN_CACHE = int(os.environ.get("HOTEL_CACHE_SALONES", 16))  # Salones cuya primera página de reservas se guarda en memoria
+MESES_EN_CACHE = int(os.environ.get("HOTEL_CACHE_MESES", 120))  # Meses cuyo informe terminado se guarda en memoria
+
+
+class CacheCatalogo:
+    """
+    Caché en memoria de lectura directa para una tabla de catálogo (salones, tipos de cocina, tipos de reserva).
+    La primera consulta carga la tabla completa y construye los índices por ID y por nombre;
+    las siguientes se sirven desde memoria hasta que vence el TTL o se invalida explícitamente.
+    """
+    def __init__(self, nombre, campo_id, ttl=CATALOGO_TTL):
+        """
+        Inicializa la caché vacía.
+
+        Args:
+            nombre (str): Nombre de la tabla cacheada (se usa en las estadísticas).
+            campo_id (str): Atributo del modelo que actúa como clave primaria.
+            ttl (float): Segundos de vigencia de los datos cargados.
+        """
+        self.nombre = nombre
+        self.campo_id = campo_id
+        self.ttl = ttl
+        self._lock = threading.RLock()
+        self._lista = None  # Modelos en el orden devuelto por la base de datos
+        self._por_id = {}  # ID -> modelo
+        self._por_nombre = {}  # nombre -> modelo
+        self._cargado_en = 0.0
+        self._contadores = {"aciertos": 0, "fallos": 0, "invalidaciones": 0}
+
+    def get(self, id_, cargar):
+        """
+        Obtiene un modelo por su ID.
+
+        Args:
+            id_ (int): El ID buscado.
+            cargar (callable): Función que consulta la tabla completa si la caché no está vigente.
+
+        Returns:
+            El modelo, o None si no existe.
+        """
+        with self._lock:
+            self._asegurar(cargar)
+            return self._por_id.get(id_)
+
+    def get_por_nombre(self, nombre, cargar):
+        """
+        Obtiene un modelo por su nombre.
+
+        Args:
+            nombre (str): El nombre buscado.
+            cargar (callable): Función que consulta la tabla completa si la caché no está vigente.
+
+        Returns:
+            El modelo, o None si no existe.
+        """
+        with self._lock:
+            self._asegurar(cargar)
+            return self._por_nombre.get(nombre)
+
+    def get_all(self, cargar):
+        """
+        Obtiene todos los modelos del catálogo.
+
+        Args:
+            cargar (callable): Función que consulta la tabla completa si la caché no está vigente.
+
+        Returns:
+            list: Copia de la lista de modelos.
+        """
+        with self._lock:
+            self._asegurar(cargar)
+            return list(self._lista)
+
+    def invalidar(self):
+        """
+        Descarta los datos cargados; la próxima consulta volverá a la base de datos.
+        """
+        with self._lock:
+            self._lista = None
+            self._por_id = {}
+            self._por_nombre = {}
+            self._contadores["invalidaciones"] += 1
+
+    def estadisticas(self):
+        """
+        Devuelve los contadores de aciertos y fallos de la caché.
+
+        Returns:
+            dict: Aciertos, fallos, invalidaciones y número de filas cargadas.
+        """
+        with self._lock:
+            datos = dict(self._contadores)
+            datos["filas"] = len(self._lista) if self._lista is not None else 0
+            return datos
+
+    def _asegurar(self, cargar):
+        """
+        Carga la tabla si la caché está vacía o vencida. Debe llamarse con el cerrojo tomado.
+        """
+        if self._lista is not None and time.monotonic() - self._cargado_en < self.ttl:
+            self._contadores["aciertos"] += 1
+            return
+        self._contadores["fallos"] += 1
+        lista = cargar()
+        self._lista = lista
+        self._por_id = {getattr(modelo, self.campo_id): modelo for modelo in lista}
+        self._por_nombre = {modelo.nombre: modelo for modelo in lista}
+        self._cargado_en = time.monotonic()
+
+
+_catalogos = []  # Todas las cachés de catálogo creadas en el proceso
+
+
+def registrar_catalogo(nombre, campo_id, ttl=CATALOGO_TTL):
+    """
+    Crea una caché de catálogo y la registra para invalidarla o consultarla en bloque.
+
+    Args:
+        nombre (str): Nombre de la tabla cacheada.
+        campo_id (str): Atributo del modelo que actúa como clave primaria.
+        ttl (float): Segundos de vigencia de los datos cargados.
+
+    Returns:
+        CacheCatalogo: La caché creada.
+    """
+    cache = CacheCatalogo(nombre, campo_id, ttl)
+    _catalogos.append(cache)
+    return cache
+
+
+def invalidar_catalogos():
+    """
+    Invalida todas las cachés de catálogo registradas.
+    """
+    for cache in _catalogos:
+        cache.invalidar()
+
+
+def estadisticas_catalogos():
+    """
+    Devuelve las estadísticas de todas las cachés de catálogo registradas.
+
+    Returns:
+        dict: Nombre de la tabla -> estadísticas de su caché.
+    """
+    return {cache.nombre: cache.estadisticas() for cache in _catalogos}
+
+
+class CacheReservasSalon:
+    """
+    Caché LRU de la primera página de reservas de cada salón, la que muestra la rejilla al seleccionarlo.
+    Cada salón tiene un número de versión que sube con cada escritura en él (los DAOs avisan a invalidar()):
+    una entrada solo vale si se guardó con la versión vigente y para el mismo día.
+    """
+    def __init__(self, maximo=SALONES_EN_CACHE):
+        """
+        Inicializa la caché vacía.
+
+        Args:
+            maximo (int): Número de salones que se conservan; al pasarse se descarta el usado hace más tiempo.
+        """
+        self.maximo = maximo
+        self._lock = threading.Lock()
+        self._entradas = OrderedDict()  # salon_id -> (versión, día, página), de menos a más reciente
+        self._versiones = {}  # salon_id -> versión
+        self._contadores = {"aciertos": 0, "fallos": 0, "invalidaciones": 0, "descartes": 0}
+
+    def version(self, salon_id):
+        """
+        Devuelve la versión actual de un salón; se toma antes de consultar y se pasa a guardar().
+
+        Args:
+            salon_id (int): El ID del salón.
+
+        Returns:
+            int: La versión del salón.
+        """
+        with self._lock:
+            return self._versiones.get(salon_id, 0)
+
+    def get(self, salon_id, dia):
+        """
+        Devuelve la página guardada de un salón si sigue vigente.
+
+        Args:
+            salon_id (int): El ID del salón.
+            dia (date): Día desde el que se piden las reservas (la página de ayer no sirve hoy).
+
+        Returns:
+            La página guardada, o None si no hay o está obsoleta.
+        """
+        with self._lock:
+            entrada = self._entradas.get(salon_id)
+            if entrada is None or entrada[0] != self._versiones.get(salon_id, 0) or entrada[1] != dia:
+                self._contadores["fallos"] += 1
+                return None
+            self._entradas.move_to_end(salon_id)
+            self._contadores["aciertos"] += 1
+            return entrada[2]
+
+    def contiene(self, salon_id, dia):
+        """
+        Indica si hay una página vigente de un salón, sin contarlo como acierto ni fallo.
+        """
+        with self._lock:
+            entrada = self._entradas.get(salon_id)
+            return entrada is not None and entrada[0] == self._versiones.get(salon_id, 0) and entrada[1] == dia
+
+    def guardar(self, salon_id, dia, version, pagina):
+        """
+        Guarda la página de un salón. Si el salón ha cambiado desde que se tomó la versión, no se guarda:
+        la consulta pudo leer datos anteriores a la escritura.
+
+        Args:
+            salon_id (int): El ID del salón.
+            dia (date): Día desde el que se han pedido las reservas.
+            version (int): Versión del salón tomada antes de consultar.
+            pagina: Datos a guardar.
+
+        Returns:
+            bool: True si se ha guardado.
+        """
+        with self._lock:
+            if version != self._versiones.get(salon_id, 0):
+                return False
+            self._entradas[salon_id] = (version, dia, pagina)
+            self._entradas.move_to_end(salon_id)
+            while len(self._entradas) > self.maximo:
+                self._entradas.popitem(last=False)
+                self._contadores["descartes"] += 1
+            return True
+
+    def invalidar_salon(self, salon_id):
+        """
+        Sube la versión de un salón y descarta su página guardada.
+
+        Args:
+            salon_id (int): El ID del salón.
+        """
+        with self._lock:
+            self._versiones[salon_id] = self._versiones.get(salon_id, 0) + 1
+            self._entradas.pop(salon_id, None)
+            self._contadores["invalidaciones"] += 1
+
+    def invalidar(self, reserva, anterior=None):
+        """
+        Invalida el salón de una reserva guardada y, si ha cambiado de salón, el que deja (observador de ReservasDAO).
+
+        Args:
+            reserva (ReservaModel): La reserva creada o modificada.
+            anterior (tuple): (salon_id, fecha) de la reserva antes de modificarla (None en un alta o si no se conoce).
+        """
+        if reserva is not None:
+            self.invalidar_salon(reserva.salon_id)
+        if anterior is not None and (reserva is None or anterior[0] != reserva.salon_id):
+            self.invalidar_salon(anterior[0])
+
+    def vaciar(self):
+        """
+        Descarta todas las páginas guardadas (las versiones se conservan).
+        """
+        with self._lock:
+            self._entradas.clear()
+
+    def estadisticas(self):
+        """
+        Devuelve los contadores de la caché.
+
+        Returns:
+            dict: Aciertos, fallos, invalidaciones, descartes por LRU y salones guardados.
+        """
+        with self._lock:
+            return dict(self._contadores, salones=len(self._entradas))
+
+
+reservas_salon = CacheReservasSalon()  # Primeras páginas de reservas por salón, compartidas por todo el proceso
+
+
+def clave_mes(fecha):
+    """
+    Devuelve el mes de una fecha como entero AAAAMM, la clave con la que se guardan los informes mensuales.
+
+    Args:
+        fecha (date): Cualquier día del mes.
+
+    Returns:
+        int: El mes, p. ej. 202507.
+    """
+    return fecha.year * 100 + fecha.month
+
+
+class CacheInformes:
+    """
+    Caché LRU de los informes mensuales terminados (modelos.informes), uno por mes.
+    Igual que CacheReservasSalon, cada mes tiene una versión que sube con cada escritura de una reserva de ese mes:
+    una entrada solo vale si se guardó con la versión vigente, así que un alta o una modificación solo obliga
+    a recalcular su mes (y el mes del que sale, si cambia de fecha) y los demás informes se siguen sirviendo.
+    Una carga masiva no dice qué meses toca y sube la época, que invalida todos.
+    """
+    def __init__(self, maximo=MESES_EN_CACHE):
+        """
+        Inicializa la caché vacía.
+
+        Args:
+            maximo (int): Número de meses que se conservan; al pasarse se descarta el usado hace más tiempo.
+        """
+        self.maximo = maximo
+        self._lock = threading.Lock()
+        self._entradas = OrderedDict()  # mes -> (versión, informe), de menos a más reciente
+        self._versiones = {}  # mes -> versión
+        self._epoca = 0  # Sube con cada carga masiva: invalida todos los meses a la vez
+        self._contadores = {"aciertos": 0, "fallos": 0, "invalidaciones": 0, "descartes": 0}
+
+    def version(self, mes):
+        """
+        Devuelve la versión actual de un mes; se toma antes de consultar y se pasa a guardar().
+
+        Args:
+            mes (int): El mes como AAAAMM.
+
+        Returns:
+            tuple: (época, versión del mes).
+        """
+        with self._lock:
+            return self._epoca, self._versiones.get(mes, 0)
+
+    def get(self, mes):
+        """
+        Devuelve el informe guardado de un mes si sigue vigente.
+
+        Args:
+            mes (int): El mes como AAAAMM.
+
+        Returns:
+            El informe guardado, o None si no hay o está obsoleto.
+        """
+        with self._lock:
+            entrada = self._entradas.get(mes)
+            if entrada is None or entrada[0] != (self._epoca, self._versiones.get(mes, 0)):
+                self._contadores["fallos"] += 1
+                return None
+            self._entradas.move_to_end(mes)
+            self._contadores["aciertos"] += 1
+            return entrada[1]
+
+    def guardar(self, mes, version, informe):
+        """
+        Guarda el informe de un mes. Si el mes ha cambiado desde que se tomó la versión, no se guarda:
+        la consulta pudo leer datos anteriores a la escritura.
+
+        Args:
+            mes (int): El mes como AAAAMM.
+            version (tuple): Versión del mes tomada antes de consultar.
+            informe: Informe a guardar.
+
+        Returns:
+            bool: True si se ha guardado.
+        """
+        with self._lock:
+            if version != (self._epoca, self._versiones.get(mes, 0)):
+                return False
+            self._entradas[mes] = (version, informe)
+            self._entradas.move_to_end(mes)
+            while len(self._entradas) > self.maximo:
+                self._entradas.popitem(last=False)
+                self._contadores["descartes"] += 1
+            return True
+
+    def invalidar_fecha(self, fecha):
+        """
+        Sube la versión del mes de una fecha y descarta su informe.
+
+        Args:
+            fecha (date): Cualquier día del mes (None no invalida nada).
+        """
+        if fecha is None:
+            return
+        mes = clave_mes(fecha)
+        with self._lock:
+            self._versiones[mes] = self._versiones.get(mes, 0) + 1
+            self._entradas.pop(mes, None)
+            self._contadores["invalidaciones"] += 1
+
+    def invalidar(self, reserva, anterior=None):
+        """
+        Invalida el mes de una reserva guardada y, si ha cambiado de mes, el que deja (observador de ReservasDAO).
+        Si no se conoce la fecha anterior, o la modificación se hizo desde otro puesto, el mes que deja
+        lo invalida el registro de cambios, que guarda la fecha anterior.
+
+        Args:
+            reserva (ReservaModel): La reserva creada o modificada.
+            anterior (tuple): (salon_id, fecha) de la reserva antes de modificarla (None en un alta o si no se conoce).
+        """
+        if reserva is not None:
+            self.invalidar_fecha(reserva.fecha)
+        if anterior is not None and (reserva is None or clave_mes(anterior[1]) != clave_mes(reserva.fecha)):
+            self.invalidar_fecha(anterior[1])
+
+    def invalidar_todo(self, salon_id=None):
+        """
+        Invalida todos los meses (observador de salón de ReservasDAO, tras una carga masiva).
+
+        Args:
+            salon_id (int): Salón de la carga; no se usa, los informes abarcan todos los salones.
+        """
+        with self._lock:
+            self._epoca += 1
+            self._entradas.clear()
+            self._contadores["invalidaciones"] += 1
+
+    def estadisticas(self):
+        """
+        Devuelve los contadores de la caché.
+
+        Returns:
+            dict: Aciertos, fallos, invalidaciones, descartes por LRU y meses guardados.
+        """
+        with self._lock:
+            return dict(self._contadores, meses=len(self._entradas))
+
+
+informes_mes = CacheInformes()  # Informes mensuales terminados, compartidos por todo el proceso
@@ -0,0 +1,111 @@
+import os
+import time
+
+from modelos.busqueda import indice_huespedes
+from modelos.cache import informes_mes, reservas_salon
+from modelos.datos import CambiosDAO, ReservasDAO
+from modelos.disponibilidad import disponibilidad
+from modelos.models import CambioModel
+
+INTERVALO_CAMBIOS = float(os.environ.get("HOTEL_CAMBIOS_INTERVALO", 2))  # Segundos entre lecturas del registro de cambios (0 lo desactiva)
+LIMITE_CAMBIOS = 500  # Cambios que se leen como máximo en cada lectura
+DIAS_CAMBIOS = float(os.environ.get("HOTEL_CAMBIOS_DIAS", 7))  # Días que se conservan los cambios registrados
+ESPERA_HUECOS = float(os.environ.get("HOTEL_CAMBIOS_ESPERA_HUECOS", 300))  # Segundos que se sigue esperando un cambio saltado
+MAX_HUECOS = 10000  # Huecos que se recuerdan como máximo tras un salto grande de IDs
+
+
+class MarcaCambios:
+    """
+    Hasta dónde ha leído un puesto el registro de cambios: el mayor ID leído y los IDs menores que faltaban (huecos).
+    En MySQL el ID se asigna al insertar pero la fila se ve al confirmar, así que una transacción larga (una carga
+    masiva, una importación) puede confirmar IDs menores que otros ya leídos. Cada lectura vuelve a pedir los huecos
+    hasta que aparecen o pasan ESPERA_HUECOS segundos: entonces la transacción se deshizo y ese ID no llegará nunca.
+    Cada lectura devuelve una marca nueva, así que una lectura descartada no deja la anterior a medias.
+    """
+    __slots__ = ("ultimo", "huecos")  # Sin __dict__ por instancia
+
+    def __init__(self, ultimo=0, huecos=None):
+        """
+        Inicializa la marca.
+
+        Args:
+            ultimo (int): ID del último cambio leído.
+            huecos (dict): ID que faltaba -> momento (time.monotonic) en que se vio el hueco.
+        """
+        self.ultimo = ultimo
+        self.huecos = huecos or {}
+
+    def __repr__(self):
+        return f"MarcaCambios(ultimo={self.ultimo}, huecos={len(self.huecos)})"
+
+
+def marca_inicial(pool=None):
+    """
+    Devuelve la marca desde la que empezar a leer cambios: el último ya registrado.
+    De paso borra los cambios de hace más de DIAS_CAMBIOS días, que ya no necesita ningún puesto abierto.
+
+    Args:
+        pool (PoolConexiones): Pool del que tomar las conexiones (por defecto el del proceso).
+
+    Returns:
+        MarcaCambios: Marca con el ID del último cambio y sin huecos.
+    """
+    dao = CambiosDAO(pool)
+    dao.purgar(DIAS_CAMBIOS * 86400)
+    return MarcaCambios(dao.ultimo())
+
+
+def leer_cambios(marca, limite=LIMITE_CAMBIOS, pool=None):
+    """
+    Lee los cambios posteriores a una marca y los que faltaban en ella, obtiene el estado actual de las reservas
+    cambiadas y lo aplica a las cachés del proceso (índice de disponibilidad, páginas por salón, índice de huéspedes
+    e informes mensuales). Si una reserva cambia varias veces, solo se devuelve su último estado.
+
+    Args:
+        marca (MarcaCambios): Marca devuelta por marca_inicial o por la lectura anterior.
+        limite (int): Número máximo de cambios nuevos (y de huecos) a leer.
+        pool (PoolConexiones): Pool del que tomar las conexiones (por defecto el del proceso).
+
+    Returns:
+        tuple: (nueva marca, lista de (CambioModel, ReservaModel o None si ya no existe), hay más cambios por leer).
+    """
+    dao = CambiosDAO(pool)
+    ahora = time.monotonic()
+    huecos = {cambio_id: visto for cambio_id, visto in marca.huecos.items() if ahora - visto < ESPERA_HUECOS}
+    recuperados = dao.get_ids(sorted(huecos)[:limite])  # Confirmados después de leer otros posteriores
+    nuevos = dao.get_desde(marca.ultimo, limite)
+    for cambio in recuperados:
+        del huecos[cambio.cambio_id]
+    esperado = marca.ultimo + 1
+    for cambio in nuevos:
+        for cambio_id in range(max(esperado, cambio.cambio_id - MAX_HUECOS), cambio.cambio_id):
+            huecos[cambio_id] = ahora
+        esperado = cambio.cambio_id + 1
+    nueva = MarcaCambios(nuevos[-1].cambio_id if nuevos else marca.ultimo, huecos)
+    cambios = sorted(recuperados + nuevos, key=lambda cambio: cambio.cambio_id)
+    if not cambios:
+        return nueva, [], False
+    ultimos = {}  # registro_id -> último cambio, en orden de llegada
+    for cambio in cambios:
+        ultimos.pop(cambio.registro_id, None)
+        ultimos[cambio.registro_id] = cambio
+    vivas = [id_ for id_, cambio in ultimos.items() if cambio.operacion != CambioModel.BAJA]
+    reservas = ReservasDAO(pool).get_varios(vivas) if vivas else {}
+
+    for cambio in cambios:
+        for salon_id in (cambio.salon_id, cambio.salon_anterior):
+            if salon_id is not None:
+                reservas_salon.invalidar_salon(salon_id)
+        informes_mes.invalidar_fecha(cambio.fecha_anterior)  # Mes del que sale una reserva movida o borrada
+    deltas = []
+    for reserva_id, cambio in ultimos.items():
+        reserva = reservas.get(reserva_id)
+        if reserva is None:
+            disponibilidad.quitar(reserva_id)  # Borrada (o borrada justo después de cambiar)
+            indice_huespedes.quitar(reserva_id)
+        else:
+            disponibilidad.registrar(reserva)
+            indice_huespedes.registrar(reserva)
+            informes_mes.invalidar(reserva)
+        deltas.append((cambio, reserva))
+    return nueva, deltas, len(nuevos) == limite
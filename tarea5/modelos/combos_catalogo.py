@@ -0,0 +1,47 @@
+from PySide6.QtCore import Qt
+from PySide6.QtGui import QStandardItem, QStandardItemModel
+
+
+class ModeloCatalogo(QStandardItemModel):
+    """
+    Modelo de opciones de un catálogo (tipos de cocina, tipos de reserva) para los combo boxes.
+    Cada opción muestra el nombre y guarda el ID en Qt.UserRole, como addItem(nombre, id).
+    Se comparte entre formularios y solo se reconstruye cuando cambia el contenido del catálogo,
+    así que abrir un formulario con la caché de catálogos vigente no crea ningún elemento nuevo.
+    """
+    def __init__(self, campo_id):
+        """
+        Inicializa el modelo vacío.
+
+        Args:
+            campo_id (str): Atributo de los modelos del catálogo que actúa como clave primaria.
+        """
+        super().__init__()
+        self.campo_id = campo_id
+        self._firma = None  # Tupla (id, nombre) de las opciones mostradas
+
+    def actualizar(self, modelos):
+        """
+        Sustituye las opciones por las del catálogo si han cambiado. Debe llamarse desde el hilo de la interfaz.
+
+        Args:
+            modelos (list): Modelos del catálogo, en el orden en que se mostrarán.
+
+        Returns:
+            bool: True si se han reconstruido las opciones.
+        """
+        firma = tuple((getattr(modelo, self.campo_id), modelo.nombre) for modelo in modelos)
+        if firma == self._firma:
+            return False
+        self.clear()
+        for id_, nombre in firma:
+            opcion = QStandardItem(nombre)
+            opcion.setData(id_, Qt.ItemDataRole.UserRole)
+            self.appendRow(opcion)
+        self._firma = firma
+        return True
+
+
+# Modelos compartidos por todos los formularios de reservas del proceso
+tipos_cocina = ModeloCatalogo("tipo_cocina_id")
+tipos_reserva = ModeloCatalogo("tipo_reserva_id")
@@ -0,0 +1,339 @@
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+from modelos.backends import DB_CONFIG, conectar_mysql, get_backend  # DB_CONFIG y conectar_mysql siguen importándose desde aquí
+
+logger = logging.getLogger(__name__)
+
+POOL_TAMANIO = int(os.environ.get("HOTEL_DB_POOL_TAMANIO", 5))  # Número máximo de conexiones abiertas
+POOL_TIMEOUT = float(os.environ.get("HOTEL_DB_POOL_TIMEOUT", 10))  # Segundos de espera máxima al pedir una conexión
+POOL_LIMITE_FUGA = float(os.environ.get("HOTEL_DB_POOL_LIMITE_FUGA", 60))  # Segundos a partir de los cuales un préstamo se considera una fuga
+
+
+class PoolAgotadoError(Exception):
+    """
+    Se lanza cuando no se consigue una conexión libre dentro del tiempo de espera.
+    """
+
+
+class PoolConexiones:
+    """
+    Pool de conexiones compartido por todos los DAOs del proceso.
+    Las conexiones se prestan para cada consulta y se devuelven al terminar,
+    de forma que el número de conexiones abiertas nunca supera el tamaño del pool.
+    """
+    def __init__(self, fabrica, tamanio=POOL_TAMANIO, timeout=POOL_TIMEOUT, validar=None, limite_fuga=POOL_LIMITE_FUGA, backend=None):
+        """
+        Inicializa el pool sin abrir ninguna conexión; se crean bajo demanda.
+
+        Args:
+            fabrica (callable): Función que abre y devuelve una conexión nueva.
+            tamanio (int): Número máximo de conexiones abiertas a la vez.
+            timeout (float): Segundos de espera máxima al pedir una conexión.
+            validar (callable): Función que recibe una conexión y devuelve True si sigue viva.
+            limite_fuga (float): Segundos de préstamo a partir de los cuales se registra una fuga.
+            backend (Backend): Motor al que pertenecen las conexiones; los DAOs lo usan para adaptar el SQL.
+        """
+        if tamanio < 1:
+            raise ValueError("El tamaño del pool debe ser al menos 1.")
+        self.fabrica = fabrica
+        self.tamanio = tamanio
+        self.timeout = timeout
+        self.validar = validar or (lambda conn: conn.is_connected())
+        self.limite_fuga = limite_fuga
+        self.backend = backend
+
+        self._condicion = threading.Condition()
+        self._libres = []  # Conexiones abiertas disponibles para prestar
+        self._prestadas = {}  # id(conexión) -> [conexión, instante del préstamo, hilo, fuga notificada]
+        self._abiertas = 0  # Conexiones abiertas (libres + prestadas)
+        self._datos = {}  # id(conexión) -> datos asociados a esa conexión (p. ej. sentencias preparadas)
+        self._cerrado = False
+        self._contadores = {
+            "prestamos": 0,    # Conexiones entregadas
+            "aciertos": 0,     # Préstamos servidos con una conexión ya abierta
+            "creadas": 0,      # Conexiones abiertas contra el servidor
+            "esperas": 0,      # Préstamos que tuvieron que esperar a que se liberase una conexión
+            "timeouts": 0,     # Préstamos que agotaron el tiempo de espera
+            "descartadas": 0,  # Conexiones desechadas por no superar la comprobación de salud
+            "fugas": 0,        # Préstamos que superaron el límite sin devolverse
+        }
+
+    def adquirir(self, timeout=None):
+        """
+        Presta una conexión del pool, abriendo una nueva si hay hueco o esperando si está lleno.
+
+        Args:
+            timeout (float): Segundos de espera máxima (por defecto el del pool).
+
+        Returns:
+            Conexión lista para usarse. Debe devolverse con liberar().
+
+        Raises:
+            PoolAgotadoError: Si no hay ninguna conexión libre dentro del tiempo de espera.
+        """
+        timeout = self.timeout if timeout is None else timeout
+        limite = time.monotonic() + timeout
+        ha_esperado = False
+
+        while True:
+            with self._condicion:
+                if self._cerrado:
+                    raise PoolAgotadoError("El pool de conexiones está cerrado.")
+                self._revisar_fugas()
+                conn = None
+                if self._libres:
+                    conn = self._libres.pop()  # Reutiliza la conexión usada más recientemente
+                elif self._abiertas < self.tamanio:
+                    self._abiertas += 1  # Reserva el hueco antes de abrir fuera del cerrojo
+                else:
+                    restante = limite - time.monotonic()
+                    if restante <= 0:
+                        self._contadores["timeouts"] += 1
+                        raise PoolAgotadoError(
+                            f"No hay conexiones libres tras esperar {timeout} s "
+                            f"({self.tamanio} en uso)."
+                        )
+                    if not ha_esperado:
+                        self._contadores["esperas"] += 1
+                        ha_esperado = True
+                    self._condicion.wait(restante)
+                    continue
+
+            if conn is None:
+                conn = self._abrir()
+            elif not self._esta_viva(conn):
+                self._descartar(conn)  # La conexión reutilizada está caída: se cierra y se vuelve a intentar
+                continue
+            else:
+                with self._condicion:
+                    self._contadores["aciertos"] += 1
+
+            with self._condicion:
+                self._contadores["prestamos"] += 1
+                self._prestadas[id(conn)] = [conn, time.monotonic(), threading.current_thread().name, False]
+            return conn
+
+    def precalentar(self, cantidad):
+        """
+        Abre conexiones por adelantado hasta tener al menos esa cantidad (sin pasar del tamaño del pool)
+        y las deja libres, para que las primeras consultas no paguen el coste de conectar.
+
+        Args:
+            cantidad (int): Conexiones abiertas que se quieren tener.
+
+        Returns:
+            int: Conexiones abiertas en esta llamada.
+        """
+        abiertas = 0
+        while True:
+            with self._condicion:
+                if self._cerrado or self._abiertas >= min(cantidad, self.tamanio):
+                    return abiertas
+                self._abiertas += 1  # Reserva el hueco antes de abrir fuera del cerrojo
+            conn = self._abrir()
+            with self._condicion:
+                self._libres.append(conn)
+                self._condicion.notify()
+            abiertas += 1
+
+    def liberar(self, conn, descartar=False):
+        """
+        Devuelve una conexión prestada al pool.
+
+        Args:
+            conn: La conexión obtenida con adquirir().
+            descartar (bool): Si es True, la conexión se cierra en lugar de reutilizarse
+                (por ejemplo, si quedó con resultados sin leer).
+        """
+        with self._condicion:
+            if self._prestadas.pop(id(conn), None) is None:
+                return  # No pertenece al pool o ya se devolvió
+            if self._cerrado or descartar:
+                self._abiertas -= 1
+                self._datos.pop(id(conn), None)
+                self._cerrar_silencioso(conn)
+            else:
+                self._libres.append(conn)
+            self._condicion.notify()
+
+    def datos_conexion(self, conn):
+        """
+        Devuelve un diccionario propio de una conexión que vive mientras la conexión siga abierta.
+        Sirve para guardar estado ligado a la conexión, como las sentencias preparadas.
+
+        Args:
+            conn: Una conexión prestada por el pool.
+
+        Returns:
+            dict: Datos asociados a la conexión.
+        """
+        with self._condicion:
+            return self._datos.setdefault(id(conn), {})
+
+    @contextmanager
+    def conexion(self, timeout=None):
+        """
+        Gestor de contexto que presta una conexión y la devuelve siempre al salir.
+
+        Args:
+            timeout (float): Segundos de espera máxima (por defecto el del pool).
+
+        Yields:
+            Conexión prestada por el pool.
+        """
+        conn = self.adquirir(timeout)
+        try:
+            yield conn
+        finally:
+            self.liberar(conn)
+
+    def estadisticas(self):
+        """
+        Devuelve los contadores del pool y su ocupación actual.
+
+        Returns:
+            dict: Contadores acumulados más el número de conexiones libres y en uso.
+        """
+        with self._condicion:
+            self._revisar_fugas()
+            datos = dict(self._contadores)
+            datos["tamanio"] = self.tamanio
+            datos["abiertas"] = self._abiertas
+            datos["libres"] = len(self._libres)
+            datos["en_uso"] = len(self._prestadas)
+            return datos
+
+    def cerrar(self):
+        """
+        Cierra las conexiones libres y marca el pool como cerrado.
+        Las conexiones que sigan prestadas se cuentan como fugas y se cierran al devolverse.
+        """
+        with self._condicion:
+            self._cerrado = True
+            for prestamo in self._prestadas.values():
+                if not prestamo[3]:
+                    self._contadores["fugas"] += 1
+                    logger.warning("Conexión sin devolver al cerrar el pool (prestada al hilo %s).", prestamo[2])
+            libres, self._libres = self._libres, []
+            self._abiertas -= len(libres)
+            for conn in libres:
+                self._datos.pop(id(conn), None)
+            self._condicion.notify_all()
+        for conn in libres:
+            self._cerrar_silencioso(conn)
+
+    def _abrir(self):
+        """
+        Abre una conexión nueva; si falla, libera el hueco reservado.
+        """
+        try:
+            conn = self.fabrica()
+        except Exception:
+            with self._condicion:
+                self._abiertas -= 1
+                self._condicion.notify()
+            raise
+        with self._condicion:
+            self._contadores["creadas"] += 1
+        return conn
+
+    def _esta_viva(self, conn):
+        """
+        Comprueba la salud de una conexión antes de prestarla.
+        """
+        try:
+            return bool(self.validar(conn))
+        except Exception:
+            return False
+
+    def _descartar(self, conn):
+        """
+        Cierra una conexión que no ha superado la comprobación de salud y libera su hueco.
+        """
+        self._cerrar_silencioso(conn)
+        with self._condicion:
+            self._abiertas -= 1
+            self._datos.pop(id(conn), None)
+            self._contadores["descartadas"] += 1
+            self._condicion.notify()
+
+    def _revisar_fugas(self):
+        """
+        Registra como fuga cada préstamo que supere el límite sin devolverse (una sola vez por préstamo).
+        Debe llamarse con el cerrojo tomado.
+        """
+        ahora = time.monotonic()
+        for prestamo in self._prestadas.values():
+            if not prestamo[3] and ahora - prestamo[1] > self.limite_fuga:
+                prestamo[3] = True
+                self._contadores["fugas"] += 1
+                logger.warning(
+                    "Posible fuga: conexión prestada al hilo %s hace %.0f s sin devolver.",
+                    prestamo[2], ahora - prestamo[1],
+                )
+
+    @staticmethod
+    def _cerrar_silencioso(conn):
+        """
+        Cierra una conexión ignorando los errores (por ejemplo, si el servidor ya la cortó).
+        """
+        try:
+            conn.close()
+        except Exception:
+            pass
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_pool():
+    """
+    Devuelve el pool de conexiones del proceso, creándolo la primera vez.
+
+    Returns:
+        PoolConexiones: El pool compartido por todos los DAOs.
+    """
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            backend = get_backend()
+            _pool = PoolConexiones(backend.conectar, validar=backend.esta_viva, backend=backend)
+        return _pool
+
+
+def configurar_pool(**opciones):
+    """
+    Sustituye el pool del proceso por uno nuevo con las opciones indicadas.
+
+    Args:
+        **opciones: Argumentos de PoolConexiones (tamanio, timeout, validar, limite_fuga, fabrica, backend).
+            Por defecto las conexiones se abren con el backend del proceso.
+
+    Returns:
+        PoolConexiones: El nuevo pool compartido.
+    """
+    global _pool
+    backend = opciones.setdefault("backend", get_backend())
+    opciones.setdefault("fabrica", backend.conectar)
+    opciones.setdefault("validar", backend.esta_viva)
+    with _pool_lock:
+        anterior, _pool = _pool, PoolConexiones(**opciones)
+    if anterior is not None:
+        anterior.cerrar()
+    return _pool
+
+
+def cerrar_pool():
+    """
+    Cierra el pool del proceso, si se llegó a crear.
+    """
+    global _pool
+    with _pool_lock:
+        anterior, _pool = _pool, None
+    if anterior is not None:
+        anterior.cerrar()
@@ -1,23 +1,48 @@
-import mysql.connector
-from modelos.models import TipoCocinaModel, TipoReservaModel, SalonModel, ReservaModel
+import os
+import time
+from contextlib import contextmanager
+
+from modelos.cache import informes_mes, registrar_catalogo, reservas_salon
+from modelos.backends import get_backend
+from modelos.busqueda import LIMITE_RESULTADOS, analizar, es_busqueda_valida, indice_huespedes
+from modelos.conexion import get_pool
+from modelos.disponibilidad import disponibilidad
+from modelos.metricas import metricas
+from modelos.models import TipoCocinaModel, TipoReservaModel, SalonModel, ReservaModel, CambioModel
+
+TAMANIO_LOTE = 1000  # Filas por lote en las consultas que se recorren por partes
+USAR_PREPARADAS = os.environ.get("HOTEL_DB_PREPARADAS", "1") != "0"  # Sentencias preparadas en el servidor (si el motor las admite)
+MAX_PREPARADAS = 64  # Sentencias preparadas que se conservan por conexión
+
+class FechaOcupadaError(Exception):
+    """
+    Se lanza al intentar guardar una reserva en un salón y fecha que ya están ocupados.
+    """
+
+
+class ConflictoVersionError(Exception):
+    """
+    Se lanza al modificar una reserva que otro puesto ha cambiado o borrado desde que se leyó.
+    """
+
 
 class BaseDAO:
     """
     Clase base para manejar la conexión a la base de datos y ejecutar consultas SQL.
-    Contiene métodos para ejecutar consultas, realizar commits, y cerrar la conexión.
+    Las conexiones se piden prestadas al pool compartido del proceso en cada consulta,
+    así que crear DAOs no abre conexiones nuevas. Las consultas se escriben con marcadores %s
+    y el backend del pool las adapta al motor (MySQL o SQLite).
     """
-    def __init__(self):
+    def __init__(self, pool=None):
         """
-        Inicializa la conexión a la base de datos MySQL.
+        Inicializa el DAO con el pool de conexiones compartido.
+
+        Args:
+            pool (PoolConexiones): Pool del que tomar las conexiones (por defecto el del proceso).
         """
-        self.conn = mysql.connector.connect(
-            user="root",          # Usuario para la conexión
-            password="root",      # Contraseña para la conexión
-            port="3307",          # Puerto de la base de datos
-            host="localhost",     # Dirección del host (servidor)
-            database="TAREA3DI",  # Nombre de la base de datos
-        )
-        self.cursor = self.conn.cursor(dictionary=True)  # Inicializa el cursor para ejecutar consultas y obtener resultados en formato diccionario
+        self.pool = pool or get_pool()
+        self.backend = self.pool.backend or get_backend()  # Motor de las conexiones del pool
+        self.preparadas = USAR_PREPARADAS and self.backend.preparadas  # Cursores preparados reutilizables por conexión
 
     def execute_query(self, query, params=None, fetch_one=False):
         """
@@ -31,28 +56,191 @@ class BaseDAO:
         Returns:
             Resultados de la consulta (diccionario o ID de la última fila insertada).
         """
-        self.cursor.execute(query, params or ())  # Ejecuta la consulta con los parámetros proporcionados
-        if query.strip().upper().startswith("SELECT"):
-            # Si la consulta es un SELECT, retorna los resultados.
-            return self.cursor.fetchone() if fetch_one else self.cursor.fetchall()
-        else:
-            # Si la consulta no es un SELECT, hace commit y retorna el ID de la última fila insertada.
-            self.conn.commit()
-            return self.cursor.lastrowid
+        with self.pool.conexion() as conn:
+            cursor = self.backend.cursor(conn)
+            inicio, error = time.perf_counter(), True
+            try:
+                cursor.execute(self.backend.traducir(query), params or ())  # Ejecuta la consulta con los parámetros proporcionados
+                error = False
+                if query.strip().upper().startswith("SELECT"):
+                    # Si la consulta es un SELECT, retorna los resultados en formato diccionario.
+                    filas = self.backend.diccionarios(cursor)
+                    return (filas[0] if filas else None) if fetch_one else filas
+                # Las conexiones del pool trabajan en autocommit, así que basta con retornar el ID de la última fila insertada.
+                return cursor.lastrowid
+            finally:
+                metricas.registrar(query, time.perf_counter() - inicio, max(cursor.rowcount, 0), error)
+                cursor.close()  # Cierra el cursor; la conexión vuelve al pool al salir del bloque
+
+    def consultar(self, query, params=None, fetch_one=False):
+        """
+        Ejecuta un SELECT y devuelve las filas como tuplas, en el orden de las columnas de la consulta.
+        En MySQL las sentencias se preparan en el servidor una vez por conexión y se reutilizan en las siguientes llamadas.
+
+        Args:
+            query (str): La consulta SQL, con una lista de columnas explícita.
+            params (tuple): Parámetros de la consulta (por defecto es None).
+            fetch_one (bool): Si es True, devuelve solo la primera fila (o None).
+
+        Returns:
+            Lista de tuplas, o una tupla si fetch_one es True.
+        """
+        with self.pool.conexion() as conn:
+            cursor, sentencia = self._cursor(conn, query)
+            inicio, filas = time.perf_counter(), None
+            try:
+                cursor.execute(sentencia, params or ())
+                filas = cursor.fetchall()  # Se leen todas para dejar la conexión libre para otra sentencia
+            finally:
+                metricas.registrar(query, time.perf_counter() - inicio, len(filas or ()), filas is None)
+                if not self.preparadas:
+                    cursor.close()
+        if fetch_one:
+            return filas[0] if filas else None
+        return filas
+
+    def ejecutar(self, query, params=None, filas=False):
+        """
+        Ejecuta un INSERT, UPDATE o DELETE (con una sentencia preparada si el motor las admite).
+
+        Args:
+            query (str): La sentencia SQL.
+            params (tuple): Parámetros de la sentencia.
+            filas (bool): Si es True, devuelve el número de filas afectadas en lugar del ID insertado.
+
+        Returns:
+            int: ID de la última fila insertada, o filas afectadas si filas es True.
+        """
+        with self.pool.conexion() as conn:
+            cursor, sentencia = self._cursor(conn, query)
+            inicio, error = time.perf_counter(), True
+            try:
+                cursor.execute(sentencia, params or ())
+                error = False
+                return cursor.rowcount if filas else cursor.lastrowid
+            finally:
+                metricas.registrar(query, time.perf_counter() - inicio, max(cursor.rowcount, 0), error)
+                if not self.preparadas:
+                    cursor.close()
+
+    @contextmanager
+    def transaccion(self):
+        """
+        Presta una conexión con una transacción abierta: se confirma al salir del bloque
+        y se deshace si el bloque lanza una excepción.
+
+        Yields:
+            Conexión del pool, para pasarla a ejecutar_lote().
+        """
+        with self.pool.conexion() as conn:
+            self.backend.iniciar_transaccion(conn)
+            try:
+                yield conn
+            except BaseException:
+                conn.rollback()
+                raise
+            conn.commit()
+
+    def ejecutar_lote(self, query, filas, conn=None):
+        """
+        Ejecuta una sentencia con muchos juegos de parámetros (executemany); en MySQL un INSERT
+        se envía como una sola sentencia con varias filas.
+
+        Args:
+            query (str): La sentencia SQL.
+            filas (list): Tuplas de parámetros.
+            conn: Conexión de transaccion() en la que ejecutarla (por defecto, una del pool en autocommit).
+
+        Returns:
+            int: Número de filas afectadas.
+        """
+        if conn is None:
+            with self.pool.conexion() as conn:
+                return self.ejecutar_lote(query, filas, conn)
+        cursor = self.backend.cursor(conn)
+        inicio, error = time.perf_counter(), True
+        try:
+            cursor.executemany(self.backend.traducir(query), filas)
+            error = False
+            return cursor.rowcount
+        finally:
+            metricas.registrar(query, time.perf_counter() - inicio, max(cursor.rowcount, 0), error)
+            cursor.close()
+
+    def _cursor(self, conn, query):
+        """
+        Devuelve el cursor con el que ejecutar una sentencia en una conexión.
+        Con sentencias preparadas, cada conexión guarda un cursor por texto SQL; el conector solo reutiliza
+        la sentencia preparada si recibe el mismo objeto str, así que también se devuelve el texto guardado.
+
+        Returns:
+            tuple: (cursor, texto SQL a ejecutar).
+        """
+        if not self.preparadas:
+            return self.backend.cursor(conn), self.backend.traducir(query)
+        sentencias = self.pool.datos_conexion(conn).setdefault("sentencias", {})
+        guardada = sentencias.get(query)
+        if guardada is None:
+            if len(sentencias) >= MAX_PREPARADAS:
+                # Libera la sentencia más antigua para no acumular sentencias preparadas en el servidor
+                cursor_antiguo, _ = sentencias.pop(next(iter(sentencias)))
+                cursor_antiguo.close()
+            guardada = sentencias[query] = (self.backend.cursor_preparado(conn), query)
+        return guardada
+
+    def iter_query(self, query, params=None, tamanio_lote=TAMANIO_LOTE):
+        """
+        Ejecuta un SELECT y devuelve los resultados por lotes, sin cargarlos todos en memoria.
+        La conexión queda prestada mientras se recorre el generador.
+
+        Args:
+            query (str): La consulta SQL a ejecutar, con una lista de columnas explícita.
+            params (tuple): Parámetros de la consulta (por defecto es None).
+            tamanio_lote (int): Número de filas que se piden al servidor en cada fetchmany.
+
+        Yields:
+            list: Lotes de filas en formato tupla.
+        """
+        conn = self.pool.adquirir()
+        completo = False
+        cursor = self.backend.cursor_flujo(conn)  # Cursor sin buffer: las filas se leen del servidor a medida que se piden
+        segundos, leidas, error = 0.0, 0, False  # Solo cuenta el tiempo de servidor y red, no el de quien recorre los lotes
+        try:
+            inicio = time.perf_counter()
+            cursor.execute(self.backend.traducir(query), params or ())
+            while True:
+                filas = cursor.fetchmany(tamanio_lote)
+                segundos += time.perf_counter() - inicio
+                if not filas:
+                    break
+                leidas += len(filas)
+                yield filas
+                inicio = time.perf_counter()
+            completo = True
+        except Exception:
+            error = True
+            raise
+        finally:
+            metricas.registrar(query, segundos, leidas, error)
+            if completo:
+                cursor.close()
+            # Si el recorrido se abandona a medias quedan filas sin leer: la conexión se descarta en vez de reutilizarse
+            self.pool.liberar(conn, descartar=not completo)
 
     def close(self):
         """
-        Cierra el cursor y la conexión a la base de datos.
+        Se mantiene por compatibilidad: el DAO no retiene conexiones, pertenecen al pool.
         """
-        self.cursor.close()  # Cierra el cursor
-        self.conn.close()    # Cierra la conexión a la base de datos
 
 
 class TiposCocinaDAO(BaseDAO):
     """
     Clase para manejar operaciones relacionadas con los tipos de cocina en la base de datos.
     Hereda de BaseDAO para reutilizar la conexión y ejecución de consultas.
+    Las lecturas se sirven desde una caché compartida que se carga con una sola consulta.
     """
+    cache = registrar_catalogo("tipos_cocina", "tipo_cocina_id")  # Caché compartida por todas las instancias
+
     def get(self, tipo_cocina_id):
         """
         Obtiene un tipo de cocina por su ID.
@@ -63,11 +251,19 @@ class TiposCocinaDAO(BaseDAO):
         Returns:
             TipoCocinaModel: El objeto del tipo de cocina, o None si no existe.
         """
-        query = "SELECT * FROM tipos_cocina WHERE tipo_cocina_id = %s"
-        row = self.execute_query(query, (tipo_cocina_id,), fetch_one=True)
-        if row:
-            return TipoCocinaModel(row['tipo_cocina_id'], row['nombre'])  # Devuelve un objeto TipoCocinaModel
-        return None
+        return self.cache.get(tipo_cocina_id, self._consultar_todos)
+
+    def get_por_nombre(self, nombre):
+        """
+        Obtiene un tipo de cocina por su nombre.
+
+        Args:
+            nombre (str): El nombre del tipo de cocina a obtener.
+
+        Returns:
+            TipoCocinaModel: El objeto del tipo de cocina, o None si no existe.
+        """
+        return self.cache.get_por_nombre(nombre, self._consultar_todos)
 
     def get_all(self):
         """
@@ -76,16 +272,28 @@ class TiposCocinaDAO(BaseDAO):
         Returns:
             list: Lista de objetos TipoCocinaModel.
         """
-        query = "SELECT * FROM tipos_cocina"
-        rows = self.execute_query(query)
-        return [TipoCocinaModel(row['tipo_cocina_id'], row['nombre']) for row in rows]  # Devuelve una lista de objetos TipoCocinaModel
+        return self.cache.get_all(self._consultar_todos)
+
+    def _consultar_todos(self):
+        """
+        Consulta la tabla completa en la base de datos (solo la usa la caché).
+
+        Returns:
+            list: Lista de objetos TipoCocinaModel.
+        """
+        query = "SELECT tipo_cocina_id, nombre FROM tipos_cocina"
+        rows = self.consultar(query)
+        return [TipoCocinaModel.desde_fila(row) for row in rows]  # Devuelve una lista de objetos TipoCocinaModel
 
 
 class SalonesDAO(BaseDAO):
     """
     Clase para manejar operaciones relacionadas con los salones en la base de datos.
     Hereda de BaseDAO para reutilizar la conexión y ejecución de consultas.
+    Las lecturas se sirven desde una caché compartida que se carga con una sola consulta.
     """
+    cache = registrar_catalogo("salones", "salon_id")  # Caché compartida por todas las instancias
+
     def get(self, salon_id):
         """
         Obtiene un salón por su ID.
@@ -96,11 +304,19 @@ class SalonesDAO(BaseDAO):
         Returns:
             SalonModel: El objeto del salón, o None si no existe.
         """
-        query = "SELECT * FROM salones WHERE salon_id = %s"
-        row = self.execute_query(query, (salon_id,), fetch_one=True)
-        if row:
-            return SalonModel(row['salon_id'], row['nombre'])  # Devuelve un objeto SalonModel
-        return None
+        return self.cache.get(salon_id, self._consultar_todos)
+
+    def get_por_nombre(self, nombre):
+        """
+        Obtiene un salón por su nombre.
+
+        Args:
+            nombre (str): El nombre del salón a obtener.
+
+        Returns:
+            SalonModel: El objeto del salón, o None si no existe.
+        """
+        return self.cache.get_por_nombre(nombre, self._consultar_todos)
 
     def get_all(self):
         """
@@ -109,16 +325,28 @@ class SalonesDAO(BaseDAO):
         Returns:
             list: Lista de objetos SalonModel.
         """
-        query = "SELECT * FROM salones"
-        rows = self.execute_query(query)
-        return [SalonModel(row['salon_id'], row['nombre']) for row in rows]  # Devuelve una lista de objetos SalonModel
+        return self.cache.get_all(self._consultar_todos)
+
+    def _consultar_todos(self):
+        """
+        Consulta la tabla completa en la base de datos (solo la usa la caché).
+
+        Returns:
+            list: Lista de objetos SalonModel.
+        """
+        query = "SELECT salon_id, nombre FROM salones"
+        rows = self.consultar(query)
+        return [SalonModel.desde_fila(row) for row in rows]  # Devuelve una lista de objetos SalonModel
 
 
 class TiposReservasDAO(BaseDAO):
     """
     Clase para manejar operaciones relacionadas con los tipos de reserva en la base de datos.
     Hereda de BaseDAO para reutilizar la conexión y ejecución de consultas.
+    Las lecturas se sirven desde una caché compartida que se carga con una sola consulta.
     """
+    cache = registrar_catalogo("tipos_reservas", "tipo_reserva_id")  # Caché compartida por todas las instancias
+
     def get(self, tipo_reserva_id):
         """
         Obtiene un tipo de reserva por su ID.
@@ -129,12 +357,20 @@ class TiposReservasDAO(BaseDAO):
         Returns:
             TipoReservaModel: El objeto del tipo de reserva, o None si no existe.
         """
-        query = "SELECT * FROM tipos_reservas WHERE tipo_reserva_id = %s"
-        row = self.execute_query(query, (tipo_reserva_id,), fetch_one=True)
-        if row:
-            return TipoReservaModel(row['tipo_reserva_id'], row['nombre'])  # Devuelve un objeto TipoReservaModel
-        return None
-    
+        return self.cache.get(tipo_reserva_id, self._consultar_todos)
+
+    def get_por_nombre(self, nombre):
+        """
+        Obtiene un tipo de reserva por su nombre.
+
+        Args:
+            nombre (str): El nombre del tipo de reserva a obtener.
+
+        Returns:
+            TipoReservaModel: El objeto del tipo de reserva, o None si no existe.
+        """
+        return self.cache.get_por_nombre(nombre, self._consultar_todos)
+
     def get_all(self):
         """
         Obtiene todos los tipos de reserva.
@@ -142,9 +378,18 @@ class TiposReservasDAO(BaseDAO):
         Returns:
             list: Lista de objetos TipoReservaModel.
         """
-        query = "SELECT * FROM tipos_reservas"
-        rows = self.execute_query(query)
-        return [TipoReservaModel(row['tipo_reserva_id'], row['nombre']) for row in rows]  # Devuelve una lista de objetos TipoReservaModel
+        return self.cache.get_all(self._consultar_todos)
+
+    def _consultar_todos(self):
+        """
+        Consulta la tabla completa en la base de datos (solo la usa la caché).
+
+        Returns:
+            list: Lista de objetos TipoReservaModel.
+        """
+        query = "SELECT tipo_reserva_id, nombre FROM tipos_reservas"
+        rows = self.consultar(query)
+        return [TipoReservaModel.desde_fila(row) for row in rows]  # Devuelve una lista de objetos TipoReservaModel
 
 
 class ReservasDAO(BaseDAO):
@@ -152,6 +397,12 @@ class ReservasDAO(BaseDAO):
     Clase para manejar operaciones relacionadas con las reservas en la base de datos.
     Hereda de BaseDAO para reutilizar la conexión y ejecución de consultas.
     """
+    observadores = [disponibilidad.registrar, reservas_salon.invalidar, indice_huespedes.registrar, informes_mes.invalidar]  # Funciones avisadas tras cada alta o modificación
+    observadores_salon = [disponibilidad.descartar_salon, reservas_salon.invalidar_salon, indice_huespedes.descartar_salon, informes_mes.invalidar_todo]  # Funciones avisadas con el salon_id tras una carga masiva
+
+    # Columnas en el orden de los argumentos de ReservaModel, para construir los modelos por posición
+    COLUMNAS = "reserva_id, tipo_reserva_id, salon_id, tipo_cocina_id, persona, telefono, fecha, ocupacion, jornadas, habitaciones, version"
+
     def get(self, reserva_id):
         """
         Obtiene una reserva por su ID.
@@ -162,33 +413,197 @@ class ReservasDAO(BaseDAO):
         Returns:
             ReservaModel: El objeto de la reserva, o None si no existe.
         """
-        query = "SELECT * FROM reservas WHERE reserva_id = %s"
-        row = self.execute_query(query, (reserva_id,), fetch_one=True)
+        query = f"SELECT {self.COLUMNAS} FROM reservas WHERE reserva_id = %s"
+        row = self.consultar(query, (reserva_id,), fetch_one=True)
         if row:
-            return ReservaModel(
-                row['reserva_id'], row['tipo_reserva_id'], row['salon_id'], row['tipo_cocina_id'],
-                row['persona'], row['telefono'], row['fecha'], row['ocupacion'], row['jornadas'], row['habitaciones']
-            )  # Devuelve un objeto ReservaModel con los datos de la reserva
+            return ReservaModel.desde_fila(row)  # Devuelve un objeto ReservaModel con los datos de la reserva
         return None
     
-    def checkFechaOcupada(self, fecha, salon_id, reserva_id):
+    def get_varios(self, reserva_ids):
+        """
+        Obtiene varias reservas por su ID con consultas IN de tamaño fijo (1, 10 o 100 IDs, repitiendo el último
+        para completar), de modo que la sentencia preparada solo tiene tres formas posibles.
+
+        Args:
+            reserva_ids (iterable): IDs de las reservas.
+
+        Returns:
+            dict: reserva_id -> ReservaModel de las que existen.
         """
-        Verifica si una fecha y salón están ocupados por una reserva distinta.
+        ids = list(dict.fromkeys(reserva_ids))
+        reservas = {}
+        for inicio in range(0, len(ids), 100):
+            trozo = ids[inicio:inicio + 100]
+            tamanio = next(t for t in (1, 10, 100) if t >= len(trozo))
+            trozo += [trozo[-1]] * (tamanio - len(trozo))
+            query = f"SELECT {self.COLUMNAS} FROM reservas WHERE reserva_id IN ({', '.join(['%s'] * tamanio)})"
+            for row in self.consultar(query, tuple(trozo)):
+                reservas[row[0]] = ReservaModel.desde_fila(row)
+        return reservas
+
+    def checkFechaOcupada(self, fecha, salon_id, reserva_id, jornadas=0):
+        """
+        Verifica si algún día entre la fecha y sus jornadas está ocupado en el salón por una reserva distinta.
+        Se responde desde el índice de disponibilidad en memoria; solo la primera vez se cargan las reservas del salón.
 
         Args:
             fecha (datetime): La fecha que se desea verificar.
             salon_id (int): El ID del salón que se desea verificar.
             reserva_id (int): El ID de la reserva que se desea verificar.
+            jornadas (int): Jornadas de la reserva (0 o 1 para un solo día).
 
         Returns:
             bool: True si la fecha y salón están ocupados, False si no.
         """
-        query = "SELECT * FROM reservas where fecha = %s and salon_id = %s and reserva_id != %s"
-        row = self.execute_query(query, (fecha, salon_id, reserva_id), fetch_one=True)
-        if row:
-            return True  # Si ya existe una reserva, la fecha está ocupada
-        return False  # Si no existe ninguna reserva, la fecha está disponible
-    
+        self.asegurar_disponibilidad(salon_id)
+        return disponibilidad.ocupado(salon_id, fecha, jornadas, excluir=reserva_id)
+
+    def asegurar_disponibilidad(self, salon_id):
+        """
+        Carga en el índice de disponibilidad las ocupaciones de un salón si aún no lo estaban.
+
+        Args:
+            salon_id (int): El ID del salón.
+        """
+        if not disponibilidad.cargado(salon_id):
+            disponibilidad.cargar_salon(salon_id, self.get_ocupaciones(salon_id))
+
+    def get_ocupaciones(self, salon_id):
+        """
+        Obtiene la fecha y las jornadas de todas las reservas de un salón.
+
+        Args:
+            salon_id (int): El ID del salón.
+
+        Returns:
+            list: Tuplas (reserva_id, fecha, jornadas).
+        """
+        query = "SELECT reserva_id, fecha, jornadas FROM reservas WHERE salon_id = %s"
+        return [tuple(row) for row in self.consultar(query, (salon_id,))]
+
+    def iter_huespedes(self, tamanio_lote=TAMANIO_LOTE):
+        """
+        Recorre por lotes el nombre y el teléfono de todas las reservas, para construir el índice de huéspedes.
+
+        Yields:
+            list: Lotes de tuplas (reserva_id, persona, telefono).
+        """
+        yield from self.iter_query("SELECT reserva_id, persona, telefono FROM reservas", None, tamanio_lote)
+
+    def cargar_indice_huespedes(self):
+        """
+        Construye el índice de huéspedes en memoria leyendo todas las reservas por lotes.
+
+        Returns:
+            int: Reservas indexadas, o None si el índice se invalidó mientras tanto.
+        """
+        return indice_huespedes.cargar(self.iter_huespedes())
+
+    def buscar_huespedes(self, texto, limite=LIMITE_RESULTADOS):
+        """
+        Busca reservas de todos los salones por partes del nombre y por el principio del teléfono.
+        Si el índice de huéspedes está cargado se resuelve en memoria y solo se leen de la base de datos las
+        reservas encontradas; si no, con una consulta que usa los índices de la migración 8.
+
+        Args:
+            texto (str): Lo escrito en el cuadro de búsqueda.
+            limite (int): Número máximo de reservas a devolver.
+
+        Returns:
+            list: Objetos ReservaModel, de la reserva más reciente a la más antigua.
+        """
+        if indice_huespedes.listo():
+            ids = indice_huespedes.buscar(texto, limite)
+            reservas = self.get_varios(ids)
+            return [reservas[id_] for id_ in ids if id_ in reservas]
+        nombre, telefono = analizar(texto)
+        if not es_busqueda_valida(nombre, telefono):
+            return []
+        condiciones, params = [], []
+        if nombre:
+            condicion, valores = self.backend.contiene_palabras("persona", nombre)
+            condiciones.append(condicion)
+            params += valores
+        if telefono:
+            condicion, valor = self.backend.empieza_por("telefono_digitos", telefono)
+            condiciones.append(condicion)
+            params.append(valor)
+        query = f"SELECT {self.COLUMNAS} FROM reservas WHERE {' AND '.join(condiciones)} ORDER BY reserva_id DESC LIMIT %s"
+        rows = self.consultar(query, tuple(params + [limite]))
+        return [ReservaModel.desde_fila(row) for row in rows]
+
+    def get_ocupacion_hotel(self, desde, hasta):
+        """
+        Obtiene los días ocupados de todos los salones en un rango con una sola consulta agregada.
+        Parte de reservas_dias, que ya tiene un día por fila para cada jornada de cada reserva, así que los
+        congresos de varias jornadas aparecen en todos sus días sin expandirlos aquí.
+
+        Args:
+            desde (date): Primer día del rango.
+            hasta (date): Día siguiente al último del rango.
+
+        Returns:
+            list: Tuplas (salon_id, dia, reserva_id, tipo_reserva_id, asistentes) por salón y día ocupado.
+        """
+        query = (
+            "SELECT d.salon_id, d.dia, MAX(r.reserva_id), MAX(r.tipo_reserva_id), SUM(r.ocupacion) "
+            "FROM reservas_dias d JOIN reservas r ON r.reserva_id = d.reserva_id "
+            "WHERE d.dia >= %s AND d.dia < %s GROUP BY d.salon_id, d.dia"
+        )
+        return [tuple(row) for row in self.consultar(query, (desde, hasta))]
+
+    def get_totales_mes(self, desde, hasta):
+        """
+        Obtiene los totales de las reservas de un rango de fechas agrupados por mes, salón, tipo de reserva
+        y tipo de cocina, con una sola consulta que agrega en la base de datos: solo viajan unas pocas filas
+        por mes, no las reservas. El índice idx_reservas_informe (migración 9) cubre todas las columnas.
+
+        Args:
+            desde (date): Primer día del rango.
+            hasta (date): Día siguiente al último del rango.
+
+        Returns:
+            list: Tuplas (mes AAAAMM, salon_id, tipo_reserva_id, tipo_cocina_id, reservas, ocupación, jornadas, habitaciones).
+        """
+        query = (
+            f"SELECT {self.backend.mes('fecha')} AS mes, salon_id, tipo_reserva_id, tipo_cocina_id, "
+            "COUNT(*), SUM(ocupacion), SUM(jornadas), SUM(habitaciones) "
+            "FROM reservas WHERE fecha >= %s AND fecha < %s "
+            "GROUP BY mes, salon_id, tipo_reserva_id, tipo_cocina_id"
+        )
+        return [tuple(row) for row in self.consultar(query, (desde, hasta))]
+
+    @classmethod
+    def suscribir(cls, funcion):
+        """
+        Registra una función que se llamará con cada reserva creada o modificada.
+
+        Args:
+            funcion (callable): Recibe el ReservaModel guardado y, en una modificación, la tupla (salon_id, fecha)
+                que tenía antes (None en un alta o si no se conoce), para actualizar también el salón o el mes que deja.
+        """
+        cls.observadores.append(funcion)
+
+    @classmethod
+    def suscribir_salon(cls, funcion):
+        """
+        Registra una función que se llamará con el ID de cada salón afectado por una carga masiva,
+        en la que no se notifica reserva a reserva.
+
+        Args:
+            funcion (callable): Recibe el salon_id.
+        """
+        cls.observadores_salon.append(funcion)
+
+    def _notificar(self, reserva, anterior=None):
+        """
+        Avisa a los observadores de que una reserva se ha guardado, con el salón y la fecha que tenía si se ha modificado.
+        """
+        if reserva is None:
+            return
+        for funcion in self.observadores:
+            funcion(reserva, anterior)
+
     def get_by_salon_id(self, salon_id):
         """
         Obtiene todas las reservas de un salón específico.
@@ -199,17 +614,103 @@ class ReservasDAO(BaseDAO):
         Returns:
             list: Lista de objetos ReservaModel.
         """
-        query = "SELECT * FROM reservas WHERE salon_id = %s ORDER BY fecha"
-        rows = self.execute_query(query, (salon_id,))
+        query = f"SELECT {self.COLUMNAS} FROM reservas WHERE salon_id = %s ORDER BY fecha"
+        rows = self.consultar(query, (salon_id,))
         if rows:
-            return [
-                ReservaModel(
-                    row['reserva_id'], row['tipo_reserva_id'], row['salon_id'], row['tipo_cocina_id'],
-                    row['persona'], row['telefono'], row['fecha'], row['ocupacion'], row['jornadas'], row['habitaciones']
-                ) for row in rows
-            ]  # Devuelve una lista de objetos ReservaModel
+            return [ReservaModel.desde_fila(row) for row in rows]  # Devuelve una lista de objetos ReservaModel
         return None
 
+    def get_rango(self, salon_id, desde=None, hasta=None, despues_de=None, limite=100):
+        """
+        Obtiene una página de reservas de un salón en orden ascendente, paginando por (fecha, reserva_id).
+
+        Args:
+            salon_id (int): El ID del salón.
+            desde (date): Fecha mínima incluida (opcional).
+            hasta (date): Fecha máxima excluida (opcional).
+            despues_de (tuple): Clave (fecha, reserva_id) de la última reserva de la página anterior (opcional).
+            limite (int): Número máximo de reservas de la página.
+
+        Returns:
+            list: Lista de objetos ReservaModel ordenada por fecha y reserva_id.
+        """
+        condiciones, params = self._filtro_rango(salon_id, desde, hasta)
+        if despues_de:
+            condiciones.append("(fecha > %s OR (fecha = %s AND reserva_id > %s))")
+            params += [despues_de[0], despues_de[0], despues_de[1]]
+        query = f"SELECT {self.COLUMNAS} FROM reservas WHERE {' AND '.join(condiciones)} ORDER BY fecha, reserva_id LIMIT %s"
+        rows = self.consultar(query, tuple(params + [limite]))
+        return [ReservaModel.desde_fila(row) for row in rows]
+
+    def get_anteriores(self, salon_id, antes_de, desde=None, limite=100):
+        """
+        Obtiene la página de reservas de un salón inmediatamente anterior a una clave, para paginar hacia atrás.
+
+        Args:
+            salon_id (int): El ID del salón.
+            antes_de (tuple): Clave (fecha, reserva_id) de la primera reserva ya mostrada.
+            desde (date): Fecha mínima incluida (opcional).
+            limite (int): Número máximo de reservas de la página.
+
+        Returns:
+            list: Lista de objetos ReservaModel ordenada de forma ascendente por fecha y reserva_id.
+        """
+        condiciones, params = self._filtro_rango(salon_id, desde, None)
+        condiciones.append("(fecha < %s OR (fecha = %s AND reserva_id < %s))")
+        params += [antes_de[0], antes_de[0], antes_de[1]]
+        query = f"SELECT {self.COLUMNAS} FROM reservas WHERE {' AND '.join(condiciones)} ORDER BY fecha DESC, reserva_id DESC LIMIT %s"
+        rows = self.consultar(query, tuple(params + [limite]))
+        return [ReservaModel.desde_fila(row) for row in reversed(rows)]  # Se invierte para devolverlas en orden ascendente
+
+    def iter_reservas(self, salon_id=None, desde=None, hasta=None, tamanio_lote=TAMANIO_LOTE):
+        """
+        Recorre las reservas por lotes leídos con fetchmany, con memoria constante sea cual sea el histórico.
+
+        Args:
+            salon_id (int): El ID del salón (opcional; si se omite, se recorren todos).
+            desde (date): Fecha mínima incluida (opcional).
+            hasta (date): Fecha máxima excluida (opcional).
+            tamanio_lote (int): Número de reservas por lote.
+
+        Yields:
+            list: Lotes de objetos ReservaModel ordenados por fecha y reserva_id.
+        """
+        for rows in self.iter_filas(salon_id, desde, hasta, tamanio_lote):
+            yield [ReservaModel.desde_fila(row) for row in rows]
+
+    def iter_filas(self, salon_id=None, desde=None, hasta=None, tamanio_lote=TAMANIO_LOTE):
+        """
+        Como iter_reservas, pero devuelve las tuplas del cursor (columnas de COLUMNAS) sin crear modelos,
+        para recorridos masivos como la exportación.
+
+        Yields:
+            list: Lotes de tuplas ordenadas por fecha y reserva_id.
+        """
+        condiciones, params = self._filtro_rango(salon_id, desde, hasta)
+        where = f"WHERE {' AND '.join(condiciones)}" if condiciones else ""
+        query = f"SELECT {self.COLUMNAS} FROM reservas {where} ORDER BY fecha, reserva_id"
+        yield from self.iter_query(query, tuple(params), tamanio_lote)
+
+    @staticmethod
+    def _filtro_rango(salon_id, desde, hasta):
+        """
+        Construye las condiciones WHERE comunes de salón y rango de fechas.
+
+        Returns:
+            tuple: (lista de condiciones, lista de parámetros).
+        """
+        condiciones, params = [], []
+        if salon_id is not None:
+            condiciones.append("salon_id = %s")
+            params.append(salon_id)
+        if desde is not None:
+            condiciones.append("fecha >= %s")
+            params.append(desde)
+        if hasta is not None:
+            condiciones.append("fecha < %s")
+            params.append(hasta)
+        return condiciones, params
+
     def get_all(self):
         """
         Obtiene todas las reservas de la base de datos.
@@ -217,56 +718,196 @@ class ReservasDAO(BaseDAO):
         Returns:
             list: Lista de objetos ReservaModel.
         """
-        query = "SELECT * FROM reservas"
-        rows = self.execute_query(query)
-        return [
-            ReservaModel(
-                row['reserva_id'], row['tipo_reserva_id'], row['salon_id'], row['tipo_cocina_id'],
-                row['persona'], row['telefono'], row['fecha'], row['ocupacion'], row['jornadas'], row['habitaciones']
-            ) for row in rows
-        ]  # Devuelve una lista de objetos ReservaModel
+        query = f"SELECT {self.COLUMNAS} FROM reservas"
+        rows = self.consultar(query)
+        return [ReservaModel.desde_fila(row) for row in rows]  # Devuelve una lista de objetos ReservaModel
 
-    def create(self, reserva: ReservaModel):
+    def create(self, reserva: ReservaModel, releer=False):
         """
         Crea una nueva reserva en la base de datos.
+        No se comprueba antes si la fecha está libre: la clave única de reservas_dias rechaza el INSERT
+        si pisa otra reserva, así que dos puestos no pueden reservar el mismo día aunque guarden a la vez.
+        La reserva devuelta se construye con los valores escritos y el ID generado, sin volver a consultarla.
 
         Args:
             reserva (ReservaModel): El objeto ReservaModel con los datos de la nueva reserva.
+            releer (bool): Si es True, se relee la fila para obtener los valores calculados por el servidor.
 
         Returns:
             ReservaModel: El objeto ReservaModel de la reserva creada con su ID asignado.
+
+        Raises:
+            FechaOcupadaError: Si algún día de la reserva ya está ocupado en el salón.
         """
         query = """
         INSERT INTO reservas (tipo_reserva_id, salon_id, tipo_cocina_id, persona, telefono, fecha, ocupacion, jornadas, habitaciones) 
         VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)
         """
-        reserva_id = self.execute_query(query, (
-            reserva.tipo_reserva_id, reserva.salon_id, reserva.tipo_cocina_id,
-            reserva.persona, reserva.telefono, reserva.fecha,
-            reserva.ocupacion, reserva.jornadas, reserva.habitaciones
-        ))
-        return self.get(reserva_id)  # Devuelve el objeto ReservaModel con los datos de la nueva reserva
+        valores = self._valores(reserva)
+        try:
+            reserva_id = self.ejecutar(query, valores)
+        except Exception as e:
+            self._fecha_ocupada(e)
+            raise
+        creada = self.get(reserva_id) if releer else ReservaModel(reserva_id, *valores)
+        self._notificar(creada)
+        return creada
 
-    def update(self, reserva: ReservaModel):
+    def create_lote(self, reservas):
         """
-        Actualiza una reserva existente en la base de datos.
+        Inserta muchas reservas con un único executemany dentro de una transacción: o entran todas o ninguna.
+        No se releen las reservas: tras el commit, los observadores reciben solo los salones afectados.
 
         Args:
-            reserva (ReservaModel): El objeto ReservaModel con los datos actualizados de la reserva.
+            reservas (list): Objetos ReservaModel sin ID.
 
         Returns:
-            ReservaModel: El objeto ReservaModel de la reserva actualizada.
+            int: Número de reservas insertadas.
+
+        Raises:
+            FechaOcupadaError: Si alguna reserva pisa un día ya ocupado (no se inserta ninguna).
+        """
+        if not reservas:
+            return 0
+        query = """
+        INSERT INTO reservas (tipo_reserva_id, salon_id, tipo_cocina_id, persona, telefono, fecha, ocupacion, jornadas, habitaciones) 
+        VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s)
+        """
+        try:
+            with self.transaccion() as conn:
+                insertadas = self.ejecutar_lote(query, [self._valores(reserva) for reserva in reservas], conn)
+        except Exception as e:
+            self._fecha_ocupada(e)
+            raise
+        self._notificar_salones({reserva.salon_id for reserva in reservas})
+        return insertadas
+
+    def _notificar_salones(self, salones):
+        """
+        Avisa a los observadores de salón de que esos salones han cambiado en bloque.
+        """
+        for salon_id in salones:
+            for funcion in self.observadores_salon:
+                funcion(salon_id)
+
+    def update(self, reserva: ReservaModel, releer=False, anterior=None):
+        """
+        Actualiza una reserva existente en la base de datos con control de concurrencia optimista:
+        el UPDATE solo se aplica si la fila conserva la versión con la que se leyó, y la incrementa.
+        Todo se resuelve en una sola sentencia, sin leer antes la fila ni comprobar la fecha.
+        La reserva devuelta se construye con los valores escritos, sin volver a consultarla.
+        Los observadores reciben también el salón y la fecha anteriores, para invalidar los que deja la reserva:
+        salen de la reserva leída si quien llama la pasa (el UPDATE exige su misma versión) o, si no,
+        del índice de disponibilidad en memoria. Si tampoco está ahí, el registro de cambios invalida el mes anterior.
+
+        Args:
+            reserva (ReservaModel): El objeto ReservaModel con los datos actualizados y la versión leída.
+            releer (bool): Si es True, se relee la fila para obtener los valores calculados por el servidor.
+            anterior (ReservaModel): La reserva tal como se leyó, con la misma versión (opcional).
+
+        Returns:
+            ReservaModel: El objeto ReservaModel de la reserva actualizada, con la nueva versión.
+
+        Raises:
+            ConflictoVersionError: Si otro puesto ha modificado o borrado la reserva desde que se leyó.
+            FechaOcupadaError: Si algún día de la reserva ya está ocupado en el salón.
         """
         query = """
         UPDATE reservas 
         SET tipo_reserva_id = %s, salon_id = %s, tipo_cocina_id = %s, persona = %s, telefono = %s, 
-            fecha = %s, ocupacion = %s, jornadas = %s, habitaciones = %s 
-        WHERE reserva_id = %s
+            fecha = %s, ocupacion = %s, jornadas = %s, habitaciones = %s, version = version + 1 
+        WHERE reserva_id = %s AND version = %s
+        """
+        if anterior is not None and anterior.version == reserva.version:
+            ubicacion = (anterior.salon_id, anterior.fecha)
+        else:
+            ubicacion = disponibilidad.ubicacion(reserva.reserva_id)  # Antes del UPDATE: los observadores la cambian
+        valores = self._valores(reserva)
+        try:
+            modificadas = self.ejecutar(query, valores + (reserva.reserva_id, reserva.version), filas=True)
+        except Exception as e:
+            self._fecha_ocupada(e)
+            raise
+        if not modificadas:
+            raise ConflictoVersionError(f"La reserva {reserva.reserva_id} ha sido modificada o eliminada desde otro puesto.")
+        actualizada = self.get(reserva.reserva_id) if releer else ReservaModel(reserva.reserva_id, *valores, reserva.version + 1)
+        self._notificar(actualizada, ubicacion)
+        return actualizada
+
+    def _fecha_ocupada(self, error):
+        """
+        Traduce la violación de la clave única de reservas_dias a FechaOcupadaError; el resto de errores no se tocan.
+        """
+        if self.backend.es_duplicado(error):
+            raise FechaOcupadaError("La fecha seleccionada ya está ocupada para este salón.") from error
+
+    @staticmethod
+    def _valores(reserva):
+        """
+        Devuelve los valores de una reserva en el orden de las columnas que se escriben (todas menos el ID).
         """
-        self.execute_query(query, (
+        return (
             reserva.tipo_reserva_id, reserva.salon_id, reserva.tipo_cocina_id,
             reserva.persona, reserva.telefono, reserva.fecha,
             reserva.ocupacion, reserva.jornadas, reserva.habitaciones,
-            reserva.reserva_id
-        ))
-        return self.get(reserva.reserva_id)  # Devuelve el objeto ReservaModel de la reserva actualizada
+        )
+
+
+class CambiosDAO(BaseDAO):
+    """
+    Clase para leer el registro de cambios que rellenan los triggers de la tabla reservas.
+    """
+    COLUMNAS = "cambio_id, tabla, operacion, registro_id, salon_id, salon_anterior, fecha_anterior"
+
+    def ultimo(self):
+        """
+        Devuelve el ID del último cambio registrado, que sirve de marca inicial para leer solo los nuevos.
+
+        Returns:
+            int: El ID del último cambio, o 0 si no hay ninguno.
+        """
+        row = self.consultar("SELECT MAX(cambio_id) FROM cambios", fetch_one=True)
+        return (row[0] if row else None) or 0
+
+    def get_desde(self, cambio_id, limite=500):
+        """
+        Obtiene los cambios posteriores a una marca, en orden.
+
+        Args:
+            cambio_id (int): Marca: ID del último cambio ya leído.
+            limite (int): Número máximo de cambios a devolver.
+
+        Returns:
+            list: Lista de objetos CambioModel.
+        """
+        query = f"SELECT {self.COLUMNAS} FROM cambios WHERE cambio_id > %s ORDER BY cambio_id LIMIT %s"
+        rows = self.consultar(query, (cambio_id, limite))
+        return [CambioModel.desde_fila(row) for row in rows]
+
+    def get_ids(self, cambio_ids):
+        """
+        Obtiene los cambios con unos IDs concretos, en orden; los que no existen no se devuelven.
+
+        Args:
+            cambio_ids (list): IDs de los cambios.
+
+        Returns:
+            list: Lista de objetos CambioModel.
+        """
+        if not cambio_ids:
+            return []
+        marcadores = ", ".join(["%s"] * len(cambio_ids))
+        query = f"SELECT {self.COLUMNAS} FROM cambios WHERE cambio_id IN ({marcadores}) ORDER BY cambio_id"
+        rows = self.consultar(query, tuple(cambio_ids))
+        return [CambioModel.desde_fila(row) for row in rows]
+
+    def purgar(self, segundos):
+        """
+        Borra los cambios registrados hace más de unos segundos, para que la tabla no crezca sin límite.
+        El corte se calcula con el reloj de la base de datos, el mismo que rellena la columna creado:
+        en SQLite CURRENT_TIMESTAMP está en UTC y la hora local del puesto no serviría.
+
+        Args:
+            segundos (int): Antigüedad a partir de la cual se borran los cambios.
+        """
+        self.ejecutar(f"DELETE FROM cambios WHERE creado < {self.backend.hace_segundos()}", (int(segundos),))
@@ -0,0 +1,241 @@
+import bisect
+import datetime
+import threading
+
+
+def duracion(jornadas):
+    """
+    Número de días que ocupa una reserva: las jornadas de un congreso, o un día para el resto.
+
+    Args:
+        jornadas (int): Jornadas de la reserva (0 si no aplica).
+
+    Returns:
+        int: Días ocupados, como mínimo 1.
+    """
+    return max(jornadas or 0, 1)
+
+
+class _IntervalosSalon:
+    """
+    Intervalos de días ocupados de un salón, ordenados por día de inicio.
+    Los días se guardan como ordinales (date.toordinal()) y cada intervalo es semiabierto [inicio, fin).
+    """
+    def __init__(self):
+        self.inicios = []  # Día de inicio de cada intervalo, ordenado
+        self.entradas = []  # (inicio, fin, reserva_id), en el mismo orden que inicios
+        self.max_duracion = 1  # Intervalo más largo: acota cuánto hay que mirar hacia atrás
+
+    def insertar(self, inicio, fin, reserva_id):
+        """
+        Inserta un intervalo manteniendo el orden por día de inicio.
+        """
+        pos = bisect.bisect_right(self.inicios, inicio)
+        self.inicios.insert(pos, inicio)
+        self.entradas.insert(pos, (inicio, fin, reserva_id))
+        self.max_duracion = max(self.max_duracion, fin - inicio)
+
+    def quitar(self, inicio, reserva_id):
+        """
+        Elimina el intervalo de una reserva a partir de su día de inicio.
+        """
+        pos = bisect.bisect_left(self.inicios, inicio)
+        while pos < len(self.inicios) and self.inicios[pos] == inicio:
+            if self.entradas[pos][2] == reserva_id:
+                del self.inicios[pos]
+                del self.entradas[pos]
+                return
+            pos += 1
+
+    def solapes(self, inicio, fin):
+        """
+        Devuelve los intervalos que se solapan con [inicio, fin).
+        Solo pueden solaparse los que empiezan entre inicio - max_duracion + 1 y fin - 1,
+        así que basta con dos búsquedas binarias y recorrer ese tramo.
+        """
+        desde = bisect.bisect_left(self.inicios, inicio - self.max_duracion + 1)
+        hasta = bisect.bisect_left(self.inicios, fin)
+        return [entrada for entrada in self.entradas[desde:hasta] if entrada[1] > inicio]
+
+
+class IndiceDisponibilidad:
+    """
+    Índice en memoria de los días ocupados de cada salón, a partir de la fecha y las jornadas de cada reserva.
+    Responde si un rango de días está libre en O(log n) sin consultar la base de datos.
+    Cada salón se carga completo la primera vez que se consulta y después se mantiene al día
+    con las altas y modificaciones que hacen los DAOs.
+    """
+    def __init__(self):
+        """
+        Inicializa el índice vacío.
+        """
+        self._lock = threading.RLock()
+        self._salones = {}  # salon_id -> _IntervalosSalon
+        self._reservas = {}  # reserva_id -> (salon_id, inicio)
+
+    def cargado(self, salon_id):
+        """
+        Indica si las reservas de un salón ya están en el índice.
+
+        Args:
+            salon_id (int): El ID del salón.
+
+        Returns:
+            bool: True si el salón está cargado.
+        """
+        with self._lock:
+            return salon_id in self._salones
+
+    def cargar_salon(self, salon_id, ocupaciones):
+        """
+        Sustituye las ocupaciones de un salón.
+
+        Args:
+            salon_id (int): El ID del salón.
+            ocupaciones (iterable): Tuplas (reserva_id, fecha, jornadas) de las reservas del salón.
+        """
+        with self._lock:
+            anterior = self._salones.get(salon_id)
+            if anterior is not None:
+                for _, _, reserva_id in anterior.entradas:
+                    self._reservas.pop(reserva_id, None)
+            intervalos = _IntervalosSalon()
+            entradas = []
+            for reserva_id, fecha, jornadas in ocupaciones:
+                inicio = fecha.toordinal()
+                entradas.append((inicio, inicio + duracion(jornadas), reserva_id))
+                self._reservas[reserva_id] = (salon_id, inicio)
+            entradas.sort()
+            intervalos.inicios = [entrada[0] for entrada in entradas]
+            intervalos.entradas = entradas
+            intervalos.max_duracion = max((fin - inicio for inicio, fin, _ in entradas), default=1)
+            self._salones[salon_id] = intervalos
+
+    def descartar_salon(self, salon_id):
+        """
+        Olvida las ocupaciones de un salón, que se volverán a leer completas la próxima vez que se consulte
+        (por ejemplo, tras una importación masiva).
+
+        Args:
+            salon_id (int): El ID del salón.
+        """
+        with self._lock:
+            intervalos = self._salones.pop(salon_id, None)
+            if intervalos is not None:
+                for _, _, reserva_id in intervalos.entradas:
+                    self._reservas.pop(reserva_id, None)
+
+    def registrar(self, reserva, anterior=None):
+        """
+        Añade o actualiza una reserva en el índice (se llama tras cada alta o modificación).
+        Si su salón aún no está cargado no hace nada: se leerá completo al consultarlo.
+
+        Args:
+            reserva (ReservaModel): La reserva guardada.
+            anterior (tuple): No se usa: el índice ya sabe dónde estaba cada reserva.
+        """
+        with self._lock:
+            self.quitar(reserva.reserva_id)
+            intervalos = self._salones.get(reserva.salon_id)
+            if intervalos is None:
+                return
+            inicio = reserva.fecha.toordinal()
+            intervalos.insertar(inicio, inicio + duracion(reserva.jornadas), reserva.reserva_id)
+            self._reservas[reserva.reserva_id] = (reserva.salon_id, inicio)
+
+    def ubicacion(self, reserva_id):
+        """
+        Devuelve el salón y la fecha de inicio que el índice tiene para una reserva, sin consultar la base de datos.
+
+        Args:
+            reserva_id (int): El ID de la reserva.
+
+        Returns:
+            tuple: (salon_id, fecha), o None si su salón no está cargado.
+        """
+        with self._lock:
+            ubicacion = self._reservas.get(reserva_id)
+        if ubicacion is None:
+            return None
+        salon_id, inicio = ubicacion
+        return salon_id, datetime.date.fromordinal(inicio)
+
+    def quitar(self, reserva_id):
+        """
+        Elimina una reserva del índice.
+
+        Args:
+            reserva_id (int): El ID de la reserva.
+        """
+        with self._lock:
+            ubicacion = self._reservas.pop(reserva_id, None)
+            if ubicacion is not None:
+                salon_id, inicio = ubicacion
+                self._salones[salon_id].quitar(inicio, reserva_id)
+
+    def conflictos(self, salon_id, fecha, jornadas=0, excluir=None):
+        """
+        Devuelve las reservas del salón que ocupan algún día del rango indicado.
+
+        Args:
+            salon_id (int): El ID del salón (debe estar cargado).
+            fecha (date): Primer día del rango.
+            jornadas (int): Jornadas del rango (0 o 1 para un solo día).
+            excluir (int): ID de una reserva que no cuenta como conflicto (la que se está editando).
+
+        Returns:
+            list: IDs de las reservas en conflicto.
+        """
+        inicio = fecha.toordinal()
+        with self._lock:
+            intervalos = self._salones.get(salon_id)
+            if intervalos is None:
+                raise KeyError(f"El salón {salon_id} no está cargado en el índice de disponibilidad.")
+            return [
+                reserva_id for _, _, reserva_id in intervalos.solapes(inicio, inicio + duracion(jornadas))
+                if reserva_id != excluir
+            ]
+
+    def ocupado(self, salon_id, fecha, jornadas=0, excluir=None):
+        """
+        Indica si algún día del rango está ocupado por otra reserva.
+
+        Args:
+            salon_id (int): El ID del salón (debe estar cargado).
+            fecha (date): Primer día del rango.
+            jornadas (int): Jornadas del rango (0 o 1 para un solo día).
+            excluir (int): ID de una reserva que no cuenta como conflicto.
+
+        Returns:
+            bool: True si hay algún conflicto.
+        """
+        return bool(self.conflictos(salon_id, fecha, jornadas, excluir))
+
+    def dias_ocupados(self, salon_id, desde, hasta, excluir=None):
+        """
+        Devuelve los días ocupados de un salón dentro de un rango, por ejemplo para marcarlos en un calendario.
+
+        Args:
+            salon_id (int): El ID del salón (debe estar cargado).
+            desde (date): Primer día del rango.
+            hasta (date): Día siguiente al último del rango.
+            excluir (int): ID de una reserva cuyos días no se devuelven.
+
+        Returns:
+            set: Fechas (date) ocupadas dentro del rango.
+        """
+        inicio, fin = desde.toordinal(), hasta.toordinal()
+        with self._lock:
+            intervalos = self._salones.get(salon_id)
+            if intervalos is None:
+                raise KeyError(f"El salón {salon_id} no está cargado en el índice de disponibilidad.")
+            solapes = intervalos.solapes(inicio, fin)
+        dias = set()
+        for ini, fin_reserva, reserva_id in solapes:
+            if reserva_id != excluir:
+                for dia in range(max(ini, inicio), min(fin_reserva, fin)):
+                    dias.add(datetime.date.fromordinal(dia))
+        return dias
+
+
+disponibilidad = IndiceDisponibilidad()  # Índice compartido por todo el proceso
@@ -0,0 +1,178 @@
+import argparse
+import csv
+import datetime
+import gzip
+import os
+import sys
+import time
+
+from modelos.datos import TAMANIO_LOTE, ReservasDAO, SalonesDAO, TiposCocinaDAO, TiposReservasDAO
+from modelos.metricas import metricas
+
+TAMANIO_LOTE_EXPORTACION = int(os.environ.get("HOTEL_EXPORTACION_LOTE", TAMANIO_LOTE * 5))  # Filas por fetchmany y por grupo de filas
+
+# Columnas exportadas: las mismas que admite la importación, más el ID de la reserva
+CABECERA = ("reserva_id", "fecha", "salon", "tipo_reserva", "tipo_cocina", "persona", "telefono", "ocupacion", "jornadas", "habitaciones")
+FORMATOS = {".csv": "csv", ".gz": "csv.gz", ".parquet": "parquet"}  # Extensión -> formato
+
+
+class ExportacionError(Exception):
+    """
+    Se lanza cuando no se puede exportar en el formato pedido.
+    """
+
+
+def formato_de(ruta):
+    """
+    Deduce el formato de exportación por la extensión del fichero.
+
+    Args:
+        ruta (str): Fichero de salida (.csv, .csv.gz o .parquet).
+
+    Returns:
+        str: "csv", "csv.gz" o "parquet".
+
+    Raises:
+        ExportacionError: Si la extensión no corresponde a ningún formato.
+    """
+    formato = FORMATOS.get(os.path.splitext(ruta.lower())[1])
+    if formato is None:
+        raise ExportacionError(f"No se reconoce el formato de «{ruta}»: use .csv, .csv.gz o .parquet.")
+    return formato
+
+
+class _EscritorCSV:
+    """
+    Escribe los lotes en CSV, comprimido con gzip si se pide.
+    """
+    def __init__(self, ruta, comprimir):
+        self.fichero = gzip.open(ruta, "wt", newline="", encoding="utf-8") if comprimir else open(ruta, "w", newline="", encoding="utf-8")
+        self.escritor = csv.writer(self.fichero)
+        self.escritor.writerow(CABECERA)
+
+    def escribir(self, filas):
+        self.escritor.writerows(filas)
+
+    def cerrar(self):
+        self.fichero.close()
+
+
+class _EscritorParquet:
+    """
+    Escribe los lotes en Parquet (columnar, comprimido con zstd): cada lote es un grupo de filas,
+    así que la memoria no depende del total exportado. Necesita pyarrow.
+    """
+    def __init__(self, ruta):
+        try:
+            import pyarrow
+            import pyarrow.parquet
+        except ImportError:
+            raise ExportacionError("Para exportar a Parquet hay que instalar pyarrow (pip install pyarrow).") from None
+        self.pa = pyarrow
+        texto = pyarrow.string()
+        self.esquema = pyarrow.schema([
+            ("reserva_id", pyarrow.int64()), ("fecha", pyarrow.date32()),
+            ("salon", texto), ("tipo_reserva", texto), ("tipo_cocina", texto), ("persona", texto), ("telefono", texto),
+            ("ocupacion", pyarrow.int32()), ("jornadas", pyarrow.int32()), ("habitaciones", pyarrow.int8()),
+        ])
+        self.escritor = pyarrow.parquet.ParquetWriter(
+            ruta, self.esquema, compression="zstd",
+            use_dictionary=["salon", "tipo_reserva", "tipo_cocina"],  # Pocos valores distintos: se guardan una vez por grupo
+        )
+
+    def escribir(self, filas):
+        columnas = list(zip(*filas))
+        self.escritor.write_table(self.pa.Table.from_arrays(
+            [self.pa.array(columna, type=campo.type) for columna, campo in zip(columnas, self.esquema)],
+            schema=self.esquema,
+        ))
+
+    def cerrar(self):
+        self.escritor.close()
+
+
+def exportar(ruta, salon_id=None, desde=None, hasta=None, formato=None, tamanio_lote=TAMANIO_LOTE_EXPORTACION, pool=None, al_avanzar=None):
+    """
+    Exporta reservas a un fichero con memoria constante: las filas se leen por lotes con un cursor sin buffer,
+    los nombres de salón y tipos se resuelven con los catálogos en caché y cada lote se escribe antes de pedir el siguiente.
+    Se escribe en un fichero temporal que solo sustituye al de destino si la exportación termina bien.
+
+    Args:
+        ruta (str): Fichero de salida.
+        salon_id (int): Exporta solo las reservas de este salón (opcional).
+        desde (date): Fecha mínima incluida (opcional).
+        hasta (date): Fecha máxima excluida (opcional).
+        formato (str): "csv", "csv.gz" o "parquet"; por defecto se deduce de la extensión.
+        tamanio_lote (int): Filas por lote.
+        pool (PoolConexiones): Pool del que tomar las conexiones (por defecto el del proceso).
+        al_avanzar (callable): Recibe las reservas escritas hasta el momento tras cada lote (opcional).
+
+    Returns:
+        int: Número de reservas exportadas.
+
+    Raises:
+        ExportacionError: Si el formato no es válido o falta pyarrow para Parquet.
+    """
+    formato = formato or formato_de(ruta)
+    if formato not in FORMATOS.values():
+        raise ExportacionError(f"Formato de exportación desconocido: {formato}.")
+    dao = ReservasDAO(pool)
+    salones = {s.salon_id: s.nombre for s in SalonesDAO(pool).get_all()}
+    tipos_reserva = {t.tipo_reserva_id: t.nombre for t in TiposReservasDAO(pool).get_all()}
+    tipos_cocina = {t.tipo_cocina_id: t.nombre for t in TiposCocinaDAO(pool).get_all()}
+
+    temporal = f"{ruta}.parcial"
+    escritor = _EscritorParquet(temporal) if formato == "parquet" else _EscritorCSV(temporal, formato == "csv.gz")
+    total = 0
+    try:
+        with metricas.accion("exportacion"):
+            for filas in dao.iter_filas(salon_id, desde, hasta, tamanio_lote):
+                # Se trabaja con las tuplas del cursor, sin crear un ReservaModel por fila
+                escritor.escribir([
+                    (reserva_id, fecha, salones.get(salon), tipos_reserva.get(tipo_reserva), tipos_cocina.get(tipo_cocina),
+                     persona, telefono, ocupacion, jornadas, habitaciones)
+                    for reserva_id, tipo_reserva, salon, tipo_cocina, persona, telefono, fecha, ocupacion, jornadas, habitaciones, *_ in filas
+                ])
+                total += len(filas)
+                if al_avanzar is not None:
+                    al_avanzar(total)
+        escritor.cerrar()
+        os.replace(temporal, ruta)
+    except BaseException:
+        escritor.cerrar()
+        os.remove(temporal)
+        raise
+    return total
+
+
+def main(argv=None):
+    """
+    Punto de entrada de línea de comandos:
+    python -m modelos.exportacion salida.csv [--salon ID|nombre] [--desde AAAA-MM-DD] [--hasta AAAA-MM-DD]
+    """
+    parser = argparse.ArgumentParser(description="Exporta reservas a CSV, CSV comprimido o Parquet.")
+    parser.add_argument("fichero", help="Fichero de salida: .csv, .csv.gz o .parquet.")
+    parser.add_argument("--salon", help="ID o nombre del salón (por defecto, todos).")
+    parser.add_argument("--desde", type=datetime.date.fromisoformat, help="Fecha mínima incluida.")
+    parser.add_argument("--hasta", type=datetime.date.fromisoformat, help="Fecha máxima excluida.")
+    parser.add_argument("--formato", choices=sorted(FORMATOS.values()), help="Formato (por defecto, según la extensión).")
+    parser.add_argument("--lote", type=int, default=TAMANIO_LOTE_EXPORTACION, help="Filas por lote.")
+    args = parser.parse_args(argv)
+
+    salon_id = None
+    if args.salon:
+        salon = SalonesDAO().get(int(args.salon)) if args.salon.isdigit() else SalonesDAO().get_por_nombre(args.salon)
+        if salon is None:
+            parser.error(f"No existe el salón «{args.salon}».")
+        salon_id = salon.salon_id
+    inicio = time.perf_counter()
+    try:
+        total = exportar(args.fichero, salon_id, args.desde, args.hasta, args.formato, args.lote)
+    except ExportacionError as e:
+        parser.exit(1, f"{e}\n")
+    print(f"{total} reservas exportadas a {args.fichero} en {time.perf_counter() - inicio:.2f} s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,371 @@
+import argparse
+import csv
+import datetime
+import json
+import logging
+import os
+import sys
+import time
+
+from modelos.datos import ReservasDAO, SalonesDAO, TiposCocinaDAO, TiposReservasDAO
+from modelos.disponibilidad import IndiceDisponibilidad
+from modelos.metricas import metricas
+from modelos.models import ReservaModel
+from modelos.servicio import MAX_TEXTO, RANGOS_RESERVA
+
+logger = logging.getLogger(__name__)
+
+TAMANIO_LOTE_IMPORTACION = int(os.environ.get("HOTEL_IMPORTACION_LOTE", 500))  # Reservas por transacción al importar
+BLOQUE_LECTURA = 64 * 1024  # Caracteres que se leen de cada vez de un fichero JSON
+
+# Campos de cada reserva en el fichero; salón y tipos admiten el ID o el nombre
+CAMPOS = ("fecha", "salon", "tipo_reserva", "tipo_cocina", "persona", "telefono", "ocupacion", "jornadas", "habitaciones")
+OBLIGATORIOS = ("fecha", "salon", "tipo_reserva", "tipo_cocina", "persona", "telefono")
+FORMATOS_FECHA = ("%Y-%m-%d", "%d/%m/%Y")
+
+
+class FilaRechazada(Exception):
+    """
+    Se lanza cuando una fila del fichero no supera la validación; el mensaje es el motivo.
+    """
+
+
+class InformeImportacion:
+    """
+    Resultado de una importación: filas leídas, insertadas y rechazadas con su motivo.
+    """
+    def __init__(self, ruta):
+        """
+        Inicializa el informe vacío.
+
+        Args:
+            ruta (str): Fichero importado.
+        """
+        self.ruta = ruta
+        self.leidas = 0
+        self.insertadas = 0
+        self.lotes = 0
+        self.rechazadas = []  # (fila, motivo, datos originales)
+        self.segundos = 0.0
+
+    def rechazar(self, fila, motivo, datos):
+        """
+        Anota una fila rechazada.
+
+        Args:
+            fila (int): Número de línea en un CSV o de objeto en un JSON.
+            motivo (str): Motivo del rechazo.
+            datos (dict): Datos de la fila tal como venían en el fichero.
+        """
+        self.rechazadas.append((fila, motivo, datos))
+
+    def resumen(self):
+        """
+        Devuelve un resumen legible de la importación.
+        """
+        return (
+            f"{self.ruta}: {self.leidas} leídas, {self.insertadas} insertadas en {self.lotes} lotes, "
+            f"{len(self.rechazadas)} rechazadas ({self.segundos:.2f} s)"
+        )
+
+    def guardar_rechazos(self, ruta):
+        """
+        Escribe las filas rechazadas en un CSV con su número de fila, el motivo y los campos originales,
+        para corregirlas y volver a importarlas.
+
+        Args:
+            ruta (str): Fichero CSV de salida.
+        """
+        with open(ruta, "w", newline="", encoding="utf-8") as fichero:
+            escritor = csv.writer(fichero)
+            escritor.writerow(("fila", "motivo") + CAMPOS)
+            for fila, motivo, datos in self.rechazadas:
+                escritor.writerow((fila, motivo) + tuple(datos.get(campo, "") for campo in CAMPOS))
+
+
+def leer_filas(ruta):
+    """
+    Recorre las reservas de un fichero CSV o JSON sin cargarlo entero en memoria.
+
+    Args:
+        ruta (str): Fichero .csv (con cabecera; separado por comas o punto y coma), .json (una lista de objetos
+            o varios objetos seguidos) o .jsonl/.ndjson (un objeto por línea).
+
+    Yields:
+        tuple: (número de fila, diccionario con los campos de la reserva).
+    """
+    if ruta.lower().endswith(".csv"):
+        yield from _leer_csv(ruta)
+    else:
+        yield from _leer_json(ruta)
+
+
+def _leer_csv(ruta):
+    """
+    Recorre un CSV con cabecera; el número de fila es la línea del fichero.
+    """
+    with open(ruta, newline="", encoding="utf-8-sig") as fichero:
+        muestra = fichero.read(4096)
+        fichero.seek(0)
+        try:
+            dialecto = csv.Sniffer().sniff(muestra, delimiters=",;")
+        except csv.Error:
+            dialecto = csv.excel
+        lector = csv.DictReader(fichero, dialect=dialecto)
+        for datos in lector:
+            yield lector.line_num, {clave.strip().lower(): valor for clave, valor in datos.items() if clave}
+
+
+def _leer_json(ruta):
+    """
+    Recorre los objetos de un fichero JSON por bloques con JSONDecoder.raw_decode: admite una lista
+    de objetos, objetos seguidos o uno por línea. El número de fila es el orden del objeto en el fichero.
+    """
+    decodificador = json.JSONDecoder()
+    with open(ruta, encoding="utf-8-sig") as fichero:
+        texto, pos, numero = "", 0, 0
+        en_lista = None  # Se decide con el primer carácter significativo
+        fin_fichero = False
+        while True:
+            # Salta espacios y, dentro de una lista, las comas y el corchete de apertura
+            while pos < len(texto) and (texto[pos].isspace() or (en_lista and texto[pos] == ",")):
+                pos += 1
+            if pos < len(texto) and en_lista is None:
+                en_lista = texto[pos] == "["
+                pos += en_lista
+                continue
+            if pos < len(texto) and en_lista and texto[pos] == "]":
+                return
+            if pos >= len(texto) or not fin_fichero:
+                bloque = fichero.read(BLOQUE_LECTURA)
+                if bloque:
+                    texto, pos = texto[pos:] + bloque, 0
+                    continue
+                fin_fichero = True
+                if pos >= len(texto):
+                    if en_lista:
+                        raise ValueError(f"{ruta}: la lista JSON no está cerrada.")
+                    return
+            try:
+                objeto, pos = decodificador.raw_decode(texto, pos)
+            except json.JSONDecodeError as e:
+                raise ValueError(f"{ruta}: JSON no válido cerca del objeto {numero + 1}: {e.msg}.") from e
+            numero += 1
+            if not isinstance(objeto, dict):
+                raise ValueError(f"{ruta}: el objeto {numero} no es un objeto JSON.")
+            yield numero, {str(clave).strip().lower(): valor for clave, valor in objeto.items()}
+
+
+class ValidadorReservas:
+    """
+    Valida filas de importación contra los catálogos en caché y las reglas de disponibilidad.
+    Usa un índice de disponibilidad propio con las reservas de la base de datos y las ya aceptadas del fichero,
+    de modo que también detecta conflictos entre filas del mismo fichero.
+    """
+    def __init__(self, dao_reservas, dao_salones, dao_tipos_reserva, dao_tipos_cocina):
+        """
+        Inicializa el validador.
+
+        Args:
+            dao_reservas (ReservasDAO): DAO de reservas (para leer las ocupaciones de cada salón).
+            dao_salones (SalonesDAO): DAO de salones.
+            dao_tipos_reserva (TiposReservasDAO): DAO de tipos de reserva.
+            dao_tipos_cocina (TiposCocinaDAO): DAO de tipos de cocina.
+        """
+        self.dao_reservas = dao_reservas
+        self.dao_salones = dao_salones
+        self.dao_tipos_reserva = dao_tipos_reserva
+        self.dao_tipos_cocina = dao_tipos_cocina
+        self.ocupacion = IndiceDisponibilidad()
+        self._filas = {}  # ID provisional (negativo) -> fila del fichero, para los mensajes de conflicto
+        self._siguiente = -1
+
+    def validar(self, fila, datos):
+        """
+        Convierte una fila en una reserva y la registra como aceptada en el índice del validador.
+
+        Args:
+            fila (int): Número de fila en el fichero.
+            datos (dict): Campos de la fila.
+
+        Returns:
+            tuple: (ReservaModel sin ID, ID provisional para olvidar() si luego no se inserta).
+
+        Raises:
+            FilaRechazada: Si falta algún campo, algún valor no es válido o supera los límites del formulario
+                (los mismos que el servicio HTTP), o el salón está ocupado.
+        """
+        faltan = [campo for campo in OBLIGATORIOS if str(datos.get(campo) or "").strip() == ""]
+        if faltan:
+            raise FilaRechazada(f"Faltan campos obligatorios: {', '.join(faltan)}")
+
+        salon = self._catalogo(self.dao_salones, datos["salon"], "salón")
+        tipo_reserva = self._catalogo(self.dao_tipos_reserva, datos["tipo_reserva"], "tipo de reserva")
+        tipo_cocina = self._catalogo(self.dao_tipos_cocina, datos["tipo_cocina"], "tipo de cocina")
+        persona, telefono = str(datos["persona"]).strip(), str(datos["telefono"]).strip()
+        if len(persona) > MAX_TEXTO or len(telefono) > MAX_TEXTO:
+            raise FilaRechazada(f"La persona y el teléfono deben tener como máximo {MAX_TEXTO} caracteres")
+        reserva = ReservaModel(
+            None, tipo_reserva.tipo_reserva_id, salon.salon_id, tipo_cocina.tipo_cocina_id, persona, telefono,
+            self._fecha(datos["fecha"]),
+            *(self._entero(datos, campo, maximo=RANGOS_RESERVA[campo][1]) for campo in ("ocupacion", "jornadas", "habitaciones")),
+        )
+
+        if not self.ocupacion.cargado(reserva.salon_id):
+            self.ocupacion.cargar_salon(reserva.salon_id, self.dao_reservas.get_ocupaciones(reserva.salon_id))
+        conflictos = self.ocupacion.conflictos(reserva.salon_id, reserva.fecha, reserva.jornadas)
+        if conflictos:
+            otra = conflictos[0]
+            origen = f"la fila {self._filas[otra]} del fichero" if otra < 0 else f"la reserva {otra}"
+            raise FilaRechazada(f"El salón {salon.nombre} está ocupado el {reserva.fecha}: coincide con {origen}")
+
+        provisional = self._siguiente
+        self._siguiente -= 1
+        self._filas[provisional] = fila
+        reserva.reserva_id = provisional
+        self.ocupacion.registrar(reserva)
+        reserva.reserva_id = None
+        return reserva, provisional
+
+    def olvidar(self, provisional):
+        """
+        Libera los días de una reserva aceptada que finalmente no se ha insertado.
+
+        Args:
+            provisional (int): ID provisional devuelto por validar().
+        """
+        self.ocupacion.quitar(provisional)
+        self._filas.pop(provisional, None)
+
+    @staticmethod
+    def _catalogo(dao, valor, descripcion):
+        """
+        Busca un elemento de catálogo por ID o, si el valor no es numérico, por nombre.
+        """
+        texto = str(valor).strip()
+        elemento = dao.get(int(texto)) if texto.isdigit() else dao.get_por_nombre(texto)
+        if elemento is None:
+            raise FilaRechazada(f"No existe el {descripcion} «{texto}»")
+        return elemento
+
+    @staticmethod
+    def _fecha(valor):
+        """
+        Convierte una fecha en formato AAAA-MM-DD o DD/MM/AAAA.
+        """
+        texto = str(valor).strip()
+        for formato in FORMATOS_FECHA:
+            try:
+                return datetime.datetime.strptime(texto, formato).date()
+            except ValueError:
+                pass
+        raise FilaRechazada(f"Fecha no válida «{texto}» (se espera AAAA-MM-DD o DD/MM/AAAA)")
+
+    @staticmethod
+    def _entero(datos, campo, maximo=None):
+        """
+        Convierte un campo numérico opcional (vacío cuenta como 0) y comprueba que no sea negativo.
+        """
+        valor = datos.get(campo)
+        if valor is None or str(valor).strip() == "":
+            return 0
+        if isinstance(valor, bool):
+            valor = int(valor)
+        try:
+            numero = int(str(valor).strip())
+        except ValueError:
+            raise FilaRechazada(f"El campo {campo} debe ser un número entero, no «{valor}»") from None
+        if numero < 0 or (maximo is not None and numero > maximo):
+            limite = f"entre 0 y {maximo}" if maximo is not None else "mayor o igual que 0"
+            raise FilaRechazada(f"El campo {campo} debe estar {limite}")
+        return numero
+
+
+def importar(ruta, tamanio_lote=TAMANIO_LOTE_IMPORTACION, simular=False, pool=None):
+    """
+    Importa las reservas de un fichero CSV o JSON. Las filas válidas se insertan por lotes con executemany,
+    con una transacción por lote; si un lote falla en la base de datos se reintenta fila a fila para rechazar
+    solo las que fallan.
+
+    Args:
+        ruta (str): Fichero a importar.
+        tamanio_lote (int): Reservas por lote (y por transacción).
+        simular (bool): Si es True, solo valida: no inserta nada.
+        pool (PoolConexiones): Pool del que tomar las conexiones (por defecto el del proceso).
+
+    Returns:
+        InformeImportacion: El resultado de la importación.
+    """
+    dao = ReservasDAO(pool)
+    validador = ValidadorReservas(dao, SalonesDAO(pool), TiposReservasDAO(pool), TiposCocinaDAO(pool))
+    informe = InformeImportacion(ruta)
+    inicio = time.perf_counter()
+    lote = []
+    with metricas.accion("importacion"):
+        for fila, datos in leer_filas(ruta):
+            informe.leidas += 1
+            try:
+                reserva, provisional = validador.validar(fila, datos)
+            except FilaRechazada as e:
+                informe.rechazar(fila, str(e), datos)
+                continue
+            lote.append((fila, datos, reserva, provisional))
+            if len(lote) >= tamanio_lote:
+                _insertar_lote(dao, validador, lote, informe, simular)
+                lote = []
+        if lote:
+            _insertar_lote(dao, validador, lote, informe, simular)
+    informe.segundos = time.perf_counter() - inicio
+    return informe
+
+
+def _insertar_lote(dao, validador, lote, informe, simular):
+    """
+    Inserta un lote en una transacción; si falla, lo reintenta fila a fila y rechaza las que no entran.
+    """
+    informe.lotes += 1
+    if simular:
+        informe.insertadas += len(lote)
+        return
+    try:
+        informe.insertadas += dao.create_lote([reserva for _, _, reserva, _ in lote])
+        return
+    except Exception as e:
+        logger.warning("Falla el lote de %d reservas (%s); se reintenta fila a fila.", len(lote), e)
+    for fila, datos, reserva, provisional in lote:
+        try:
+            informe.insertadas += dao.create_lote([reserva])
+        except Exception as e:
+            validador.olvidar(provisional)
+            informe.rechazar(fila, f"Error de la base de datos: {e}", datos)
+
+
+def main(argv=None):
+    """
+    Punto de entrada de línea de comandos: python -m modelos.importacion fichero [--lote N] [--simular] [--rechazos f.csv]
+    Termina con código 2 si alguna fila se rechaza.
+    """
+    parser = argparse.ArgumentParser(description="Importa reservas desde un fichero CSV o JSON.")
+    parser.add_argument("fichero", help="Fichero .csv, .json, .jsonl o .ndjson.")
+    parser.add_argument("--lote", type=int, default=TAMANIO_LOTE_IMPORTACION, help="Reservas por transacción.")
+    parser.add_argument("--simular", action="store_true", help="Valida el fichero sin insertar nada.")
+    parser.add_argument("--rechazos", help="CSV donde guardar las filas rechazadas con su motivo.")
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    if args.lote < 1:
+        parser.error("El tamaño del lote debe ser al menos 1.")
+
+    informe = importar(args.fichero, args.lote, args.simular)
+    print(informe.resumen() + (" [simulación: no se ha insertado nada]" if args.simular else ""))
+    for fila, motivo, _ in informe.rechazadas[:20]:
+        print(f"  fila {fila}: {motivo}")
+    if len(informe.rechazadas) > 20:
+        print(f"  ... y {len(informe.rechazadas) - 20} más")
+    if args.rechazos and informe.rechazadas:
+        informe.guardar_rechazos(args.rechazos)
+        print(f"Filas rechazadas guardadas en {args.rechazos}")
+    return 2 if informe.rechazadas else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,238 @@
+import argparse
+import csv
+import datetime
+import sys
+
+from modelos.cache import clave_mes, informes_mes
+from modelos.datos import ReservasDAO, SalonesDAO, TiposCocinaDAO, TiposReservasDAO
+from modelos.ocupacion import sumar_meses
+
+TIPO_CONGRESO = "Congreso"  # Tipo de reserva cuyas habitaciones y jornadas se resumen aparte
+CABECERA = ("mes", "desglose", "nombre", "reservas", "ocupacion", "jornadas", "habitaciones")  # Columnas de filas_informe
+
+
+class Totales:
+    """
+    Suma de un grupo de reservas: cuántas son, sus asistentes, sus jornadas y cuántas piden habitaciones.
+    """
+    __slots__ = ("reservas", "ocupacion", "jornadas", "habitaciones")  # Sin __dict__ por instancia
+
+    def __init__(self):
+        """
+        Inicializa los totales a cero.
+        """
+        self.reservas = 0  # Número de reservas
+        self.ocupacion = 0  # Asistentes sumados
+        self.jornadas = 0  # Jornadas sumadas (solo las tienen los congresos)
+        self.habitaciones = 0  # Reservas que piden habitaciones (solo congresos)
+
+    def sumar(self, reservas, ocupacion, jornadas, habitaciones):
+        """
+        Acumula una fila agregada de ReservasDAO.get_totales_mes o los totales de otro grupo.
+        """
+        self.reservas += reservas
+        self.ocupacion += ocupacion
+        self.jornadas += jornadas
+        self.habitaciones += habitaciones
+
+    def como_tupla(self):
+        """
+        Devuelve los totales en el orden de sumar(), para acumularlos en otro grupo.
+        """
+        return self.reservas, self.ocupacion, self.jornadas, self.habitaciones
+
+    def __repr__(self):
+        return f"Totales(reservas={self.reservas}, ocupacion={self.ocupacion}, jornadas={self.jornadas}, habitaciones={self.habitaciones})"
+
+
+class InformeMes:
+    """
+    Informe de las reservas de un mes: el total y los desgloses por salón, por tipo de reserva y por tipo de cocina,
+    más las habitaciones y jornadas de los congresos. Se construye a partir de las pocas filas que devuelve la consulta
+    agregada, no de las reservas, y no se modifica después: la caché lo comparte entre hilos.
+    """
+    def __init__(self, mes, filas, congreso_id=None):
+        """
+        Suma las filas agregadas del mes en cada desglose.
+
+        Args:
+            mes (date): Día 1 del mes.
+            filas (list): Tuplas (salon_id, tipo_reserva_id, tipo_cocina_id, reservas, ocupación, jornadas, habitaciones).
+            congreso_id (int): ID del tipo de reserva Congreso (None si no existe).
+        """
+        self.mes = mes
+        self.total = Totales()
+        self.por_salon = {}  # salon_id -> Totales
+        self.por_tipo_reserva = {}  # tipo_reserva_id -> Totales
+        self.por_tipo_cocina = {}  # tipo_cocina_id -> Totales
+        for salon_id, tipo_reserva_id, tipo_cocina_id, *sumas in filas:
+            sumas = [int(valor or 0) for valor in sumas]  # MySQL devuelve SUM() como Decimal
+            self.total.sumar(*sumas)
+            for desglose, clave in ((self.por_salon, salon_id), (self.por_tipo_reserva, tipo_reserva_id), (self.por_tipo_cocina, tipo_cocina_id)):
+                grupo = desglose.get(clave)
+                if grupo is None:
+                    grupo = desglose[clave] = Totales()
+                grupo.sumar(*sumas)
+        self.congresos = self.por_tipo_reserva.get(congreso_id) or Totales()
+
+    def __repr__(self):
+        return f"InformeMes(mes='{self.mes:%Y-%m}', total={self.total})"
+
+
+def meses_entre(desde, hasta):
+    """
+    Devuelve el día 1 de cada mes que toca un rango de fechas.
+
+    Args:
+        desde (date): Primer día del rango.
+        hasta (date): Día siguiente al último del rango.
+
+    Returns:
+        list: Fechas de día 1, en orden.
+    """
+    meses = []
+    mes = desde.replace(day=1)
+    while mes < hasta:
+        meses.append(mes)
+        mes = sumar_meses(mes, 1)
+    return meses
+
+
+def informe_mensual(desde, hasta, dao_reservas=None, dao_tipos_reserva=None, cache=informes_mes):
+    """
+    Devuelve el informe de cada mes de un rango. Los meses con informe vigente en la caché se sirven de memoria;
+    los demás salen de una sola consulta agregada que abarca del primero al último que faltan, y se guardan.
+    Cada mes se calcula entero aunque el rango empiece o acabe a mitad de él.
+
+    Args:
+        desde (date): Primer día del rango.
+        hasta (date): Día siguiente al último del rango.
+        dao_reservas (ReservasDAO): DAO de reservas (por defecto uno sobre el pool del proceso).
+        dao_tipos_reserva (TiposReservasDAO): DAO de tipos de reserva (por defecto uno sobre el pool del proceso).
+        cache (CacheInformes): Caché de informes terminados (por defecto la del proceso).
+
+    Returns:
+        list: Objetos InformeMes, uno por mes y en orden.
+    """
+    meses = meses_entre(desde, hasta)
+    informes = {mes: cache.get(clave_mes(mes)) for mes in meses}
+    faltan = [mes for mes in meses if informes[mes] is None]
+    if faltan:
+        versiones = {mes: cache.version(clave_mes(mes)) for mes in faltan}  # Antes de consultar: ver CacheInformes.guardar
+        congreso = (dao_tipos_reserva or TiposReservasDAO()).get_por_nombre(TIPO_CONGRESO)
+        filas = {}  # mes AAAAMM -> filas agregadas
+        for mes, *fila in (dao_reservas or ReservasDAO()).get_totales_mes(faltan[0], sumar_meses(faltan[-1], 1)):
+            filas.setdefault(int(mes), []).append(fila)
+        for mes in faltan:
+            informe = InformeMes(mes, filas.get(clave_mes(mes), []), congreso.tipo_reserva_id if congreso else None)
+            cache.guardar(clave_mes(mes), versiones[mes], informe)
+            informes[mes] = informe
+    return [informes[mes] for mes in meses]
+
+
+def acumular(informes):
+    """
+    Suma varios informes mensuales en uno del periodo completo (p. ej. el año).
+
+    Args:
+        informes (list): Objetos InformeMes, en orden.
+
+    Returns:
+        InformeMes: Informe con el mes del primero y los totales de todos, o None si la lista está vacía.
+    """
+    if not informes:
+        return None
+    periodo = InformeMes(informes[0].mes, [])
+    for informe in informes:
+        periodo.total.sumar(*informe.total.como_tupla())
+        periodo.congresos.sumar(*informe.congresos.como_tupla())
+        for desglose, origen in ((periodo.por_salon, informe.por_salon), (periodo.por_tipo_reserva, informe.por_tipo_reserva),
+                                 (periodo.por_tipo_cocina, informe.por_tipo_cocina)):
+            for clave, totales in origen.items():
+                desglose.setdefault(clave, Totales()).sumar(*totales.como_tupla())
+    return periodo
+
+
+def filas_informe(informes, nombres):
+    """
+    Aplana informes mensuales en filas de tabla, para mostrarlos o exportarlos.
+
+    Args:
+        informes (list): Objetos InformeMes.
+        nombres (dict): Desglose ("salon", "tipo_reserva", "tipo_cocina") -> {ID: nombre}.
+
+    Yields:
+        tuple: (mes "AAAA-MM", desglose, nombre, reservas, ocupación, jornadas, habitaciones); el desglose "total"
+            resume el mes y "congresos", las habitaciones y jornadas de los congresos.
+    """
+    for informe in informes:
+        mes = informe.mes.strftime("%Y-%m")
+        yield (mes, "total", "", *informe.total.como_tupla())
+        for desglose, grupos in (("salon", informe.por_salon), ("tipo_reserva", informe.por_tipo_reserva), ("tipo_cocina", informe.por_tipo_cocina)):
+            mapa = nombres.get(desglose, {})
+            for clave in sorted(grupos):
+                yield (mes, desglose, mapa.get(clave, str(clave)), *grupos[clave].como_tupla())
+        yield (mes, "congresos", TIPO_CONGRESO, *informe.congresos.como_tupla())
+
+
+def nombres_catalogos():
+    """
+    Devuelve los nombres de salones, tipos de reserva y tipos de cocina en el formato que espera filas_informe.
+    Salen de las cachés de catálogos, sin consultar la base de datos si ya están cargadas.
+
+    Returns:
+        dict: Desglose -> {ID: nombre}.
+    """
+    return {
+        "salon": {salon.salon_id: salon.nombre for salon in SalonesDAO().get_all()},
+        "tipo_reserva": {tipo.tipo_reserva_id: tipo.nombre for tipo in TiposReservasDAO().get_all()},
+        "tipo_cocina": {tipo.tipo_cocina_id: tipo.nombre for tipo in TiposCocinaDAO().get_all()},
+    }
+
+
+def _mes(texto):
+    """
+    Convierte un argumento AAAA-MM en el día 1 de ese mes (tipo de argparse).
+    """
+    try:
+        return datetime.datetime.strptime(texto, "%Y-%m").date()
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"mes no válido: «{texto}» (se espera AAAA-MM)")
+
+
+def main(argv=None):
+    """
+    Punto de entrada de línea de comandos:
+    python -m modelos.informes [--desde AAAA-MM] [--hasta AAAA-MM] [--csv fichero] [--total]
+    """
+    parser = argparse.ArgumentParser(description="Informe mensual de reservas por salón, tipo de reserva y tipo de cocina.")
+    parser.add_argument("--desde", type=_mes, help="Primer mes incluido (por defecto, enero del año actual).")
+    parser.add_argument("--hasta", type=_mes, help="Último mes incluido (por defecto, once meses después de --desde).")
+    parser.add_argument("--csv", metavar="FICHERO", help="Escribe las filas en un CSV en lugar de mostrarlas.")
+    parser.add_argument("--total", action="store_true", help="Acumula todos los meses en un único informe del periodo.")
+    args = parser.parse_args(argv)
+
+    desde = args.desde or datetime.date.today().replace(month=1, day=1)
+    hasta = args.hasta or sumar_meses(desde, 11)
+    if hasta < desde:
+        parser.error("--hasta no puede ser anterior a --desde.")
+    informes = informe_mensual(desde, sumar_meses(hasta, 1))
+    if args.total:
+        informes = [acumular(informes)]
+    filas = filas_informe(informes, nombres_catalogos())
+
+    if args.csv:
+        with open(args.csv, "w", newline="", encoding="utf-8") as fichero:
+            escritor = csv.writer(fichero)
+            escritor.writerow(CABECERA)
+            escritor.writerows(filas)
+        print(f"Informe de {desde:%Y-%m} a {hasta:%Y-%m} escrito en {args.csv}")
+        return 0
+    print(f"{'mes':<8}{'desglose':<14}{'nombre':<24}{'reservas':>10}{'ocupacion':>11}{'jornadas':>10}{'habitaciones':>14}")
+    for mes, desglose, nombre, reservas, ocupacion, jornadas, habitaciones in filas:
+        print(f"{mes:<8}{desglose:<14}{nombre[:23]:<24}{reservas:>10}{ocupacion:>11}{jornadas:>10}{habitaciones:>14}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
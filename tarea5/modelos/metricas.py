@@ -0,0 +1,298 @@
+import contextvars
+import functools
+import json
+import logging
+import os
+import re
+import threading
+from contextlib import contextmanager
+
+logger = logging.getLogger(__name__)
+
+UMBRAL_LENTA_MS = float(os.environ.get("HOTEL_DB_UMBRAL_LENTA_MS", 200))  # Consultas más lentas se registran en el log
+METRICAS_FICHERO = os.environ.get("HOTEL_METRICAS_FICHERO")  # Si se indica, se vuelcan las métricas ahí al salir
+LIMITES_MS = (1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)  # Límites superiores de los cubos del histograma
+
+_accion_actual = contextvars.ContextVar("accion_actual", default=None)  # Acción de la interfaz que originó las consultas
+
+# Literales que se sustituyen por ? al normalizar una consulta
+_CADENAS = re.compile(r"'(?:[^'\\]|\\.)*'")
+_NUMEROS = re.compile(r"\b\d+(?:\.\d+)?\b")
+_MARCADORES = re.compile(r"%s|%\(\w+\)s")
+_LISTAS = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+_ESPACIOS = re.compile(r"\s+")
+
+
+@functools.lru_cache(maxsize=512)
+def huella(query):
+    """
+    Normaliza una consulta para agrupar sus ejecuciones: sin parámetros, literales ni espacios sobrantes.
+    Las consultas de los DAOs son textos fijos, así que el resultado se guarda en caché.
+
+    Args:
+        query (str): La consulta SQL.
+
+    Returns:
+        str: La consulta normalizada, por ejemplo "SELECT ... WHERE salon_id = ? AND fecha IN (?+)".
+    """
+    texto = _CADENAS.sub("?", query)
+    texto = _MARCADORES.sub("?", texto)
+    texto = _NUMEROS.sub("?", texto)
+    texto = _LISTAS.sub("(?+)", texto)
+    return _ESPACIOS.sub(" ", texto).strip()
+
+
+class _Histograma:
+    """
+    Histograma acumulado de latencias con cubos fijos (LIMITES_MS), al estilo de Prometheus.
+    """
+    __slots__ = ("cubos", "total", "suma_ms", "max_ms", "filas", "errores")
+
+    def __init__(self):
+        self.cubos = [0] * (len(LIMITES_MS) + 1)  # El último cubo es +Inf
+        self.total = 0
+        self.suma_ms = 0.0
+        self.max_ms = 0.0
+        self.filas = 0
+        self.errores = 0
+
+    def observar(self, ms, filas, error):
+        """
+        Añade una ejecución al histograma.
+        """
+        indice = 0
+        while indice < len(LIMITES_MS) and ms > LIMITES_MS[indice]:
+            indice += 1
+        self.cubos[indice] += 1
+        self.total += 1
+        self.suma_ms += ms
+        self.max_ms = max(self.max_ms, ms)
+        self.filas += filas
+        self.errores += error
+
+    def acumulados(self):
+        """
+        Devuelve los recuentos acumulados por límite (cada cubo incluye a los anteriores), con +Inf al final.
+        """
+        acumulado, resultado = 0, []
+        for cuenta in self.cubos:
+            acumulado += cuenta
+            resultado.append(acumulado)
+        return resultado
+
+
+class _Accion:
+    """
+    Una ejecución concreta de una acción de la interfaz (cambiar de salón, abrir el diálogo, confirmar...).
+    Se comparte con las tareas en segundo plano que lanza a través del contexto.
+    """
+    __slots__ = ("nombre", "consultas")
+
+    def __init__(self, nombre):
+        self.nombre = nombre
+        self.consultas = 0
+
+
+class MetricasConsultas:
+    """
+    Métricas de las consultas SQL del proceso: latencia por huella de consulta, filas devueltas,
+    consultas lentas y viajes a la base de datos por acción de la interfaz, más la latencia
+    por endpoint del servicio HTTP.
+    Los DAOs registran cada ejecución con registrar(); los controladores marcan sus acciones con accion().
+    """
+    def __init__(self, umbral_lenta_ms=UMBRAL_LENTA_MS):
+        """
+        Inicializa las métricas vacías.
+
+        Args:
+            umbral_lenta_ms (float): Duración a partir de la cual una consulta se registra como lenta.
+        """
+        self.umbral_lenta_ms = umbral_lenta_ms
+        self._lock = threading.Lock()
+        self._consultas = {}  # huella -> _Histograma
+        self._acciones = {}  # nombre -> {"veces", "consultas", "max_consultas"}
+        self._peticiones = {}  # endpoint del servicio HTTP -> _Histograma (errores = respuestas 5xx)
+        self.lentas = 0
+
+    @contextmanager
+    def accion(self, nombre):
+        """
+        Marca el bloque como una acción de la interfaz: las consultas que se hagan dentro, y en las tareas
+        en segundo plano lanzadas desde él, cuentan como viajes de esa acción.
+
+        Args:
+            nombre (str): Nombre de la acción, por ejemplo "cambio_salon".
+        """
+        with self._lock:
+            self._datos_accion(nombre)["veces"] += 1
+        token = _accion_actual.set(_Accion(nombre))
+        try:
+            yield
+        finally:
+            _accion_actual.reset(token)
+
+    def registrar(self, query, segundos, filas=0, error=False):
+        """
+        Registra una ejecución de una consulta.
+
+        Args:
+            query (str): La consulta SQL ejecutada.
+            segundos (float): Duración de la ejecución.
+            filas (int): Filas devueltas o afectadas.
+            error (bool): Si la ejecución terminó con una excepción.
+        """
+        clave = huella(query)
+        ms = segundos * 1000
+        accion = _accion_actual.get()
+        with self._lock:
+            histograma = self._consultas.get(clave)
+            if histograma is None:
+                histograma = self._consultas[clave] = _Histograma()
+            histograma.observar(ms, filas, error)
+            if accion is not None:
+                accion.consultas += 1
+                datos = self._datos_accion(accion.nombre)
+                datos["consultas"] += 1
+                datos["max_consultas"] = max(datos["max_consultas"], accion.consultas)
+            lenta = ms >= self.umbral_lenta_ms
+            if lenta:
+                self.lentas += 1
+        if lenta:
+            logger.warning(
+                "Consulta lenta (%.1f ms, %d filas, acción %s): %s",
+                ms, filas, accion.nombre if accion else "-", clave,
+            )
+
+    def registrar_peticion(self, endpoint, segundos, estado):
+        """
+        Registra una petición atendida por el servicio HTTP.
+
+        Args:
+            endpoint (str): Nombre del endpoint, por ejemplo "crear_reserva".
+            segundos (float): Duración total de la petición.
+            estado (int): Código de estado HTTP de la respuesta.
+        """
+        with self._lock:
+            histograma = self._peticiones.get(endpoint)
+            if histograma is None:
+                histograma = self._peticiones[endpoint] = _Histograma()
+            histograma.observar(segundos * 1000, 0, estado >= 500)
+
+    def _datos_accion(self, nombre):
+        """
+        Devuelve los contadores de una acción, creándolos si no existen (con el lock tomado).
+        """
+        return self._acciones.setdefault(nombre, {"veces": 0, "consultas": 0, "max_consultas": 0})
+
+    def instantanea(self):
+        """
+        Devuelve una copia de las métricas como diccionario serializable.
+
+        Returns:
+            dict: Consultas por huella (con su histograma) y acciones con sus viajes a la base de datos.
+        """
+        with self._lock:
+            consultas = {clave: _resumen(h) for clave, h in self._consultas.items()}
+            peticiones = {endpoint: _resumen(h) for endpoint, h in self._peticiones.items()}
+            acciones = {
+                nombre: {
+                    **datos,
+                    "consultas_por_vez": round(datos["consultas"] / datos["veces"], 2) if datos["veces"] else 0.0,
+                }
+                for nombre, datos in self._acciones.items()
+            }
+            return {
+                "umbral_lenta_ms": self.umbral_lenta_ms, "lentas": self.lentas,
+                "consultas": consultas, "acciones": acciones, "peticiones": peticiones,
+            }
+
+    def a_json(self):
+        """
+        Devuelve las métricas como texto JSON.
+        """
+        return json.dumps(self.instantanea(), indent=2, ensure_ascii=False)
+
+    def a_prometheus(self):
+        """
+        Devuelve las métricas en el formato de texto de Prometheus (duraciones en segundos).
+        """
+        datos = self.instantanea()
+        lineas = [
+            "# HELP hotel_db_consulta_segundos Duración de las consultas SQL por huella.",
+            "# TYPE hotel_db_consulta_segundos histogram",
+        ]
+        for clave, c in datos["consultas"].items():
+            etiqueta = f'consulta="{_escapar(clave)}"'
+            for limite, cuenta in c["histograma_ms"].items():
+                le = "+Inf" if limite == "+Inf" else repr(float(limite) / 1000)
+                lineas.append(f'hotel_db_consulta_segundos_bucket{{{etiqueta},le="{le}"}} {cuenta}')
+            lineas.append(f"hotel_db_consulta_segundos_sum{{{etiqueta}}} {c['suma_ms'] / 1000:.6f}")
+            lineas.append(f"hotel_db_consulta_segundos_count{{{etiqueta}}} {c['total']}")
+        lineas += ["# HELP hotel_db_consulta_filas_total Filas devueltas o afectadas por huella.", "# TYPE hotel_db_consulta_filas_total counter"]
+        lineas += [f'hotel_db_consulta_filas_total{{consulta="{_escapar(k)}"}} {c["filas"]}' for k, c in datos["consultas"].items()]
+        lineas += ["# HELP hotel_db_consulta_errores_total Ejecuciones fallidas por huella.", "# TYPE hotel_db_consulta_errores_total counter"]
+        lineas += [f'hotel_db_consulta_errores_total{{consulta="{_escapar(k)}"}} {c["errores"]}' for k, c in datos["consultas"].items()]
+        lineas += ["# HELP hotel_db_consultas_lentas_total Consultas por encima del umbral.", "# TYPE hotel_db_consultas_lentas_total counter"]
+        lineas.append(f"hotel_db_consultas_lentas_total {datos['lentas']}")
+        lineas += ["# HELP hotel_ui_acciones_total Veces que se ha ejecutado cada acción de la interfaz.", "# TYPE hotel_ui_acciones_total counter"]
+        lineas += [f'hotel_ui_acciones_total{{accion="{_escapar(n)}"}} {a["veces"]}' for n, a in datos["acciones"].items()]
+        lineas += ["# HELP hotel_ui_accion_consultas_total Viajes a la base de datos por acción de la interfaz.", "# TYPE hotel_ui_accion_consultas_total counter"]
+        lineas += [f'hotel_ui_accion_consultas_total{{accion="{_escapar(n)}"}} {a["consultas"]}' for n, a in datos["acciones"].items()]
+        if datos["peticiones"]:
+            lineas += ["# HELP hotel_api_peticion_segundos Duración de las peticiones del servicio HTTP por endpoint.", "# TYPE hotel_api_peticion_segundos histogram"]
+            for endpoint, p in datos["peticiones"].items():
+                etiqueta = f'endpoint="{_escapar(endpoint)}"'
+                for limite, cuenta in p["histograma_ms"].items():
+                    le = "+Inf" if limite == "+Inf" else repr(float(limite) / 1000)
+                    lineas.append(f'hotel_api_peticion_segundos_bucket{{{etiqueta},le="{le}"}} {cuenta}')
+                lineas.append(f"hotel_api_peticion_segundos_sum{{{etiqueta}}} {p['suma_ms'] / 1000:.6f}")
+                lineas.append(f"hotel_api_peticion_segundos_count{{{etiqueta}}} {p['total']}")
+            lineas += ["# HELP hotel_api_peticion_errores_total Peticiones respondidas con un error 5xx por endpoint.", "# TYPE hotel_api_peticion_errores_total counter"]
+            lineas += [f'hotel_api_peticion_errores_total{{endpoint="{_escapar(e)}"}} {p["errores"]}' for e, p in datos["peticiones"].items()]
+        return "\n".join(lineas) + "\n"
+
+    def guardar(self, ruta):
+        """
+        Vuelca las métricas en un fichero: en formato Prometheus si acaba en .prom o .txt y en JSON en otro caso.
+
+        Args:
+            ruta (str): Fichero de salida.
+        """
+        texto = self.a_prometheus() if ruta.endswith((".prom", ".txt")) else self.a_json()
+        with open(ruta, "w", encoding="utf-8") as fichero:
+            fichero.write(texto)
+
+    def reiniciar(self):
+        """
+        Vacía las métricas acumuladas.
+        """
+        with self._lock:
+            self._consultas.clear()
+            self._acciones.clear()
+            self._peticiones.clear()
+            self.lentas = 0
+
+
+def _resumen(histograma):
+    """
+    Devuelve un histograma como diccionario serializable.
+    """
+    return {
+        "total": histograma.total,
+        "errores": histograma.errores,
+        "filas": histograma.filas,
+        "suma_ms": round(histograma.suma_ms, 3),
+        "media_ms": round(histograma.suma_ms / histograma.total, 3) if histograma.total else 0.0,
+        "max_ms": round(histograma.max_ms, 3),
+        "histograma_ms": dict(zip([str(l) for l in LIMITES_MS] + ["+Inf"], histograma.acumulados())),
+    }
+
+
+def _escapar(valor):
+    """
+    Escapa un valor de etiqueta para el formato de texto de Prometheus.
+    """
+    return valor.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+metricas = MetricasConsultas()  # Métricas compartidas por todo el proceso
@@ -0,0 +1,558 @@
+import argparse
+import logging
+import sys
+
+from modelos.conexion import get_pool
+from modelos.datos import ReservasDAO
+
+logger = logging.getLogger(__name__)
+
+
+class PlanConsultaError(Exception):
+    """
+    Se lanza cuando alguna consulta de los DAOs recorre la tabla completa por no tener un índice aplicable.
+    """
+
+
+class Migracion:
+    """
+    Cambio versionado del esquema de la base de datos.
+    Cada paso puede ser:
+        - una sentencia SQL escrita para MySQL, que el backend adapta a su motor (p. ej. AUTO_INCREMENT en SQLite);
+        - un diccionario {nombre del motor: sentencia} cuando el SQL de cada motor es distinto;
+        - una función f(cursor, backend), para los cambios que deben comprobar antes el estado del esquema
+          (MySQL no admite CREATE INDEX IF NOT EXISTS).
+    """
+    def __init__(self, version, descripcion, pasos):
+        """
+        Inicializa la migración.
+
+        Args:
+            version (int): Número de versión; las migraciones se aplican en orden creciente.
+            descripcion (str): Descripción del cambio, que se guarda al aplicarlo.
+            pasos (list): Sentencias SQL, diccionarios por motor o funciones f(cursor, backend).
+        """
+        self.version = version
+        self.descripcion = descripcion
+        self.pasos = pasos
+
+    def aplicar(self, cursor, backend):
+        """
+        Ejecuta todos los pasos de la migración.
+
+        Args:
+            cursor: Cursor abierto sobre la base de datos.
+            backend (Backend): Motor de la base de datos.
+        """
+        for paso in self.pasos:
+            if callable(paso):
+                paso(cursor, backend)
+            elif isinstance(paso, dict):
+                if backend.nombre in paso:
+                    cursor.execute(paso[backend.nombre])
+            else:
+                cursor.execute(backend.adaptar_ddl(paso))
+
+
+def _indice_existe(cursor, backend, tabla, columnas, unico=False):
+    """
+    Comprueba si la tabla ya tiene un índice con exactamente esas columnas, sea cual sea su nombre.
+    """
+    return any(
+        existentes == tuple(columnas) and (not unico or es_unico)
+        for _, existentes, es_unico in backend.indices(cursor, tabla)
+    )
+
+
+def crear_indice(nombre, tabla, columnas, unico=False):
+    """
+    Devuelve un paso de migración que crea un índice solo si no existe ya uno equivalente.
+
+    Args:
+        nombre (str): Nombre del índice.
+        tabla (str): Tabla a indexar.
+        columnas (tuple): Columnas del índice, en orden.
+        unico (bool): Si es True, crea un índice UNIQUE.
+
+    Returns:
+        callable: Paso f(cursor, backend) para una Migracion.
+    """
+    def paso(cursor, backend):
+        if _indice_existe(cursor, backend, tabla, columnas, unico):
+            logger.info("El índice %s sobre %s%s ya existe.", nombre, tabla, columnas)
+            return
+        tipo = "UNIQUE INDEX" if unico else "INDEX"
+        cursor.execute(f"CREATE {tipo} {nombre} ON {tabla} ({', '.join(columnas)})")
+    return paso
+
+
+def poblar_catalogo(tabla, nombres):
+    """
+    Devuelve un paso de migración que inserta los nombres indicados en una tabla de catálogo si está vacía.
+
+    Args:
+        tabla (str): Tabla de catálogo con una columna nombre.
+        nombres (list): Nombres a insertar, en orden (el primero recibe el ID 1).
+
+    Returns:
+        callable: Paso f(cursor, backend) para una Migracion.
+    """
+    def paso(cursor, backend):
+        cursor.execute(f"SELECT COUNT(*) FROM {tabla}")
+        if cursor.fetchone()[0]:
+            return
+        cursor.executemany(backend.traducir(f"INSERT INTO {tabla} (nombre) VALUES (%s)"), [(nombre,) for nombre in nombres])
+    return paso
+
+
+def agregar_columna(tabla, columna, definicion):
+    """
+    Devuelve un paso de migración que añade una columna solo si la tabla aún no la tiene
+    (en MySQL el DDL no es transaccional y una migración a medias puede haberla creado ya).
+
+    Args:
+        tabla (str): Tabla a modificar.
+        columna (str): Nombre de la columna.
+        definicion (str): Tipo y restricciones de la columna, por ejemplo "INT NOT NULL DEFAULT 0".
+
+    Returns:
+        callable: Paso f(cursor, backend) para una Migracion.
+    """
+    def paso(cursor, backend):
+        cursor.execute(f"SELECT * FROM {tabla} LIMIT 0")
+        existentes = {descripcion[0].lower() for descripcion in cursor.description}
+        cursor.fetchall()
+        if columna.lower() in existentes:
+            logger.info("La columna %s.%s ya existe.", tabla, columna)
+            return
+        cursor.execute(f"ALTER TABLE {tabla} ADD COLUMN {columna} {definicion}")
+    return paso
+
+
+def crear_indice_texto(nombre, tabla, columna):
+    """
+    Devuelve un paso de migración que crea en MySQL un índice FULLTEXT con el analizador ngram, que encuentra
+    partes de palabras y no solo palabras completas. En SQLite no hace nada.
+
+    Args:
+        nombre (str): Nombre del índice.
+        tabla (str): Tabla a indexar.
+        columna (str): Columna de texto.
+
+    Returns:
+        callable: Paso f(cursor, backend) para una Migracion.
+    """
+    def paso(cursor, backend):
+        if backend.nombre != "mysql":
+            return
+        # Se busca por nombre: un índice normal sobre la misma columna no lo sustituye
+        if any(existente == nombre for existente, _, _ in backend.indices(cursor, tabla)):
+            logger.info("El índice %s sobre %s ya existe.", nombre, tabla)
+            return
+        cursor.execute(f"CREATE FULLTEXT INDEX {nombre} ON {tabla} ({columna}) WITH PARSER ngram")
+    return paso
+
+
+def poblar_numeros(total):
+    """
+    Devuelve un paso de migración que llena la tabla auxiliar numeros con 0..total-1 si está vacía.
+
+    Args:
+        total (int): Cantidad de números.
+
+    Returns:
+        callable: Paso f(cursor, backend) para una Migracion.
+    """
+    def paso(cursor, backend):
+        cursor.execute("SELECT COUNT(*) FROM numeros")
+        if cursor.fetchone()[0]:
+            return
+        cursor.executemany(backend.traducir("INSERT INTO numeros (n) VALUES (%s)"), [(n,) for n in range(total)])
+    return paso
+
+
+def trigger_dias(nombre, momento, evento, cuerpo_mysql, cuerpo_sqlite):
+    """
+    Devuelve un paso de migración que crea un trigger sobre reservas con un cuerpo distinto por motor.
+
+    Args:
+        nombre (str): Nombre del trigger.
+        momento (str): BEFORE o AFTER.
+        evento (str): INSERT, UPDATE o DELETE.
+        cuerpo_mysql (str): Sentencia del trigger en MySQL.
+        cuerpo_sqlite (str): Sentencia del trigger en SQLite.
+
+    Returns:
+        dict: Paso {nombre del motor: sentencia} para una Migracion.
+    """
+    return {
+        "mysql": f"CREATE TRIGGER {nombre} {momento} {evento} ON reservas FOR EACH ROW {cuerpo_mysql}",
+        "sqlite": f"CREATE TRIGGER IF NOT EXISTS {nombre} {momento} {evento} ON reservas BEGIN {cuerpo_sqlite}; END",
+    }
+
+
+# Dígitos del teléfono sin los separadores habituales, igual en MySQL y SQLite (busqueda.digitos quita en Python cualquier no dígito)
+_DIGITOS_TELEFONO = "REPLACE(REPLACE(REPLACE(REPLACE(REPLACE(REPLACE(REPLACE(telefono, ' ', ''), '-', ''), '.', ''), '(', ''), ')', ''), '+', ''), '/', '')"
+
+# Días que ocupa cada reserva, para los triggers de reservas_dias (hasta MAX_JORNADAS jornadas, el máximo del formulario)
+MAX_JORNADAS = 1000
+_DIAS_MYSQL = (
+    "INSERT INTO reservas_dias (salon_id, dia, reserva_id) "
+    "SELECT {f}.salon_id, DATE_ADD({f}.fecha, INTERVAL n DAY), {f}.reserva_id FROM numeros WHERE n < GREATEST({f}.jornadas, 1)"
+)
+_DIAS_SQLITE = (
+    "INSERT INTO reservas_dias (salon_id, dia, reserva_id) "
+    "SELECT {f}.salon_id, date({f}.fecha, '+' || n || ' days'), {f}.reserva_id FROM numeros WHERE n < max({f}.jornadas, 1)"
+)
+
+
+def trigger_cambios(nombre, evento, fila, salon_anterior="NULL", fecha_anterior=None):
+    """
+    Devuelve un paso de migración que crea un trigger sobre reservas que anota cada cambio en la tabla cambios.
+    La sintaxis del cuerpo del trigger es distinta en cada motor.
+
+    Args:
+        nombre (str): Nombre del trigger.
+        evento (str): INSERT, UPDATE o DELETE.
+        fila (str): NEW u OLD, la fila de la que se toman el ID y el salón.
+        salon_anterior (str): Expresión con el salón anterior (en un UPDATE, OLD.salon_id).
+        fecha_anterior (str): Expresión con la fecha anterior (OLD.fecha); None en los triggers creados
+            antes de la migración 9, cuando la tabla cambios aún no tenía esa columna.
+
+    Returns:
+        dict: Paso {nombre del motor: sentencia} para una Migracion.
+    """
+    columnas, valores = "", ""
+    if fecha_anterior is not None:
+        columnas, valores = ", fecha_anterior", f", {fecha_anterior}"
+    insercion = (
+        f"INSERT INTO cambios (tabla, operacion, registro_id, salon_id, salon_anterior{columnas}) "
+        f"VALUES ('reservas', '{evento[0]}', {fila}.reserva_id, {fila}.salon_id, {salon_anterior}{valores})"
+    )
+    return {
+        "mysql": f"CREATE TRIGGER {nombre} AFTER {evento} ON reservas FOR EACH ROW {insercion}",
+        "sqlite": f"CREATE TRIGGER IF NOT EXISTS {nombre} AFTER {evento} ON reservas BEGIN {insercion}; END",
+    }
+
+
+# Migraciones del esquema, en orden. Nunca se modifica una ya publicada: los cambios van en una versión nueva.
+MIGRACIONES = [
+    Migracion(1, "Esquema base de catálogos y reservas", [
+        """
+        CREATE TABLE IF NOT EXISTS tipos_reservas (
+            tipo_reserva_id INT AUTO_INCREMENT PRIMARY KEY,
+            nombre VARCHAR(255) NOT NULL
+        )
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS tipos_cocina (
+            tipo_cocina_id INT AUTO_INCREMENT PRIMARY KEY,
+            nombre VARCHAR(255) NOT NULL
+        )
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS salones (
+            salon_id INT AUTO_INCREMENT PRIMARY KEY,
+            nombre VARCHAR(255) NOT NULL
+        )
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS reservas (
+            reserva_id INT AUTO_INCREMENT PRIMARY KEY,
+            tipo_reserva_id INT NOT NULL,
+            salon_id INT NOT NULL,
+            tipo_cocina_id INT NOT NULL,
+            persona VARCHAR(255) NOT NULL,
+            telefono VARCHAR(20) NOT NULL,
+            fecha DATE NOT NULL,
+            ocupacion INT NOT NULL,
+            jornadas INT NOT NULL,
+            habitaciones INT NOT NULL DEFAULT 0,
+            FOREIGN KEY (salon_id) REFERENCES salones(salon_id),
+            FOREIGN KEY (tipo_cocina_id) REFERENCES tipos_cocina(tipo_cocina_id),
+            FOREIGN KEY (tipo_reserva_id) REFERENCES tipos_reservas(tipo_reserva_id)
+        )
+        """,
+    ]),
+    # Consultas por rango de fechas de todos los salones (informes, exportación) y fecha + salón
+    Migracion(2, "Índice de reservas por (fecha, salon_id)", [
+        crear_indice("idx_reservas_fecha_salon", "reservas", ("fecha", "salon_id")),
+    ]),
+    # Además de impedir dos reservas en el mismo salón y día, sirve de índice compuesto para las consultas
+    # por salon_id, por salon_id + fecha y para la paginación por (fecha, reserva_id) dentro de un salón
+    Migracion(3, "Una reserva por salón y día: UNIQUE (salon_id, fecha)", [
+        crear_indice("uq_reservas_salon_fecha", "reservas", ("salon_id", "fecha"), unico=True),
+    ]),
+    # Una base de datos nueva (p. ej. SQLite en una sucursal) no pasa por database.sql: sin salones ni tipos
+    # la aplicación no puede crear reservas. En las que ya tienen datos este paso no hace nada.
+    Migracion(4, "Catálogos iniciales si están vacíos", [
+        poblar_catalogo("tipos_reservas", ["Banquete", "Jornada", "Congreso"]),
+        poblar_catalogo("tipos_cocina", ["Bufé", "Carta", "Pedir cita con el chef", "No precisa"]),
+        poblar_catalogo("salones", ["Salón Habana", "Otro Salón"]),
+    ]),
+    # Registro de cambios que leen los demás puestos para actualizarse sin recargar (modelos.cambios).
+    # Lo rellenan triggers, así que recoge también las importaciones masivas y los cambios hechos fuera de la aplicación.
+    Migracion(5, "Registro de cambios de reservas: tabla cambios y triggers", [
+        """
+        CREATE TABLE IF NOT EXISTS cambios (
+            cambio_id INT AUTO_INCREMENT PRIMARY KEY,
+            tabla VARCHAR(30) NOT NULL,
+            operacion CHAR(1) NOT NULL,
+            registro_id INT NOT NULL,
+            salon_id INT NULL,
+            salon_anterior INT NULL,
+            creado TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+        )
+        """,
+        trigger_cambios("trg_reservas_alta", "INSERT", "NEW"),
+        trigger_cambios("trg_reservas_modificacion", "UPDATE", "NEW", "OLD.salon_id"),
+        trigger_cambios("trg_reservas_baja", "DELETE", "OLD"),
+    ]),
+    # Control de concurrencia: la versión de cada fila permite actualizar solo si nadie la ha cambiado desde que
+    # se leyó, y reservas_dias, con un día por fila y clave (salon_id, dia), hace que la propia base de datos rechace
+    # en la misma sentencia cualquier alta o modificación que pise un día ya ocupado, también en reservas de varias jornadas.
+    # Si los datos existentes ya se solapaban, se conserva el primer día registrado y el resto se ignora.
+    Migracion(6, "Concurrencia optimista: versión de fila y días ocupados con clave única", [
+        agregar_columna("reservas", "version", "INT NOT NULL DEFAULT 0"),
+        "CREATE TABLE IF NOT EXISTS numeros (n INT PRIMARY KEY)",
+        poblar_numeros(MAX_JORNADAS),
+        """
+        CREATE TABLE IF NOT EXISTS reservas_dias (
+            salon_id INT NOT NULL,
+            dia DATE NOT NULL,
+            reserva_id INT NOT NULL,
+            PRIMARY KEY (salon_id, dia),
+            FOREIGN KEY (reserva_id) REFERENCES reservas(reserva_id) ON DELETE CASCADE
+        )
+        """,
+        crear_indice("idx_reservas_dias_reserva", "reservas_dias", ("reserva_id",)),
+        {
+            "mysql": "INSERT IGNORE INTO reservas_dias (salon_id, dia, reserva_id) "
+                     "SELECT r.salon_id, DATE_ADD(r.fecha, INTERVAL n.n DAY), r.reserva_id "
+                     "FROM reservas r JOIN numeros n ON n.n < GREATEST(r.jornadas, 1) ORDER BY r.reserva_id",
+            "sqlite": "INSERT OR IGNORE INTO reservas_dias (salon_id, dia, reserva_id) "
+                      "SELECT r.salon_id, date(r.fecha, '+' || n.n || ' days'), r.reserva_id "
+                      "FROM reservas r JOIN numeros n ON n.n < max(r.jornadas, 1) ORDER BY r.reserva_id",
+        },
+        trigger_dias("trg_reservas_dias_alta", "AFTER", "INSERT", _DIAS_MYSQL.format(f="NEW"), _DIAS_SQLITE.format(f="NEW")),
+        # Al modificar, se liberan antes los días anteriores y después se ocupan los nuevos
+        trigger_dias(
+            "trg_reservas_dias_libera", "BEFORE", "UPDATE",
+            "DELETE FROM reservas_dias WHERE reserva_id = OLD.reserva_id",
+            "DELETE FROM reservas_dias WHERE reserva_id = OLD.reserva_id",
+        ),
+        trigger_dias("trg_reservas_dias_ocupa", "AFTER", "UPDATE", _DIAS_MYSQL.format(f="NEW"), _DIAS_SQLITE.format(f="NEW")),
+    ]),
+    # El mapa de ocupación agrupa reservas_dias de todos los salones por rango de días: la clave (salon_id, dia)
+    # no sirve para filtrar solo por día, y con reserva_id en el índice el JOIN no necesita leer la tabla
+    Migracion(7, "Índice de días ocupados por fecha para el mapa de ocupación", [
+        crear_indice("idx_reservas_dias_dia", "reservas_dias", ("dia", "salon_id", "reserva_id")),
+    ]),
+    # Búsqueda de huéspedes en la base de datos, para cuando el índice en memoria aún no está cargado y para
+    # procesos que no lo construyen: los dígitos del teléfono en una columna generada con índice (un prefijo es
+    # un rango del índice) y, en MySQL, un índice FULLTEXT con el analizador ngram para buscar partes del nombre
+    Migracion(8, "Índices para buscar huéspedes por nombre y teléfono", [
+        agregar_columna("reservas", "telefono_digitos", f"VARCHAR(20) GENERATED ALWAYS AS ({_DIGITOS_TELEFONO}) VIRTUAL"),
+        crear_indice("idx_reservas_telefono_digitos", "reservas", ("telefono_digitos",)),
+        crear_indice_texto("ft_reservas_persona", "reservas", "persona"),
+    ]),
+    # Informes mensuales (modelos.informes): la agregación por mes, salón y tipos se resuelve leyendo solo un índice
+    # que cubre todas las columnas que usa. Para invalidar el informe del mes del que sale una reserva al cambiar
+    # de fecha o al borrarse, el registro de cambios guarda la fecha anterior; los triggers se recrean con ella
+    Migracion(9, "Informes mensuales: índice que cubre la agregación y fecha anterior en el registro de cambios", [
+        crear_indice(
+            "idx_reservas_informe", "reservas",
+            ("fecha", "salon_id", "tipo_reserva_id", "tipo_cocina_id", "ocupacion", "jornadas", "habitaciones"),
+        ),
+        agregar_columna("cambios", "fecha_anterior", "DATE NULL"),
+        "DROP TRIGGER IF EXISTS trg_reservas_modificacion",
+        trigger_cambios("trg_reservas_modificacion", "UPDATE", "NEW", "OLD.salon_id", "OLD.fecha"),
+        "DROP TRIGGER IF EXISTS trg_reservas_baja",
+        trigger_cambios("trg_reservas_baja", "DELETE", "OLD", fecha_anterior="OLD.fecha"),
+    ]),
+]
+
+
+# Consultas calientes de los DAOs que deben resolverse con índice: (nombre, SQL, parámetros de ejemplo)
+CONSULTAS_CRITICAS = [
+    ("ReservasDAO.get", f"SELECT {ReservasDAO.COLUMNAS} FROM reservas WHERE reserva_id = %s", (1,)),
+    ("ReservasDAO.get_by_salon_id", f"SELECT {ReservasDAO.COLUMNAS} FROM reservas WHERE salon_id = %s ORDER BY fecha", (1,)),
+    ("ReservasDAO.get_ocupaciones", "SELECT reserva_id, fecha, jornadas FROM reservas WHERE salon_id = %s", (1,)),
+    (
+        "ReservasDAO.get_rango",
+        f"SELECT {ReservasDAO.COLUMNAS} FROM reservas WHERE salon_id = %s AND fecha >= %s "
+        "AND (fecha > %s OR (fecha = %s AND reserva_id > %s)) ORDER BY fecha, reserva_id LIMIT %s",
+        (1, "2025-01-01", "2025-01-01", "2025-01-01", 0, 100),
+    ),
+    (
+        "ReservasDAO.get_anteriores",
+        f"SELECT {ReservasDAO.COLUMNAS} FROM reservas WHERE salon_id = %s AND (fecha < %s OR (fecha = %s AND reserva_id < %s)) "
+        "ORDER BY fecha DESC, reserva_id DESC LIMIT %s",
+        (1, "2025-01-01", "2025-01-01", 0, 100),
+    ),
+    (
+        "Comprobación de fecha ocupada",
+        "SELECT reserva_id FROM reservas WHERE fecha = %s AND salon_id = %s AND reserva_id != %s",
+        ("2025-01-01", 1, 0),
+    ),
+    (
+        "CambiosDAO.get_desde",
+        "SELECT cambio_id, tabla, operacion, registro_id, salon_id, salon_anterior, fecha_anterior FROM cambios "
+        "WHERE cambio_id > %s ORDER BY cambio_id LIMIT %s",
+        (0, 500),
+    ),
+    (
+        "ReservasDAO.get_ocupacion_hotel",
+        "SELECT d.salon_id, d.dia, MAX(r.reserva_id), MAX(r.tipo_reserva_id), SUM(r.ocupacion) "
+        "FROM reservas_dias d JOIN reservas r ON r.reserva_id = d.reserva_id "
+        "WHERE d.dia >= %s AND d.dia < %s GROUP BY d.salon_id, d.dia",
+        ("2025-01-01", "2026-01-01"),
+    ),
+    (
+        "Reservas de todos los salones en un rango",
+        f"SELECT {ReservasDAO.COLUMNAS} FROM reservas WHERE fecha >= %s AND fecha < %s ORDER BY fecha, reserva_id",
+        ("2025-01-01", "2025-02-01"),
+    ),
+]
+
+
+def _crear_tabla_versiones(cursor):
+    """
+    Crea, si no existe, la tabla donde se registran las versiones aplicadas.
+    """
+    cursor.execute(
+        """
+        CREATE TABLE IF NOT EXISTS schema_migraciones (
+            version INT PRIMARY KEY,
+            descripcion VARCHAR(255) NOT NULL,
+            aplicada_en TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+        )
+        """
+    )
+
+
+def versiones_aplicadas(pool=None):
+    """
+    Devuelve las versiones del esquema ya aplicadas.
+
+    Args:
+        pool (PoolConexiones): Pool del que tomar la conexión (por defecto el del proceso).
+
+    Returns:
+        set: Números de versión aplicados.
+    """
+    pool = pool or get_pool()
+    with pool.conexion() as conn:
+        cursor = pool.backend.cursor(conn)
+        try:
+            _crear_tabla_versiones(cursor)
+            cursor.execute("SELECT version FROM schema_migraciones")
+            return {fila[0] for fila in cursor.fetchall()}
+        finally:
+            cursor.close()
+
+
+def migrar(pool=None, hasta=None):
+    """
+    Aplica en orden las migraciones pendientes y registra cada versión aplicada.
+    Un cerrojo del backend evita que dos puestos migren a la vez la misma base de datos
+    (GET_LOCK en MySQL; en SQLite, una transacción BEGIN IMMEDIATE que además deshace todo si algo falla).
+
+    Args:
+        pool (PoolConexiones): Pool del que tomar la conexión (por defecto el del proceso).
+        hasta (int): Última versión a aplicar (por defecto todas).
+
+    Returns:
+        list: Versiones aplicadas en esta llamada.
+    """
+    aplicadas = []
+    pool = pool or get_pool()
+    backend = pool.backend
+    with pool.conexion() as conn:
+        cursor = backend.cursor(conn)
+        try:
+            with backend.bloqueo_migraciones(cursor):
+                _crear_tabla_versiones(cursor)
+                cursor.execute("SELECT version FROM schema_migraciones")
+                hechas = {fila[0] for fila in cursor.fetchall()}
+                for migracion in MIGRACIONES:
+                    if migracion.version in hechas or (hasta is not None and migracion.version > hasta):
+                        continue
+                    logger.info("Aplicando migración %s: %s", migracion.version, migracion.descripcion)
+                    migracion.aplicar(cursor, backend)
+                    cursor.execute(
+                        backend.traducir("INSERT INTO schema_migraciones (version, descripcion) VALUES (%s, %s)"),
+                        (migracion.version, migracion.descripcion),
+                    )
+                    aplicadas.append(migracion.version)
+        finally:
+            cursor.close()
+    return aplicadas
+
+
+def comprobar_planes(pool=None, consultas=CONSULTAS_CRITICAS):
+    """
+    Obtiene el plan de las consultas críticas (EXPLAIN en MySQL, EXPLAIN QUERY PLAN en SQLite) y falla
+    si alguna recorre una tabla completa sin ningún índice aplicable. En MySQL, con pocas filas el optimizador
+    puede preferir un recorrido completo aunque exista índice; eso no se considera fallo, solo la ausencia de índice posible.
+
+    Args:
+        pool (PoolConexiones): Pool del que tomar la conexión (por defecto el del proceso).
+        consultas (list): Tuplas (nombre, SQL, parámetros) a comprobar.
+
+    Returns:
+        dict: Nombre de la consulta -> filas del EXPLAIN.
+
+    Raises:
+        PlanConsultaError: Si alguna consulta no puede usar ningún índice.
+    """
+    planes = {}
+    fallos = []
+    pool = pool or get_pool()
+    with pool.conexion() as conn:
+        cursor = pool.backend.cursor(conn)
+        try:
+            for nombre, query, params in consultas:
+                planes[nombre], sin_indice = pool.backend.explicar(cursor, query, params)
+                fallos += [f"{nombre}: recorrido completo de {tabla}" for tabla in sin_indice]
+        finally:
+            cursor.close()
+    if fallos:
+        raise PlanConsultaError("Consultas sin índice aplicable:\n" + "\n".join(fallos))
+    return planes
+
+
+def main(argv=None):
+    """
+    Punto de entrada de línea de comandos: python -m modelos.migraciones [--hasta N] [--comprobar] [--estado]
+    """
+    parser = argparse.ArgumentParser(description="Aplica las migraciones del esquema de la base de datos.")
+    parser.add_argument("--hasta", type=int, help="Última versión a aplicar.")
+    parser.add_argument("--estado", action="store_true", help="Muestra las versiones aplicadas y pendientes sin migrar.")
+    parser.add_argument("--comprobar", action="store_true", help="Comprueba con EXPLAIN que las consultas críticas usan índices.")
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    print(f"Base de datos: {get_pool().backend.describir()}")
+
+    if args.estado:
+        hechas = versiones_aplicadas()
+        for migracion in MIGRACIONES:
+            marca = "aplicada " if migracion.version in hechas else "pendiente"
+            print(f"{migracion.version:>3}  {marca}  {migracion.descripcion}")
+        return 0
+
+    aplicadas = migrar(hasta=args.hasta)
+    print(f"Migraciones aplicadas: {aplicadas or 'ninguna'}")
+
+    if args.comprobar:
+        try:
+            comprobar_planes()
+        except PlanConsultaError as e:
+            print(e, file=sys.stderr)
+            return 1
+        print("Todas las consultas críticas usan índices.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -3,6 +3,8 @@ class TipoCocinaModel:
     Representa el modelo de un tipo de cocina.
     Contiene los atributos que definen un tipo de cocina.
     """
+    __slots__ = ("tipo_cocina_id", "nombre")  # Sin __dict__ por instancia
+
     def __init__(self, tipo_cocina_id, nombre):
         """
         Inicializa el objeto TipoCocinaModel con los atributos proporcionados.
@@ -14,6 +16,19 @@ class TipoCocinaModel:
         self.tipo_cocina_id = tipo_cocina_id  # ID único del tipo de cocina
         self.nombre = nombre  # Nombre del tipo de cocina
 
+    @classmethod
+    def desde_fila(cls, fila):
+        """
+        Crea el objeto a partir de una fila de la base de datos con las columnas (tipo_cocina_id, nombre), por posición.
+
+        Args:
+            fila (tuple): La fila devuelta por el cursor.
+
+        Returns:
+            TipoCocinaModel: El objeto creado.
+        """
+        return cls(*fila)
+
     def __repr__(self):
         """
         Representación en forma de cadena del objeto TipoCocinaModel para facilitar su visualización.
@@ -29,6 +44,8 @@ class SalonModel:
     Representa el modelo de un salón.
     Contiene los atributos que definen un salón en el contexto de las reservas.
     """
+    __slots__ = ("salon_id", "nombre")  # Sin __dict__ por instancia
+
     def __init__(self, salon_id, nombre):
         """
         Inicializa el objeto SalonModel con los atributos proporcionados.
@@ -40,6 +57,19 @@ class SalonModel:
         self.salon_id = salon_id  # ID único del salón
         self.nombre = nombre  # Nombre del salón
 
+    @classmethod
+    def desde_fila(cls, fila):
+        """
+        Crea el objeto a partir de una fila de la base de datos con las columnas (salon_id, nombre), por posición.
+
+        Args:
+            fila (tuple): La fila devuelta por el cursor.
+
+        Returns:
+            SalonModel: El objeto creado.
+        """
+        return cls(*fila)
+
     def __repr__(self):
         """
         Representación en forma de cadena del objeto SalonModel para facilitar su visualización.
@@ -55,6 +85,8 @@ class TipoReservaModel:
     Representa el modelo de un tipo de reserva.
     Contiene los atributos que definen un tipo de reserva.
     """
+    __slots__ = ("tipo_reserva_id", "nombre")  # Sin __dict__ por instancia
+
     def __init__(self, tipo_reserva_id, nombre):
         """
         Inicializa el objeto TipoReservaModel con los atributos proporcionados.
@@ -66,6 +98,19 @@ class TipoReservaModel:
         self.tipo_reserva_id = tipo_reserva_id  # ID único del tipo de reserva
         self.nombre = nombre  # Nombre del tipo de reserva
 
+    @classmethod
+    def desde_fila(cls, fila):
+        """
+        Crea el objeto a partir de una fila de la base de datos con las columnas (tipo_reserva_id, nombre), por posición.
+
+        Args:
+            fila (tuple): La fila devuelta por el cursor.
+
+        Returns:
+            TipoReservaModel: El objeto creado.
+        """
+        return cls(*fila)
+
     def __repr__(self):
         """
         Representación en forma de cadena del objeto TipoReservaModel para facilitar su visualización.
@@ -81,7 +126,12 @@ class ReservaModel:
     Representa el modelo de una reserva.
     Contiene los atributos que definen una reserva realizada en un salón, con un tipo de cocina y un tipo de reserva.
     """
-    def __init__(self, reserva_id, tipo_reserva_id, salon_id, tipo_cocina_id, persona, telefono, fecha, ocupacion, jornadas, habitaciones=0):
+    __slots__ = (
+        "reserva_id", "tipo_reserva_id", "salon_id", "tipo_cocina_id", "persona", "telefono",
+        "fecha", "ocupacion", "jornadas", "habitaciones", "version", "tipo_reserva_nombre",
+    )  # Sin __dict__ por instancia: los historiales grandes ocupan mucha menos memoria
+
+    def __init__(self, reserva_id, tipo_reserva_id, salon_id, tipo_cocina_id, persona, telefono, fecha, ocupacion, jornadas, habitaciones=0, version=0, tipo_reserva_nombre=None):
         """
         Inicializa el objeto ReservaModel con los atributos proporcionados.
 
@@ -96,6 +146,8 @@ class ReservaModel:
             ocupacion (int): Número de personas que asistirán.
             jornadas (int): Número de jornadas de la reserva (pueden ser varios días si es necesario).
             habitaciones (int): Número de habitaciones (por defecto es 0, si aplica).
+            version (int): Versión de la fila al leerla; cada modificación la incrementa (control de concurrencia optimista).
+            tipo_reserva_nombre (str): Nombre del tipo de reserva para mostrarlo (opcional, no se guarda en la base de datos).
         """
         self.reserva_id = reserva_id  # ID único de la reserva
         self.tipo_reserva_id = tipo_reserva_id  # ID del tipo de reserva
@@ -107,6 +159,22 @@ class ReservaModel:
         self.ocupacion = ocupacion  # Número de personas en la reserva
         self.jornadas = jornadas  # Número de jornadas (días)
         self.habitaciones = habitaciones  # Número de habitaciones (por defecto 0 si no aplica)
+        self.version = version  # Versión de la fila en la base de datos
+        self.tipo_reserva_nombre = tipo_reserva_nombre  # Nombre del tipo de reserva, solo para mostrar
+
+    @classmethod
+    def desde_fila(cls, fila):
+        """
+        Crea la reserva a partir de una fila con las columnas de ReservasDAO.COLUMNAS, por posición.
+        Si la fila trae una columna más, se toma como el nombre del tipo de reserva.
+
+        Args:
+            fila (tuple): La fila devuelta por el cursor.
+
+        Returns:
+            ReservaModel: La reserva creada.
+        """
+        return cls(*fila)
 
     def __repr__(self):
         """
@@ -116,3 +184,55 @@ class ReservaModel:
             str: Cadena con la representación del objeto.
         """
         return f"Reserva(reserva_id={self.reserva_id}, tipo_reserva_id={self.tipo_reserva_id}, salon_id={self.salon_id}, tipo_cocina_id={self.tipo_cocina_id}, persona='{self.persona}', telefono='{self.telefono}', fecha='{self.fecha}', ocupacion={self.ocupacion}, jornadas={self.jornadas}, habitaciones={self.habitaciones})"
+
+
+class CambioModel:
+    """
+    Representa una entrada del registro de cambios: una fila creada, modificada o borrada en otra tabla.
+    """
+    __slots__ = ("cambio_id", "tabla", "operacion", "registro_id", "salon_id", "salon_anterior", "fecha_anterior")  # Sin __dict__ por instancia
+
+    ALTA, MODIFICACION, BAJA = "I", "U", "D"  # Valores de operacion
+
+    def __init__(self, cambio_id, tabla, operacion, registro_id, salon_id=None, salon_anterior=None, fecha_anterior=None):
+        """
+        Inicializa el objeto CambioModel con los atributos proporcionados.
+
+        Args:
+            cambio_id (int): El ID del cambio, creciente: sirve de marca para leer solo los posteriores.
+            tabla (str): La tabla cambiada (por ahora, siempre reservas).
+            operacion (str): "I" (alta), "U" (modificación) o "D" (baja).
+            registro_id (int): El ID de la fila cambiada.
+            salon_id (int): El salón de la fila tras el cambio (o antes de borrarla).
+            salon_anterior (int): En una modificación, el salón que tenía antes.
+            fecha_anterior (date): En una modificación o una baja, la fecha que tenía antes.
+        """
+        self.cambio_id = cambio_id  # ID creciente del cambio
+        self.tabla = tabla  # Tabla cambiada
+        self.operacion = operacion  # Alta, modificación o baja
+        self.registro_id = registro_id  # ID de la fila cambiada
+        self.salon_id = salon_id  # Salón tras el cambio
+        self.salon_anterior = salon_anterior  # Salón antes del cambio (solo en modificaciones)
+        self.fecha_anterior = fecha_anterior  # Fecha antes del cambio (en modificaciones y bajas)
+
+    @classmethod
+    def desde_fila(cls, fila):
+        """
+        Crea el cambio a partir de una fila con las columnas de CambiosDAO.COLUMNAS, por posición.
+
+        Args:
+            fila (tuple): La fila devuelta por el cursor.
+
+        Returns:
+            CambioModel: El cambio creado.
+        """
+        return cls(*fila)
+
+    def __repr__(self):
+        """
+        Representación en forma de cadena del objeto CambioModel para facilitar su visualización.
+
+        Returns:
+            str: Cadena con la representación del objeto.
+        """
+        return f"Cambio(cambio_id={self.cambio_id}, tabla='{self.tabla}', operacion='{self.operacion}', registro_id={self.registro_id}, salon_id={self.salon_id})"
@@ -0,0 +1,146 @@
+import datetime
+
+from modelos.datos import ReservasDAO, SalonesDAO, TiposReservasDAO
+
+
+def sumar_meses(fecha, meses):
+    """
+    Devuelve el primer día del mes que queda a varios meses de una fecha.
+
+    Args:
+        fecha (date): Fecha de referencia.
+        meses (int): Meses a sumar (negativo para retroceder).
+
+    Returns:
+        date: Día 1 del mes resultante.
+    """
+    indice = fecha.year * 12 + fecha.month - 1 + meses
+    return datetime.date(indice // 12, indice % 12 + 1, 1)
+
+
+class MapaOcupacion:
+    """
+    Rejilla de ocupación de todos los salones día a día en un rango de fechas.
+    Cada fila es un salón y cada columna un día; las celdas se guardan en listas por fila para que
+    la vista las lea por posición al pintar, sin búsquedas ni objetos por celda.
+    """
+    def __init__(self, salones, desde, hasta, ocupados, mapa_tipos=None):
+        """
+        Construye la rejilla a partir del resultado de ReservasDAO.get_ocupacion_hotel.
+
+        Args:
+            salones (list): Lista de objetos SalonModel, en el orden de las filas.
+            desde (date): Primer día del rango.
+            hasta (date): Día siguiente al último del rango.
+            ocupados (list): Tuplas (salon_id, dia, reserva_id, tipo_reserva_id, asistentes).
+            mapa_tipos (dict): tipo_reserva_id -> nombre, para describir las celdas.
+        """
+        self.salones = [(salon.salon_id, salon.nombre) for salon in salones]
+        self.desde = desde
+        self.hasta = hasta
+        self.dias = (hasta - desde).days
+        self.mapa_tipos = mapa_tipos or {}
+        filas = {salon_id: fila for fila, (salon_id, _) in enumerate(self.salones)}
+        self._celdas = [[None] * self.dias for _ in self.salones]  # (reserva_id, tipo_reserva_id, asistentes) o None
+        self._ocupados = [0] * len(self.salones)  # Días ocupados por fila
+        self.max_asistentes = 0
+        inicio = desde.toordinal()
+        for salon_id, dia, reserva_id, tipo_reserva_id, asistentes in ocupados:
+            fila = filas.get(salon_id)
+            columna = dia.toordinal() - inicio
+            if fila is None or not 0 <= columna < self.dias:
+                continue
+            self._celdas[fila][columna] = (reserva_id, tipo_reserva_id, asistentes or 0)
+            self._ocupados[fila] += 1
+            self.max_asistentes = max(self.max_asistentes, asistentes or 0)
+
+    def fila(self, fila):
+        """
+        Devuelve las celdas de un salón, una por día del rango.
+
+        Args:
+            fila (int): Posición del salón.
+
+        Returns:
+            list: (reserva_id, tipo_reserva_id, asistentes) o None por día.
+        """
+        return self._celdas[fila]
+
+    def fecha(self, columna):
+        """
+        Devuelve el día de una columna.
+
+        Args:
+            columna (int): Posición del día en el rango.
+
+        Returns:
+            date: El día.
+        """
+        return self.desde + datetime.timedelta(days=columna)
+
+    def columna(self, fecha):
+        """
+        Devuelve la columna de un día, o None si queda fuera del rango.
+
+        Args:
+            fecha (date): El día.
+
+        Returns:
+            int: Posición del día en el rango.
+        """
+        columna = (fecha - self.desde).days
+        return columna if 0 <= columna < self.dias else None
+
+    def dias_ocupados(self, fila=None):
+        """
+        Cuenta los días ocupados de un salón o de todos.
+
+        Args:
+            fila (int): Posición del salón (por defecto, todos).
+
+        Returns:
+            int: Días ocupados.
+        """
+        return sum(self._ocupados) if fila is None else self._ocupados[fila]
+
+    def describir(self, fila, columna):
+        """
+        Describe una celda para mostrarla como ayuda emergente.
+
+        Args:
+            fila (int): Posición del salón.
+            columna (int): Posición del día.
+
+        Returns:
+            str: Salón, día y, si está ocupado, tipo de reserva y asistentes.
+        """
+        _, nombre = self.salones[fila]
+        texto = f"{nombre} · {self.fecha(columna).strftime('%Y-%m-%d')}"
+        celda = self._celdas[fila][columna]
+        if celda is None:
+            return f"{texto}\nLibre"
+        reserva_id, tipo_reserva_id, asistentes = celda
+        tipo = self.mapa_tipos.get(tipo_reserva_id, "Reserva")
+        return f"{texto}\n{tipo} · {asistentes} asistentes (reserva {reserva_id})"
+
+
+def cargar_mapa(desde, hasta, dao_reservas=None, dao_salones=None, dao_tipos_reserva=None):
+    """
+    Obtiene la ocupación de todos los salones en un rango: los catálogos salen de su caché y los días
+    ocupados de una sola consulta agregada. Se ejecuta fuera del hilo de la interfaz.
+
+    Args:
+        desde (date): Primer día del rango.
+        hasta (date): Día siguiente al último del rango.
+        dao_reservas (ReservasDAO): DAO de reservas (por defecto uno sobre el pool del proceso).
+        dao_salones (SalonesDAO): DAO de salones (por defecto uno sobre el pool del proceso).
+        dao_tipos_reserva (TiposReservasDAO): DAO de tipos de reserva (por defecto uno sobre el pool del proceso).
+
+    Returns:
+        MapaOcupacion: La rejilla del rango.
+    """
+    dao_reservas = dao_reservas or ReservasDAO()
+    salones = (dao_salones or SalonesDAO()).get_all()
+    mapa_tipos = {tipo.tipo_reserva_id: tipo.nombre for tipo in (dao_tipos_reserva or TiposReservasDAO()).get_all()}
+    return MapaOcupacion(salones, desde, hasta, dao_reservas.get_ocupacion_hotel(desde, hasta), mapa_tipos)
+
@@ -0,0 +1,85 @@
+import datetime
+import logging
+import os
+import time
+
+from modelos.cache import reservas_salon
+from modelos.conexion import get_pool
+from modelos.datos import ReservasDAO, SalonesDAO, TiposCocinaDAO, TiposReservasDAO
+from modelos.migraciones import migrar
+
+logger = logging.getLogger(__name__)
+
+RESERVAS_POR_PAGINA = 100  # Reservas que se piden a la base de datos en cada página de la tabla
+CONEXIONES_PRECALENTADAS = int(os.environ.get("HOTEL_ARRANQUE_CONEXIONES", 3))  # Conexiones que se abren durante el login
+
+
+def primera_pagina(salon_id, dao_reservas=None, dao_tipos_reserva=None):
+    """
+    Obtiene la primera página de próximas reservas de un salón (desde hoy) y el nombre de cada tipo de reserva,
+    y la guarda en la caché de salones.
+
+    Args:
+        salon_id (int): El ID del salón.
+        dao_reservas (ReservasDAO): DAO de reservas (por defecto uno sobre el pool del proceso).
+        dao_tipos_reserva (TiposReservasDAO): DAO de tipos de reserva (por defecto uno sobre el pool del proceso).
+
+    Returns:
+        tuple: (salon_id, lista de objetos ReservaModel, hay más siguientes, diccionario tipo_reserva_id -> nombre,
+            fecha desde la que se han pedido).
+    """
+    dao_reservas = dao_reservas or ReservasDAO()
+    dao_tipos_reserva = dao_tipos_reserva or TiposReservasDAO()
+    # Se pide una reserva de más para saber si hay otra página
+    hoy = datetime.date.today()
+    version = reservas_salon.version(salon_id)  # Si alguien escribe en el salón durante la consulta, no se guarda
+    reservas = dao_reservas.get_rango(salon_id, desde=hoy, limite=RESERVAS_POR_PAGINA + 1)
+    # Diccionario tipo_reserva_id -> nombre; el modelo de la tabla lo resuelve al pintar cada celda
+    mapa_tipos = {tipo.tipo_reserva_id: tipo.nombre for tipo in dao_tipos_reserva.get_all()}
+
+    resultado = salon_id, reservas[:RESERVAS_POR_PAGINA], len(reservas) > RESERVAS_POR_PAGINA, mapa_tipos, hoy
+    reservas_salon.guardar(salon_id, hoy, version, resultado)
+    return resultado
+
+
+def precalentar(pool=None):
+    """
+    Prepara en segundo plano, mientras se muestra el login, todo lo que necesita la ventana principal para
+    abrirse sin esperar a la base de datos: aplica las migraciones pendientes, abre conexiones del pool,
+    llena la caché de catálogos y guarda la primera página del primer salón.
+
+    Args:
+        pool (PoolConexiones): Pool del que tomar las conexiones (por defecto el del proceso).
+
+    Returns:
+        dict: Segundos que ha llevado cada paso.
+
+    Raises:
+        Exception: Si no se puede conectar o migrar la base de datos; el resto de pasos no son imprescindibles.
+    """
+    tiempos, inicio = {}, time.perf_counter()
+
+    def paso(nombre):
+        nonlocal inicio
+        ahora = time.perf_counter()
+        tiempos[nombre] = round(ahora - inicio, 4)
+        inicio = ahora
+
+    pool = pool or get_pool()
+    migrar(pool)
+    paso("migraciones")
+    try:
+        pool.precalentar(CONEXIONES_PRECALENTADAS)
+        paso("conexiones")
+        salones = SalonesDAO(pool).get_all()
+        dao_tipos_reserva = TiposReservasDAO(pool)
+        dao_tipos_reserva.get_all()
+        TiposCocinaDAO(pool).get_all()
+        paso("catalogos")
+        if salones:
+            primera_pagina(salones[0].salon_id, ReservasDAO(pool), dao_tipos_reserva)
+        paso("primera_pagina")
+    except Exception as e:
+        # La ventana principal volverá a pedir lo que falte y mostrará el error si persiste
+        logger.warning("No se pudo completar el precalentamiento: %s", e)
+    return tiempos
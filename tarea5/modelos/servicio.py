@@ -0,0 +1,278 @@
+import datetime
+
+from modelos.datos import ReservasDAO, SalonesDAO, TiposCocinaDAO, TiposReservasDAO
+from modelos.disponibilidad import disponibilidad
+from modelos.migraciones import MAX_JORNADAS
+from modelos.models import ReservaModel
+
+LIMITE_PAGINA = 100  # Reservas por página al listar, si no se pide otra cantidad
+MAX_PAGINA = 1000  # Reservas por página como máximo
+MAX_DIAS_CALENDARIO = 366  # Días que se pueden pedir de una vez en el calendario de ocupación
+MAX_TEXTO = 255  # Longitud máxima del nombre y el teléfono
+# Rango (mínimo, máximo) de los campos numéricos de una reserva: los del formulario, y las jornadas que cubren los triggers
+RANGOS_RESERVA = {"ocupacion": (0, 999), "jornadas": (0, MAX_JORNADAS - 1), "habitaciones": (0, 1)}
+
+# Campos de una reserva en JSON: los de escritura son todos menos el ID y la versión
+CAMPOS_RESERVA = ("tipo_reserva_id", "salon_id", "tipo_cocina_id", "persona", "telefono", "fecha", "ocupacion", "jornadas", "habitaciones")
+
+
+class PeticionInvalida(Exception):
+    """
+    Se lanza cuando los datos recibidos no son válidos; el mensaje explica el motivo.
+    """
+
+
+class NoEncontrada(Exception):
+    """
+    Se lanza cuando la reserva o el salón pedidos no existen.
+    """
+
+
+def reserva_a_dict(reserva):
+    """
+    Convierte una reserva en un diccionario serializable a JSON (la fecha en formato AAAA-MM-DD).
+
+    Args:
+        reserva (ReservaModel): La reserva.
+
+    Returns:
+        dict: Los campos de la reserva, con su ID y su versión.
+    """
+    return {
+        "reserva_id": reserva.reserva_id,
+        **{campo: getattr(reserva, campo) for campo in CAMPOS_RESERVA},
+        "fecha": reserva.fecha.isoformat(),
+        "version": reserva.version,
+    }
+
+
+def leer_fecha(valor, campo="fecha"):
+    """
+    Convierte una fecha AAAA-MM-DD recibida como texto.
+
+    Raises:
+        PeticionInvalida: Si el valor no es una fecha válida.
+    """
+    try:
+        return datetime.date.fromisoformat(str(valor))
+    except ValueError:
+        raise PeticionInvalida(f"El campo {campo} debe ser una fecha AAAA-MM-DD, no «{valor}».") from None
+
+
+def leer_entero(valor, campo, minimo=0, maximo=None):
+    """
+    Convierte un entero recibido como número o como texto y comprueba su rango.
+
+    Raises:
+        PeticionInvalida: Si el valor no es un entero o está fuera del rango.
+    """
+    if isinstance(valor, bool) or isinstance(valor, float) and not valor.is_integer():
+        raise PeticionInvalida(f"El campo {campo} debe ser un número entero.")
+    try:
+        numero = int(valor)
+    except (TypeError, ValueError):
+        raise PeticionInvalida(f"El campo {campo} debe ser un número entero, no «{valor}».") from None
+    if numero < minimo or (maximo is not None and numero > maximo):
+        limite = f"entre {minimo} y {maximo}" if maximo is not None else f"mayor o igual que {minimo}"
+        raise PeticionInvalida(f"El campo {campo} debe estar {limite}.")
+    return numero
+
+
+class ServicioReservas:
+    """
+    Operaciones de reservas sin interfaz gráfica, para el servicio HTTP y otros clientes sin Qt.
+    Reutiliza los DAOs, sus cachés y el índice de disponibilidad del proceso; todos los métodos son
+    bloqueantes y seguros entre hilos, y reciben y devuelven diccionarios serializables a JSON.
+    """
+    def __init__(self, pool=None):
+        """
+        Inicializa el servicio con los DAOs del pool.
+
+        Args:
+            pool (PoolConexiones): Pool del que tomar las conexiones (por defecto el del proceso).
+        """
+        self.dao_reservas = ReservasDAO(pool)
+        self.dao_salones = SalonesDAO(pool)
+        self.dao_tipos_reserva = TiposReservasDAO(pool)
+        self.dao_tipos_cocina = TiposCocinaDAO(pool)
+
+    def catalogos(self):
+        """
+        Devuelve los salones, los tipos de reserva y los tipos de cocina (desde la caché de catálogos).
+
+        Returns:
+            dict: Listas de {"id", "nombre"} por catálogo.
+        """
+        return {
+            "salones": [{"id": s.salon_id, "nombre": s.nombre} for s in self.dao_salones.get_all()],
+            "tipos_reserva": [{"id": t.tipo_reserva_id, "nombre": t.nombre} for t in self.dao_tipos_reserva.get_all()],
+            "tipos_cocina": [{"id": t.tipo_cocina_id, "nombre": t.nombre} for t in self.dao_tipos_cocina.get_all()],
+        }
+
+    def listar(self, salon_id, desde=None, hasta=None, despues_de=None, limite=LIMITE_PAGINA):
+        """
+        Devuelve una página de reservas de un salón en orden de fecha, paginando por clave como la rejilla.
+
+        Args:
+            salon_id (int): El ID del salón.
+            desde (date): Fecha mínima incluida (opcional).
+            hasta (date): Fecha máxima excluida (opcional).
+            despues_de (str): Cursor "AAAA-MM-DD,reserva_id" devuelto en la página anterior (opcional).
+            limite (int): Reservas por página.
+
+        Returns:
+            dict: {"reservas": [...], "siguiente": cursor de la página siguiente o None si es la última}.
+
+        Raises:
+            NoEncontrada: Si el salón no existe.
+            PeticionInvalida: Si el cursor o el límite no son válidos.
+        """
+        self._salon(salon_id)
+        limite = leer_entero(limite, "limite", 1, MAX_PAGINA)
+        clave = None
+        if despues_de:
+            fecha, _, reserva_id = str(despues_de).partition(",")
+            clave = (leer_fecha(fecha, "despues_de"), leer_entero(reserva_id, "despues_de"))
+        # Se pide una reserva de más para saber si hay página siguiente sin contar el total
+        reservas = self.dao_reservas.get_rango(salon_id, desde, hasta, clave, limite + 1)
+        pagina = reservas[:limite]
+        siguiente = f"{pagina[-1].fecha.isoformat()},{pagina[-1].reserva_id}" if len(reservas) > limite else None
+        return {"reservas": [reserva_a_dict(r) for r in pagina], "siguiente": siguiente}
+
+    def obtener(self, reserva_id):
+        """
+        Devuelve una reserva.
+
+        Args:
+            reserva_id (int): El ID de la reserva.
+
+        Returns:
+            dict: La reserva.
+
+        Raises:
+            NoEncontrada: Si la reserva no existe.
+        """
+        reserva = self.dao_reservas.get(reserva_id)
+        if reserva is None:
+            raise NoEncontrada(f"No existe la reserva {reserva_id}.")
+        return reserva_a_dict(reserva)
+
+    def disponibilidad(self, salon_id, fecha, jornadas=0, excluir=None):
+        """
+        Indica si un salón está libre en una fecha y sus jornadas, desde el índice de disponibilidad en memoria.
+        Es una consulta orientativa: la base de datos es la que decide al crear o modificar la reserva.
+
+        Args:
+            salon_id (int): El ID del salón.
+            fecha (date): Primer día.
+            jornadas (int): Jornadas (0 o 1 para un solo día).
+            excluir (int): ID de una reserva que no cuenta como conflicto (la que se va a modificar).
+
+        Returns:
+            dict: {"libre": bool, "conflictos": IDs de las reservas que ocupan algún día}.
+
+        Raises:
+            NoEncontrada: Si el salón no existe.
+        """
+        self._salon(salon_id)
+        jornadas = leer_entero(jornadas, "jornadas", *RANGOS_RESERVA["jornadas"])
+        self.dao_reservas.asegurar_disponibilidad(salon_id)
+        conflictos = disponibilidad.conflictos(salon_id, fecha, jornadas, excluir=excluir)
+        return {"salon_id": salon_id, "fecha": fecha.isoformat(), "jornadas": jornadas, "libre": not conflictos, "conflictos": conflictos}
+
+    def dias_ocupados(self, salon_id, desde, hasta):
+        """
+        Devuelve los días ocupados de un salón en un rango, para pintar un calendario.
+
+        Args:
+            salon_id (int): El ID del salón.
+            desde (date): Primer día del rango.
+            hasta (date): Día siguiente al último del rango.
+
+        Returns:
+            dict: {"ocupados": fechas AAAA-MM-DD ordenadas}.
+
+        Raises:
+            NoEncontrada: Si el salón no existe.
+            PeticionInvalida: Si el rango está vacío o es demasiado largo.
+        """
+        self._salon(salon_id)
+        if not 0 < (hasta - desde).days <= MAX_DIAS_CALENDARIO:
+            raise PeticionInvalida(f"El rango debe tener entre 1 y {MAX_DIAS_CALENDARIO} días.")
+        self.dao_reservas.asegurar_disponibilidad(salon_id)
+        dias = disponibilidad.dias_ocupados(salon_id, desde, hasta)
+        return {"salon_id": salon_id, "desde": desde.isoformat(), "hasta": hasta.isoformat(), "ocupados": sorted(d.isoformat() for d in dias)}
+
+    def crear(self, datos):
+        """
+        Crea una reserva con una sola sentencia; la base de datos rechaza la fecha si está ocupada.
+
+        Args:
+            datos (dict): Campos de la reserva (CAMPOS_RESERVA).
+
+        Returns:
+            dict: La reserva creada, con su ID y su versión.
+
+        Raises:
+            PeticionInvalida: Si algún campo no es válido.
+            FechaOcupadaError: Si algún día de la reserva ya está ocupado en el salón.
+        """
+        return reserva_a_dict(self.dao_reservas.create(self._reserva(datos)))
+
+    def actualizar(self, reserva_id, datos):
+        """
+        Modifica una reserva con control de concurrencia optimista: los datos deben traer la versión leída.
+
+        Args:
+            reserva_id (int): El ID de la reserva.
+            datos (dict): Campos de la reserva (CAMPOS_RESERVA) más "version".
+
+        Returns:
+            dict: La reserva modificada, con la nueva versión.
+
+        Raises:
+            PeticionInvalida: Si algún campo no es válido o falta la versión.
+            ConflictoVersionError: Si la reserva ha cambiado o se ha borrado desde que se leyó.
+            FechaOcupadaError: Si algún día de la reserva ya está ocupado en el salón.
+        """
+        if "version" not in datos:
+            raise PeticionInvalida("Falta el campo version: la versión de la reserva que se leyó.")
+        reserva = self._reserva(datos)
+        reserva.reserva_id = reserva_id
+        reserva.version = leer_entero(datos["version"], "version")
+        return reserva_a_dict(self.dao_reservas.update(reserva))
+
+    def _salon(self, salon_id):
+        """
+        Devuelve el salón o lanza NoEncontrada si no existe.
+        """
+        salon = self.dao_salones.get(salon_id)
+        if salon is None:
+            raise NoEncontrada(f"No existe el salón {salon_id}.")
+        return salon
+
+    def _reserva(self, datos):
+        """
+        Valida los campos recibidos contra los catálogos y los límites del formulario y crea la reserva sin ID.
+        """
+        if not isinstance(datos, dict):
+            raise PeticionInvalida("El cuerpo debe ser un objeto JSON con los campos de la reserva.")
+        faltan = [campo for campo in CAMPOS_RESERVA[:6] if datos.get(campo) in (None, "")]
+        if faltan:
+            raise PeticionInvalida(f"Faltan campos obligatorios: {', '.join(faltan)}.")
+        salon_id = leer_entero(datos["salon_id"], "salon_id", 1)
+        tipo_reserva_id = leer_entero(datos["tipo_reserva_id"], "tipo_reserva_id", 1)
+        tipo_cocina_id = leer_entero(datos["tipo_cocina_id"], "tipo_cocina_id", 1)
+        if self.dao_salones.get(salon_id) is None:
+            raise PeticionInvalida(f"No existe el salón {salon_id}.")
+        if self.dao_tipos_reserva.get(tipo_reserva_id) is None:
+            raise PeticionInvalida(f"No existe el tipo de reserva {tipo_reserva_id}.")
+        if self.dao_tipos_cocina.get(tipo_cocina_id) is None:
+            raise PeticionInvalida(f"No existe el tipo de cocina {tipo_cocina_id}.")
+        persona, telefono = str(datos["persona"]).strip(), str(datos["telefono"]).strip()
+        if not persona or not telefono or len(persona) > MAX_TEXTO or len(telefono) > MAX_TEXTO:
+            raise PeticionInvalida(f"La persona y el teléfono deben tener entre 1 y {MAX_TEXTO} caracteres.")
+        return ReservaModel(
+            None, tipo_reserva_id, salon_id, tipo_cocina_id, persona, telefono, leer_fecha(datos["fecha"]),
+            *(leer_entero(datos.get(campo, 0), campo, *RANGOS_RESERVA[campo]) for campo in ("ocupacion", "jornadas", "habitaciones")),
+        )
@@ -0,0 +1,319 @@
+import bisect
+
+from PySide6.QtCore import QAbstractTableModel, QModelIndex, Qt, Signal
+
+LOTE_FILAS = 500  # Filas que se añaden a la vista en cada fetchMore
+
+
+class ReservasTableModel(QAbstractTableModel):
+    """
+    Modelo de tabla para la rejilla de reservas.
+    Guarda cada reserva como una tupla compacta y calcula el texto de cada celda solo cuando la vista lo pide,
+    en lugar de crear un QStandardItem por celda. Las filas se muestran por lotes con canFetchMore/fetchMore.
+    Si la base de datos tiene más páginas, fetchMore emite siguientes_solicitados para que el controlador las pida.
+    """
+    siguientes_solicitados = Signal()  # La vista necesita la página siguiente de la base de datos
+
+    COLUMNAS = ["Fecha", "Persona", "Teléfono", "Tipo de Reserva", "Id"]  # Encabezados de la tabla
+    COLUMNA_ID = 4  # Columna oculta con el ID de la reserva
+
+    # Posiciones dentro de la tupla de cada fila
+    _ID, _FECHA, _PERSONA, _TELEFONO, _TIPO = range(5)
+
+    def __init__(self, parent=None):
+        """
+        Inicializa el modelo vacío.
+
+        Args:
+            parent (QObject): Objeto padre de Qt.
+        """
+        super().__init__(parent)
+        self._filas = []  # (reserva_id, fecha, persona, telefono, tipo_reserva_id) por reserva
+        self._visibles = 0  # Número de filas ya expuestas a la vista
+        self._mapa_tipos = {}  # tipo_reserva_id -> nombre
+        self._posiciones = None  # reserva_id -> fila; se construye bajo demanda
+        self.hay_siguientes = False  # Quedan reservas posteriores sin cargar en la base de datos
+        self.hay_anteriores = False  # Quedan reservas anteriores sin cargar en la base de datos
+        self._pidiendo = False  # Ya se pidió la página siguiente y aún no ha llegado
+        self._limite_inferior = None  # Clave (fecha, reserva_id) por debajo de la cual no hay filas cargadas
+
+    @staticmethod
+    def fila_desde_reserva(reserva):
+        """
+        Convierte una reserva en la tupla compacta que guarda el modelo.
+
+        Args:
+            reserva (ReservaModel): La reserva a convertir.
+
+        Returns:
+            tuple: (reserva_id, fecha, persona, telefono, tipo_reserva_id).
+        """
+        return (reserva.reserva_id, reserva.fecha, reserva.persona, reserva.telefono, reserva.tipo_reserva_id)
+
+    def cargar(self, reservas, mapa_tipos, hay_siguientes=False, hay_anteriores=False, desde=None):
+        """
+        Sustituye el contenido del modelo por las reservas indicadas.
+
+        Args:
+            reservas (list): Lista de objetos ReservaModel ordenada por fecha.
+            mapa_tipos (dict): tipo_reserva_id -> nombre del tipo de reserva.
+            hay_siguientes (bool): Si quedan reservas posteriores por cargar.
+            hay_anteriores (bool): Si quedan reservas anteriores por cargar.
+            desde (tuple): Clave (fecha, reserva_id) a partir de la cual se pidieron las reservas, si hay anteriores;
+                por defecto, la de la primera reserva.
+        """
+        self.beginResetModel()
+        self._filas = [self.fila_desde_reserva(reserva) for reserva in reservas]
+        self._visibles = min(LOTE_FILAS, len(self._filas))
+        self._mapa_tipos = mapa_tipos
+        self._posiciones = None
+        self.hay_siguientes = hay_siguientes
+        self.hay_anteriores = hay_anteriores
+        self._pidiendo = False
+        self._limite_inferior = (desde or self.primera_clave()) if hay_anteriores else None
+        self.endResetModel()
+
+    def agregar_siguientes(self, reservas, hay_siguientes):
+        """
+        Añade al final la página siguiente recibida de la base de datos.
+
+        Args:
+            reservas (list): Lista de objetos ReservaModel posteriores a las ya cargadas.
+            hay_siguientes (bool): Si quedan más reservas posteriores.
+        """
+        self._pidiendo = False
+        self.hay_siguientes = hay_siguientes
+        if not reservas:
+            return
+        self._filas.extend(self.fila_desde_reserva(reserva) for reserva in reservas)
+        self._posiciones = None
+        self.fetchMore()  # Expone el primer lote de las filas nuevas
+
+    def agregar_anteriores(self, reservas, hay_anteriores):
+        """
+        Añade al principio la página anterior recibida de la base de datos.
+
+        Args:
+            reservas (list): Lista de objetos ReservaModel anteriores a las ya cargadas, en orden ascendente.
+            hay_anteriores (bool): Si quedan más reservas anteriores.
+        """
+        self.hay_anteriores = hay_anteriores
+        if not reservas:
+            if not hay_anteriores:
+                self._limite_inferior = None
+            return
+        self.beginInsertRows(QModelIndex(), 0, len(reservas) - 1)
+        self._filas[0:0] = [self.fila_desde_reserva(reserva) for reserva in reservas]
+        self._visibles += len(reservas)
+        self._posiciones = None
+        self._limite_inferior = self.primera_clave() if hay_anteriores else None
+        self.endInsertRows()
+
+    def primera_clave(self):
+        """
+        Devuelve la clave de paginación (fecha, reserva_id) de la primera reserva cargada, o None.
+        """
+        return (self._filas[0][self._FECHA], self._filas[0][self._ID]) if self._filas else None
+
+    def ultima_clave(self):
+        """
+        Devuelve la clave de paginación (fecha, reserva_id) de la última reserva cargada, o None.
+        """
+        return (self._filas[-1][self._FECHA], self._filas[-1][self._ID]) if self._filas else None
+
+    def reserva_id(self, fila):
+        """
+        Devuelve el ID de la reserva mostrada en una fila.
+
+        Args:
+            fila (int): Número de fila de la vista.
+
+        Returns:
+            int: El ID de la reserva, o 0 si la fila no existe.
+        """
+        if 0 <= fila < self._visibles:
+            return self._filas[fila][self._ID]
+        return 0
+
+    def fila_de(self, reserva_id):
+        """
+        Devuelve la fila que ocupa una reserva.
+
+        Args:
+            reserva_id (int): El ID de la reserva.
+
+        Returns:
+            int: Número de fila, o -1 si no está en el modelo.
+        """
+        if self._posiciones is None:
+            self._posiciones = {fila[self._ID]: i for i, fila in enumerate(self._filas)}
+        return self._posiciones.get(reserva_id, -1)
+
+    def actualizar_reserva(self, reserva):
+        """
+        Actualiza en el sitio la fila de una reserva y avisa a la vista solo de esas celdas.
+
+        Args:
+            reserva (ReservaModel): La reserva con los datos nuevos.
+
+        Returns:
+            bool: True si la reserva estaba en el modelo.
+        """
+        fila = self.fila_de(reserva.reserva_id)
+        if fila < 0:
+            return False
+        self._filas[fila] = self.fila_desde_reserva(reserva)
+        if fila < self._visibles:
+            self.dataChanged.emit(self.index(fila, 0), self.index(fila, len(self.COLUMNAS) - 1))
+        return True
+
+    def colocar_reserva(self, reserva):
+        """
+        Inserta, mueve o actualiza la fila de una reserva recién guardada en su posición por (fecha, reserva_id),
+        sin reiniciar el modelo: la vista conserva el desplazamiento y la selección.
+        Si la nueva posición cae fuera del tramo cargado (en páginas aún no pedidas), la fila se quita y llegará con su página.
+
+        Args:
+            reserva (ReservaModel): La reserva guardada.
+
+        Returns:
+            int: Fila que ocupa ahora la reserva, o -1 si no está entre las filas expuestas a la vista.
+        """
+        nueva = self.fila_desde_reserva(reserva)
+        clave = (nueva[self._FECHA], nueva[self._ID])
+        fuera = (self._limite_inferior is not None and clave < self._limite_inferior) or (
+            self.hay_siguientes and self._filas and clave > self.ultima_clave()
+        )
+        anterior = self.fila_de(reserva.reserva_id)
+
+        # Posición de destino contando la lista sin la fila anterior de la reserva
+        restantes = self._filas if anterior < 0 else self._filas[:anterior] + self._filas[anterior + 1:]
+        destino = bisect.bisect_left(restantes, clave, key=lambda fila: (fila[self._FECHA], fila[self._ID]))
+        visible_antes = 0 <= anterior < self._visibles
+        # Una fila nueva solo se expone si cae entre las visibles o si ya estaban todas expuestas
+        visible_despues = not fuera and (
+            destino < self._visibles - visible_antes or self._visibles - visible_antes == len(restantes)
+        )
+        self._posiciones = None
+
+        if visible_antes and visible_despues:
+            if destino != anterior:
+                # beginMoveRows espera el destino contado sobre la lista antes de quitar la fila
+                self.beginMoveRows(QModelIndex(), anterior, anterior, QModelIndex(), destino + (destino > anterior))
+                del self._filas[anterior]
+                self._filas.insert(destino, nueva)
+                self.endMoveRows()
+            else:
+                self._filas[anterior] = nueva
+            self.dataChanged.emit(self.index(destino, 0), self.index(destino, len(self.COLUMNAS) - 1))
+            return destino
+
+        if visible_antes:
+            self.beginRemoveRows(QModelIndex(), anterior, anterior)
+            del self._filas[anterior]
+            self._visibles -= 1
+            self.endRemoveRows()
+        elif anterior >= 0:
+            del self._filas[anterior]  # Estaba cargada pero aún no expuesta a la vista
+        if fuera:
+            return -1
+        if not visible_despues:
+            self._filas.insert(destino, nueva)  # Se expondrá con su lote en fetchMore
+            return -1
+        self.beginInsertRows(QModelIndex(), destino, destino)
+        self._filas.insert(destino, nueva)
+        self._visibles += 1
+        self.endInsertRows()
+        return destino
+
+    def quitar_reserva(self, reserva_id):
+        """
+        Quita la fila de una reserva borrada o que ya no pertenece al salón mostrado.
+
+        Args:
+            reserva_id (int): El ID de la reserva.
+
+        Returns:
+            bool: True si la reserva estaba en el modelo.
+        """
+        fila = self.fila_de(reserva_id)
+        if fila < 0:
+            return False
+        self._posiciones = None
+        if fila < self._visibles:
+            self.beginRemoveRows(QModelIndex(), fila, fila)
+            del self._filas[fila]
+            self._visibles -= 1
+            self.endRemoveRows()
+        else:
+            del self._filas[fila]
+        return True
+
+    def conoce_tipo(self, tipo_reserva_id):
+        """
+        Indica si el modelo sabe mostrar el nombre de un tipo de reserva.
+        """
+        return tipo_reserva_id in self._mapa_tipos
+
+    def rowCount(self, parent=QModelIndex()):
+        """
+        Número de filas expuestas a la vista (las pendientes se añaden con fetchMore).
+        """
+        return 0 if parent.isValid() else self._visibles
+
+    def columnCount(self, parent=QModelIndex()):
+        """
+        Número de columnas de la tabla.
+        """
+        return 0 if parent.isValid() else len(self.COLUMNAS)
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        """
+        Devuelve el texto de una celda, calculado en el momento a partir de la tupla de la fila.
+        """
+        if role != Qt.ItemDataRole.DisplayRole or not index.isValid():
+            return None
+        fila = self._filas[index.row()]
+        columna = index.column()
+        if columna == 0:
+            return fila[self._FECHA].strftime("%Y-%m-%d")  # Convierte la fecha a string
+        if columna == 1:
+            return fila[self._PERSONA]
+        if columna == 2:
+            return fila[self._TELEFONO]
+        if columna == 3:
+            return self._mapa_tipos.get(fila[self._TIPO], "Desconocido")
+        return str(fila[self._ID])
+
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        """
+        Devuelve los encabezados de las columnas.
+        """
+        if role == Qt.ItemDataRole.DisplayRole and orientation == Qt.Orientation.Horizontal:
+            return self.COLUMNAS[section]
+        return super().headerData(section, orientation, role)
+
+    def canFetchMore(self, parent=QModelIndex()):
+        """
+        Indica si quedan filas cargadas sin exponer a la vista o páginas por pedir a la base de datos.
+        """
+        if parent.isValid():
+            return False
+        return self._visibles < len(self._filas) or (self.hay_siguientes and not self._pidiendo)
+
+    def fetchMore(self, parent=QModelIndex()):
+        """
+        Expone a la vista el siguiente lote de filas o, si ya están todas expuestas, pide la página siguiente.
+        """
+        if parent.isValid():
+            return
+        restantes = len(self._filas) - self._visibles
+        lote = min(LOTE_FILAS, restantes)
+        if lote <= 0:
+            if self.hay_siguientes and not self._pidiendo:
+                self._pidiendo = True
+                self.siguientes_solicitados.emit()
+            return
+        self.beginInsertRows(QModelIndex(), self._visibles, self._visibles + lote - 1)
+        self._visibles += lote
+        self.endInsertRows()
@@ -0,0 +1,132 @@
+"""
+Pruebas de la lectura del registro de cambios (modelos.cambios) contra un fichero SQLite temporal.
+
+En SQLite las transacciones se confirman de una en una, así que los IDs que MySQL confirmaría fuera de orden
+se simulan insertando en la tabla cambios con un cambio_id explícito. Se ejecutan desde la carpeta tarea5:
+
+    python -m pytest tests
+"""
+import datetime
+
+import pytest
+
+from modelos import cambios
+from modelos.backends import crear_backend
+from modelos.cambios import leer_cambios, marca_inicial
+from modelos.conexion import PoolConexiones
+from modelos.datos import CambiosDAO, ReservasDAO
+from modelos.migraciones import migrar
+from modelos.models import CambioModel, ReservaModel
+
+INSERTAR_CAMBIO = "INSERT INTO cambios (cambio_id, tabla, operacion, registro_id, salon_id) VALUES (%s, 'reservas', %s, %s, %s)"
+
+
+@pytest.fixture
+def pool(tmp_path):
+    """
+    Pool sobre una base de datos SQLite nueva con el esquema al día.
+    """
+    backend = crear_backend("sqlite", ruta=str(tmp_path / "cambios.db"))
+    pool = PoolConexiones(backend.conectar, validar=backend.esta_viva, backend=backend)
+    migrar(pool)
+    yield pool
+    pool.cerrar()
+
+
+@pytest.fixture
+def reservas(pool):
+    """
+    Tres reservas del salón 1 creadas antes de tomar la marca inicial.
+    """
+    dao = ReservasDAO(pool)
+    return [dao.create(ReservaModel(None, 1, 1, 1, f"Huésped {n}", "600000000", datetime.date(2040, 1, 1 + n), 10, 0, 0))
+            for n in range(3)]
+
+
+def registrar(pool, cambio_id, reserva, operacion=CambioModel.MODIFICACION):
+    """
+    Anota un cambio de una reserva con un ID concreto, como si su transacción se confirmara en ese momento.
+    """
+    CambiosDAO(pool).ejecutar(INSERTAR_CAMBIO, (cambio_id, operacion, reserva.reserva_id, reserva.salon_id))
+
+
+def ids(deltas):
+    """
+    IDs de los cambios devueltos por leer_cambios, en orden.
+    """
+    return [cambio.cambio_id for cambio, _ in deltas]
+
+
+def test_cambio_confirmado_tarde_se_recupera_una_vez(pool, reservas):
+    marca = marca_inicial(pool)
+    base = marca.ultimo
+
+    registrar(pool, base + 2, reservas[1])  # El ID base + 1 aún no se ha confirmado
+    marca, deltas, hay_mas = leer_cambios(marca, pool=pool)
+    assert (marca.ultimo, sorted(marca.huecos)) == (base + 2, [base + 1])
+    assert ids(deltas) == [base + 2] and not hay_mas
+    assert deltas[0][1].reserva_id == reservas[1].reserva_id
+
+    registrar(pool, base + 1, reservas[0])  # Se confirma después del posterior
+    marca, deltas, hay_mas = leer_cambios(marca, pool=pool)
+    assert (marca.ultimo, marca.huecos) == (base + 2, {})
+    assert ids(deltas) == [base + 1] and not hay_mas  # El cambio base + 2 ya aplicado no se repite
+    assert deltas[0][1].reserva_id == reservas[0].reserva_id
+
+    marca, deltas, hay_mas = leer_cambios(marca, pool=pool)
+    assert (marca.ultimo, marca.huecos, deltas, hay_mas) == (base + 2, {}, [], False)
+
+
+def test_hueco_de_transaccion_deshecha_caduca(pool, reservas, monkeypatch):
+    marca = marca_inicial(pool)
+    base = marca.ultimo
+
+    dao = CambiosDAO(pool)
+    with pytest.raises(RuntimeError):
+        with dao.transaccion() as conn:
+            dao.ejecutar_lote(INSERTAR_CAMBIO, [(base + 1, CambioModel.MODIFICACION, reservas[0].reserva_id, 1)], conn=conn)
+            raise RuntimeError("rollback")
+    registrar(pool, base + 2, reservas[1])
+
+    marca, deltas, _ = leer_cambios(marca, pool=pool)
+    assert ids(deltas) == [base + 2] and sorted(marca.huecos) == [base + 1]
+    marca, deltas, _ = leer_cambios(marca, pool=pool)
+    assert deltas == [] and sorted(marca.huecos) == [base + 1]  # Se sigue esperando mientras no caduque
+
+    monkeypatch.setattr(cambios, "ESPERA_HUECOS", 0)
+    marca, deltas, hay_mas = leer_cambios(marca, pool=pool)
+    assert (marca.ultimo, marca.huecos, deltas, hay_mas) == (base + 2, {}, [], False)
+
+
+def test_salto_grande_recuerda_como_maximo_max_huecos(pool, reservas, monkeypatch):
+    monkeypatch.setattr(cambios, "MAX_HUECOS", 5)
+    marca = marca_inicial(pool)
+    base = marca.ultimo
+
+    registrar(pool, base + 100, reservas[0])
+    marca, deltas, _ = leer_cambios(marca, pool=pool)
+    assert marca.ultimo == base + 100
+    assert sorted(marca.huecos) == list(range(base + 95, base + 100))  # Solo los más cercanos al salto
+    assert ids(deltas) == [base + 100]
+
+
+def test_hay_mas_solo_cuenta_los_cambios_nuevos(pool, reservas):
+    marca = marca_inicial(pool)
+    base = marca.ultimo
+
+    registrar(pool, base + 2, reservas[0])
+    registrar(pool, base + 4, reservas[1])
+    marca, deltas, hay_mas = leer_cambios(marca, limite=2, pool=pool)
+    assert ids(deltas) == [base + 2, base + 4] and hay_mas  # El límite de nuevos se ha llenado
+    assert sorted(marca.huecos) == [base + 1, base + 3]
+
+    marca, deltas, hay_mas = leer_cambios(marca, limite=2, pool=pool)
+    assert deltas == [] and not hay_mas
+
+    registrar(pool, base + 1, reservas[2])
+    registrar(pool, base + 3, reservas[2], CambioModel.BAJA)
+    marca, deltas, hay_mas = leer_cambios(marca, limite=2, pool=pool)
+    assert not hay_mas  # Dos huecos recuperados con límite 2 no son cambios nuevos pendientes
+    assert (marca.ultimo, marca.huecos) == (base + 4, {})
+    # Dos cambios de la misma reserva: solo se devuelve el último, y tras una baja no se relee la reserva
+    assert [(cambio.cambio_id, cambio.operacion, reserva) for cambio, reserva in deltas] == [(base + 3, CambioModel.BAJA, None)]
@@ -0,0 +1,204 @@
+import contextvars
+
+from PySide6.QtCore import QObject, QRunnable, QThreadPool, Signal, Slot
+
+from modelos.conexion import POOL_TAMANIO
+
+_hilos = None  # QThreadPool dedicado al acceso a datos, compartido por todos los ejecutores
+
+
+def get_hilos():
+    """
+    Devuelve el pool de hilos de acceso a datos, creándolo la primera vez.
+    Tiene tantos hilos como conexiones el pool de la base de datos: más hilos solo esperarían conexión.
+
+    Returns:
+        QThreadPool: El pool de hilos compartido.
+    """
+    global _hilos
+    if _hilos is None:
+        _hilos = QThreadPool()
+        _hilos.setMaxThreadCount(POOL_TAMANIO)
+    return _hilos
+
+
+class _Senales(QObject):
+    """
+    Señales con las que una tarea devuelve su resultado al hilo de la interfaz.
+    """
+    terminado = Signal(object, object)  # (tarea, resultado)
+    fallido = Signal(object, object)  # (tarea, excepción)
+
+
+class Tarea(QRunnable):
+    """
+    Operación de acceso a datos que se ejecuta en un hilo del pool.
+    """
+    def __init__(self, funcion, args, kwargs, clave, generacion, al_terminar, al_fallar, contexto=None):
+        """
+        Inicializa la tarea.
+
+        Args:
+            funcion (callable): Función bloqueante a ejecutar (normalmente un método de un DAO).
+            args (tuple): Argumentos posicionales de la función.
+            kwargs (dict): Argumentos con nombre de la función.
+            clave (str): Clave de agrupación; una tarea nueva con la misma clave deja obsoleta a la anterior.
+            generacion (int): Número de generación de la clave en el momento de lanzar la tarea.
+            al_terminar (callable): Se llama en el hilo de la interfaz con el resultado.
+            al_fallar (callable): Se llama en el hilo de la interfaz con la excepción.
+            contexto (contextvars.Context): Contexto en el que se ejecuta la función (por ejemplo, la acción
+                de la interfaz a la que se atribuyen sus consultas); por defecto, el del hilo del pool.
+        """
+        super().__init__()
+        self.setAutoDelete(False)  # El ejecutor conserva la referencia hasta entregar el resultado
+        self.funcion = funcion
+        self.args = args
+        self.kwargs = kwargs
+        self.clave = clave
+        self.generacion = generacion
+        self.al_terminar = al_terminar
+        self.al_fallar = al_fallar
+        self.cancelada = False
+        self.contexto = contexto
+        self.senales = _Senales()
+
+    def cancelar(self):
+        """
+        Marca la tarea como cancelada: si aún no ha empezado no se ejecuta y, si ya ha empezado,
+        su resultado se descarta.
+        """
+        self.cancelada = True
+
+    def run(self):
+        """
+        Ejecuta la función en el hilo del pool y emite el resultado o la excepción.
+        """
+        if self.cancelada:
+            self.senales.terminado.emit(self, None)
+            return
+        try:
+            if self.contexto is not None:
+                resultado = self.contexto.run(self.funcion, *self.args, **self.kwargs)
+            else:
+                resultado = self.funcion(*self.args, **self.kwargs)
+        except Exception as e:
+            self.senales.fallido.emit(self, e)
+        else:
+            self.senales.terminado.emit(self, resultado)
+
+
+class EjecutorDatos(QObject):
+    """
+    Ejecuta operaciones de los DAOs fuera del hilo de la interfaz y entrega los resultados mediante señales.
+    Cada controlador tiene su propio ejecutor, de modo que sus claves y su estado de carga son independientes.
+    """
+    ocupado_cambiado = Signal(bool)  # True al empezar a cargar, False cuando no queda ninguna tarea pendiente
+
+    def __init__(self, parent=None):
+        """
+        Inicializa el ejecutor.
+
+        Args:
+            parent (QObject): Objeto padre de Qt (normalmente el controlador).
+        """
+        super().__init__(parent)
+        self._pendientes = set()  # Tareas lanzadas cuyo resultado aún no se ha entregado
+        self._generaciones = {}  # clave -> generación de la última tarea lanzada con esa clave
+
+    def ejecutar(self, funcion, *args, clave=None, al_terminar=None, al_fallar=None, **kwargs):
+        """
+        Lanza una operación en segundo plano.
+
+        Args:
+            funcion (callable): Función bloqueante a ejecutar.
+            *args: Argumentos posicionales de la función.
+            clave (str): Si se indica, cancela las tareas anteriores con la misma clave.
+            al_terminar (callable): Recibe el resultado en el hilo de la interfaz.
+            al_fallar (callable): Recibe la excepción en el hilo de la interfaz.
+            **kwargs: Argumentos con nombre de la función.
+
+        Returns:
+            Tarea: La tarea lanzada, que puede cancelarse con cancelar().
+        """
+        generacion = 0
+        if clave is not None:
+            self.cancelar(clave)
+            generacion = self._generaciones.get(clave, 0) + 1
+            self._generaciones[clave] = generacion
+
+        # La tarea hereda las variables de contexto de quien la lanza, como la acción de la interfaz en curso
+        tarea = Tarea(funcion, args, kwargs, clave, generacion, al_terminar, al_fallar, contextvars.copy_context())
+        tarea.senales.terminado.connect(self._entregar_resultado)
+        tarea.senales.fallido.connect(self._entregar_error)
+
+        self._pendientes.add(tarea)
+        if len(self._pendientes) == 1:
+            self.ocupado_cambiado.emit(True)
+        get_hilos().start(tarea)
+        return tarea
+
+    def cancelar(self, clave):
+        """
+        Cancela las tareas pendientes con la clave indicada.
+
+        Args:
+            clave (str): Clave de las tareas a cancelar.
+        """
+        for tarea in list(self._pendientes):
+            if tarea.clave == clave:
+                tarea.cancelar()
+                if get_hilos().tryTake(tarea):
+                    self._finalizar(tarea)  # No había empezado: se retira de la cola sin ejecutarse
+
+    def cancelar_todo(self):
+        """
+        Cancela todas las tareas pendientes del ejecutor (por ejemplo, al cerrar la ventana).
+        """
+        for tarea in list(self._pendientes):
+            tarea.cancelar()
+            if get_hilos().tryTake(tarea):
+                self._finalizar(tarea)
+
+    def ocupado(self):
+        """
+        Indica si hay tareas pendientes.
+
+        Returns:
+            bool: True si alguna tarea sigue en curso.
+        """
+        return bool(self._pendientes)
+
+    def _vigente(self, tarea):
+        """
+        Comprueba si el resultado de una tarea debe entregarse.
+        """
+        if tarea.cancelada:
+            return False
+        return tarea.clave is None or self._generaciones.get(tarea.clave) == tarea.generacion
+
+    @Slot(object, object)
+    def _entregar_resultado(self, tarea, resultado):
+        """
+        Entrega el resultado en el hilo de la interfaz si la tarea sigue vigente.
+        """
+        self._finalizar(tarea)
+        if self._vigente(tarea) and tarea.al_terminar:
+            tarea.al_terminar(resultado)
+
+    @Slot(object, object)
+    def _entregar_error(self, tarea, error):
+        """
+        Entrega la excepción en el hilo de la interfaz si la tarea sigue vigente.
+        """
+        self._finalizar(tarea)
+        if self._vigente(tarea) and tarea.al_fallar:
+            tarea.al_fallar(error)
+
+    def _finalizar(self, tarea):
+        """
+        Retira la tarea de las pendientes y avisa si el ejecutor queda libre.
+        """
+        if tarea in self._pendientes:
+            self._pendientes.discard(tarea)
+            if not self._pendientes:
+                self.ocupado_cambiado.emit(False)
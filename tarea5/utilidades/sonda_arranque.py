@@ -0,0 +1,111 @@
+import json
+import logging
+import os
+import time
+
+from PySide6.QtCore import QEvent, QObject, QTimer
+
+logger = logging.getLogger(__name__)
+
+
+def fichero_arranque():
+    """
+    Devuelve el fichero JSON donde guardar los tiempos de arranque (HOTEL_ARRANQUE_FICHERO), o None si no se indica.
+    Se lee al llamarla y no al importar el módulo: main.py lo importa antes que modelos, que es quien carga el .env.
+
+    Returns:
+        str: Ruta del fichero, o None.
+    """
+    return os.environ.get("HOTEL_ARRANQUE_FICHERO")
+
+
+class _PrimerPintado(QObject):
+    """
+    Filtro de eventos que avisa del primer pintado de una ventana y después se retira.
+    """
+    def __init__(self, ventana, al_pintar):
+        super().__init__(ventana)
+        self.al_pintar = al_pintar
+        ventana.installEventFilter(self)
+
+    def eventFilter(self, objeto, evento):
+        if evento.type() == QEvent.Type.Paint:
+            objeto.removeEventFilter(self)
+            self.al_pintar()
+        return False
+
+
+class SondaArranque:
+    """
+    Mide los tiempos de arranque desde el inicio del proceso: primer pintado de cada ventana, cuándo responde
+    al usuario y cuándo termina el precalentamiento. Cada marca se anota una sola vez y se registra en el log.
+    """
+    def __init__(self):
+        """
+        Inicializa la sonda tomando como inicio el momento en que se importa.
+        """
+        self.inicio = time.perf_counter()
+        self.marcas = {}  # nombre -> segundos desde el inicio, en orden de llegada
+
+    def iniciar(self, inicio):
+        """
+        Fija el instante de referencia (normalmente tomado antes de cualquier import en main.py).
+
+        Args:
+            inicio (float): Valor de time.perf_counter() al arrancar.
+        """
+        self.inicio = inicio
+
+    def marcar(self, nombre):
+        """
+        Anota una marca si aún no se había anotado.
+
+        Args:
+            nombre (str): Nombre de la marca, por ejemplo "login_pintado".
+        """
+        if nombre in self.marcas:
+            return
+        self.marcas[nombre] = round(time.perf_counter() - self.inicio, 4)
+        logger.info("Arranque: %s a los %.0f ms", nombre, self.marcas[nombre] * 1000)
+
+    def vigilar(self, ventana, nombre, al_interactuar=None):
+        """
+        Anota "<nombre>_pintado" en el primer pintado de la ventana y "<nombre>_interactivo" en cuanto
+        el bucle de eventos queda libre después, que es cuando la ventana ya atiende al usuario.
+
+        Args:
+            ventana (QWidget): La ventana a vigilar, antes de mostrarla.
+            nombre (str): Prefijo de las marcas.
+            al_interactuar (callable): Función a llamar tras la marca de interactividad (opcional).
+        """
+        def interactiva():
+            self.marcar(f"{nombre}_interactivo")
+            if al_interactuar is not None:
+                al_interactuar()
+
+        def pintada():
+            self.marcar(f"{nombre}_pintado")
+            QTimer.singleShot(0, interactiva)
+        _PrimerPintado(ventana, pintada)
+
+    def informe(self):
+        """
+        Devuelve las marcas anotadas.
+
+        Returns:
+            dict: Marca -> segundos desde el inicio.
+        """
+        return dict(self.marcas)
+
+    def guardar(self, ruta):
+        """
+        Guarda las marcas en un fichero JSON.
+
+        Args:
+            ruta (str): Fichero de salida.
+        """
+        with open(ruta, "w", encoding="utf-8") as fichero:
+            json.dump(self.informe(), fichero, indent=2)
+
+
+sonda = SondaArranque()  # Sonda compartida por todo el proceso
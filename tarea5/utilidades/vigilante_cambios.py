@@ -0,0 +1,85 @@
+import logging
+
+from PySide6.QtCore import QObject, QTimer, Signal
+
+from modelos.cambios import INTERVALO_CAMBIOS, leer_cambios, marca_inicial
+from modelos.metricas import metricas
+from utilidades.ejecutor import EjecutorDatos
+
+logger = logging.getLogger(__name__)
+
+
+class VigilanteCambios(QObject):
+    """
+    Lee periódicamente, en segundo plano, el registro de cambios de la base de datos a partir de una marca
+    y emite los nuevos para que las ventanas abiertas se actualicen sin recargar.
+    Así cada puesto ve las reservas que hacen los demás contra la misma base de datos.
+    """
+    cambios_recibidos = Signal(object)  # Lista de (CambioModel, ReservaModel o None si ya no existe)
+
+    def __init__(self, parent=None, intervalo=INTERVALO_CAMBIOS):
+        """
+        Inicializa el vigilante parado.
+
+        Args:
+            parent (QObject): Objeto padre de Qt (normalmente la ventana principal).
+            intervalo (float): Segundos entre lecturas; con 0 el vigilante no hace nada.
+        """
+        super().__init__(parent)
+        self.marca = None  # MarcaCambios de la última lectura; None hasta conocer el último cambio registrado
+        self.activo = intervalo > 0
+        self.ejecutor = EjecutorDatos(self)  # Propio: las lecturas no muestran "Cargando..." en la ventana
+        self.temporizador = QTimer(self)
+        self.temporizador.setInterval(int(intervalo * 1000))
+        self.temporizador.timeout.connect(self.consultar)
+
+    def iniciar(self):
+        """
+        Toma como marca el último cambio registrado y empieza a leer los posteriores.
+        """
+        if self.activo:
+            self.ejecutor.ejecutar(marca_inicial, clave="marca", al_terminar=self._marca_leida, al_fallar=self._fallo_marca)
+
+    def detener(self):
+        """
+        Deja de leer cambios y descarta la lectura en curso.
+        """
+        self.temporizador.stop()
+        self.ejecutor.cancelar_todo()
+
+    def consultar(self):
+        """
+        Pide en segundo plano los cambios posteriores a la marca, salvo que siga en curso la lectura anterior.
+        """
+        if self.marca is None or self.ejecutor.ocupado():
+            return
+        with metricas.accion("cambios"):
+            self.ejecutor.ejecutar(
+                leer_cambios, self.marca, clave="cambios",
+                al_terminar=self._recibir,
+                al_fallar=lambda e: logger.warning("No se pudo leer el registro de cambios: %s", e),
+            )
+
+    def _marca_leida(self, marca):
+        """
+        Guarda la marca inicial y arranca las lecturas periódicas.
+        """
+        self.marca = marca
+        self.temporizador.start()
+
+    def _fallo_marca(self, error):
+        """
+        Reintenta obtener la marca inicial pasado un intervalo.
+        """
+        logger.warning("No se pudo leer el registro de cambios: %s", error)
+        QTimer.singleShot(self.temporizador.interval(), self, self.iniciar)
+
+    def _recibir(self, resultado):
+        """
+        Avanza la marca, emite los cambios y, si la lectura se quedó en el límite, sigue leyendo sin esperar.
+        """
+        self.marca, cambios, hay_mas = resultado
+        if cambios:
+            self.cambios_recibidos.emit(cambios)
+        if hay_mas:
+            self.consultar()
@@ -0,0 +1,210 @@
+from PySide6.QtCore import QEvent, QRect, Qt, Signal
+from PySide6.QtGui import QColor, QPainter
+from PySide6.QtWidgets import QAbstractScrollArea, QToolTip
+
+MESES = ["ene", "feb", "mar", "abr", "may", "jun", "jul", "ago", "sep", "oct", "nov", "dic"]
+NIVELES = 8  # Tonos del mapa de calor según los asistentes
+
+
+class VistaMapaOcupacion(QAbstractScrollArea):
+    """
+    Mapa de calor de ocupación: una fila por salón y una columna por día, pintado a mano sobre el viewport.
+    Solo se pintan las celdas visibles, leídas por posición de MapaOcupacion, así que el coste de cada repintado
+    depende del tamaño de la ventana y no del rango: un año entero se desplaza igual de fluido que un mes.
+    Los nombres de los salones y la cabecera de días quedan fijos al desplazarse.
+    """
+    celda_activada = Signal(int, object)  # salon_id y fecha de la celda sobre la que se hace doble clic
+
+    ANCHO_NOMBRES = 150  # Columna fija con los nombres de los salones
+    ALTO_CABECERA = 34  # Cabecera fija con el mes y el día
+    ANCHO_DIA = 24
+    ALTO_FILA = 24
+
+    def __init__(self, parent=None):
+        """
+        Inicializa la vista vacía.
+
+        Args:
+            parent (QWidget): Widget padre.
+        """
+        super().__init__(parent)
+        self.mapa = None
+        self.hoy = None  # Columna del día de hoy, que se resalta
+        self.viewport().setMouseTracking(True)
+        # Los colores se crean una vez: pintar no reserva memoria por celda
+        paleta = self.palette()
+        self._libre = paleta.base().color()
+        self._fin_semana = self._libre.darker(106)
+        self._rejilla = paleta.mid().color()
+        self._cabecera = paleta.window().color()
+        self._texto = paleta.windowText().color()
+        self._resaltado = paleta.highlight().color()
+        self._niveles = [QColor.fromHsv(10, 60 + 195 * nivel // (NIVELES - 1), 235 - 60 * nivel // (NIVELES - 1)) for nivel in range(NIVELES)]
+
+    def set_mapa(self, mapa, hoy=None):
+        """
+        Muestra una rejilla de ocupación. Si abarca el mismo rango que la anterior, conserva el desplazamiento.
+
+        Args:
+            mapa (MapaOcupacion): La rejilla a mostrar.
+            hoy (date): Día que se resalta (opcional).
+        """
+        mismo_rango = self.mapa is not None and (self.mapa.desde, self.mapa.hasta) == (mapa.desde, mapa.hasta)
+        self.mapa = mapa
+        self.hoy = mapa.columna(hoy) if hoy is not None else None
+        self._actualizar_barras()
+        if not mismo_rango:
+            self.horizontalScrollBar().setValue(0)
+            self.verticalScrollBar().setValue(0)
+            if self.hoy is not None:
+                self.ir_a_columna(self.hoy)
+        self.viewport().update()
+
+    def ir_a_columna(self, columna):
+        """
+        Desplaza la vista para que la columna quede a la izquierda del área visible.
+
+        Args:
+            columna (int): Posición del día.
+        """
+        self.horizontalScrollBar().setValue(columna * self.ANCHO_DIA)
+
+    def _actualizar_barras(self):
+        """
+        Ajusta el rango de las barras de desplazamiento al tamaño de la rejilla y del viewport.
+        """
+        ancho = self.viewport().width() - self.ANCHO_NOMBRES
+        alto = self.viewport().height() - self.ALTO_CABECERA
+        dias = self.mapa.dias if self.mapa else 0
+        salones = len(self.mapa.salones) if self.mapa else 0
+        barra = self.horizontalScrollBar()
+        barra.setRange(0, max(0, dias * self.ANCHO_DIA - ancho))
+        barra.setPageStep(max(ancho, self.ANCHO_DIA))
+        barra.setSingleStep(self.ANCHO_DIA)
+        barra = self.verticalScrollBar()
+        barra.setRange(0, max(0, salones * self.ALTO_FILA - alto))
+        barra.setPageStep(max(alto, self.ALTO_FILA))
+        barra.setSingleStep(self.ALTO_FILA)
+
+    def resizeEvent(self, evento):
+        super().resizeEvent(evento)
+        self._actualizar_barras()
+
+    def scrollContentsBy(self, dx, dy):
+        self.viewport().update()
+
+    def _visibles(self):
+        """
+        Calcula las filas y columnas que caen dentro del viewport.
+
+        Returns:
+            tuple: (primera fila, fila final, primera columna, columna final), con los finales excluidos.
+        """
+        x0, y0 = self.horizontalScrollBar().value(), self.verticalScrollBar().value()
+        ancho = self.viewport().width() - self.ANCHO_NOMBRES
+        alto = self.viewport().height() - self.ALTO_CABECERA
+        primera_columna = x0 // self.ANCHO_DIA
+        ultima_columna = min(self.mapa.dias, (x0 + ancho) // self.ANCHO_DIA + 1)
+        primera_fila = y0 // self.ALTO_FILA
+        ultima_fila = min(len(self.mapa.salones), (y0 + alto) // self.ALTO_FILA + 1)
+        return primera_fila, ultima_fila, primera_columna, ultima_columna
+
+    def paintEvent(self, evento):
+        pintor = QPainter(self.viewport())
+        pintor.fillRect(evento.rect(), self._libre)
+        if self.mapa is None:
+            return
+        x0, y0 = self.horizontalScrollBar().value(), self.verticalScrollBar().value()
+        ancho, alto = self.viewport().width(), self.viewport().height()
+        primera_fila, ultima_fila, primera_columna, ultima_columna = self._visibles()
+        maximo = max(self.mapa.max_asistentes, 1)
+        fines_semana = {columna for columna in range(primera_columna, ultima_columna) if self.mapa.fecha(columna).weekday() >= 5}
+
+        # Celdas visibles
+        pintor.setClipRect(self.ANCHO_NOMBRES, self.ALTO_CABECERA, ancho, alto)
+        for fila in range(primera_fila, ultima_fila):
+            y = self.ALTO_CABECERA + fila * self.ALTO_FILA - y0
+            celdas = self.mapa.fila(fila)
+            for columna in range(primera_columna, ultima_columna):
+                x = self.ANCHO_NOMBRES + columna * self.ANCHO_DIA - x0
+                celda = celdas[columna]
+                if celda is not None:
+                    color = self._niveles[celda[2] * (NIVELES - 1) // maximo]
+                elif columna in fines_semana:
+                    color = self._fin_semana
+                else:
+                    continue  # Ya pintada con el fondo
+                pintor.fillRect(x, y, self.ANCHO_DIA, self.ALTO_FILA, color)
+        # Líneas de la rejilla
+        pintor.setPen(self._rejilla)
+        fin_x = min(ancho, self.ANCHO_NOMBRES + self.mapa.dias * self.ANCHO_DIA - x0)
+        fin_y = min(alto, self.ALTO_CABECERA + len(self.mapa.salones) * self.ALTO_FILA - y0)
+        for fila in range(primera_fila, ultima_fila + 1):
+            y = self.ALTO_CABECERA + fila * self.ALTO_FILA - y0
+            pintor.drawLine(self.ANCHO_NOMBRES, y, fin_x, y)
+        for columna in range(primera_columna, ultima_columna + 1):
+            x = self.ANCHO_NOMBRES + columna * self.ANCHO_DIA - x0
+            pintor.drawLine(x, self.ALTO_CABECERA, x, fin_y)
+        if self.hoy is not None and primera_columna <= self.hoy < ultima_columna:
+            x = self.ANCHO_NOMBRES + self.hoy * self.ANCHO_DIA - x0
+            pintor.setPen(self._resaltado)
+            pintor.drawRect(x, self.ALTO_CABECERA, self.ANCHO_DIA, fin_y - self.ALTO_CABECERA)
+
+        # Cabecera de días: fija en vertical, se desplaza en horizontal
+        pintor.setClipRect(self.ANCHO_NOMBRES, 0, ancho, self.ALTO_CABECERA)
+        pintor.fillRect(self.ANCHO_NOMBRES, 0, ancho, self.ALTO_CABECERA, self._cabecera)
+        pintor.setPen(self._texto)
+        mitad = self.ALTO_CABECERA // 2
+        for columna in range(primera_columna, ultima_columna):
+            x = self.ANCHO_NOMBRES + columna * self.ANCHO_DIA - x0
+            fecha = self.mapa.fecha(columna)
+            if fecha.day == 1 or columna == primera_columna:
+                pintor.drawText(x + 2, 0, self.ANCHO_DIA * 4, mitad, Qt.AlignmentFlag.AlignLeft | Qt.AlignmentFlag.AlignVCenter,
+                                f"{MESES[fecha.month - 1]} {fecha.year}")
+            pintor.drawText(QRect(x, mitad, self.ANCHO_DIA, mitad), Qt.AlignmentFlag.AlignCenter, str(fecha.day))
+
+        # Nombres de los salones: fijos en horizontal, se desplazan en vertical
+        pintor.setClipRect(0, self.ALTO_CABECERA, self.ANCHO_NOMBRES, alto)
+        pintor.fillRect(0, self.ALTO_CABECERA, self.ANCHO_NOMBRES, alto, self._cabecera)
+        for fila in range(primera_fila, ultima_fila):
+            y = self.ALTO_CABECERA + fila * self.ALTO_FILA - y0
+            _, nombre = self.mapa.salones[fila]
+            texto = f"{nombre} ({self.mapa.dias_ocupados(fila)})"
+            pintor.drawText(QRect(6, y, self.ANCHO_NOMBRES - 8, self.ALTO_FILA), Qt.AlignmentFlag.AlignLeft | Qt.AlignmentFlag.AlignVCenter,
+                            pintor.fontMetrics().elidedText(texto, Qt.TextElideMode.ElideMiddle, self.ANCHO_NOMBRES - 8))
+        pintor.setClipping(False)
+        pintor.fillRect(0, 0, self.ANCHO_NOMBRES, self.ALTO_CABECERA, self._cabecera)
+
+    def celda_en(self, posicion):
+        """
+        Devuelve la celda bajo un punto del viewport.
+
+        Args:
+            posicion (QPoint): Punto en coordenadas del viewport.
+
+        Returns:
+            tuple: (fila, columna), o None si el punto no cae sobre una celda.
+        """
+        if self.mapa is None or posicion.x() < self.ANCHO_NOMBRES or posicion.y() < self.ALTO_CABECERA:
+            return None
+        columna = (posicion.x() - self.ANCHO_NOMBRES + self.horizontalScrollBar().value()) // self.ANCHO_DIA
+        fila = (posicion.y() - self.ALTO_CABECERA + self.verticalScrollBar().value()) // self.ALTO_FILA
+        if fila >= len(self.mapa.salones) or columna >= self.mapa.dias:
+            return None
+        return fila, columna
+
+    def viewportEvent(self, evento):
+        if evento.type() == QEvent.Type.ToolTip:
+            celda = self.celda_en(evento.pos())
+            if celda is None:
+                QToolTip.hideText()
+            else:
+                QToolTip.showText(evento.globalPos(), self.mapa.describir(*celda), self.viewport())
+            return True
+        return super().viewportEvent(evento)
+
+    def mouseDoubleClickEvent(self, evento):
+        celda = self.celda_en(evento.position().toPoint())
+        if celda is not None:
+            fila, columna = celda
+            self.celda_activada.emit(self.mapa.salones[fila][0], self.mapa.fecha(columna))